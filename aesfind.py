@@ -0,0 +1,352 @@
+"""Built-in AES-128/256 key-schedule detector.
+
+Works like aeskeyfind: every byte offset is treated as the start of an
+expanded key schedule, each word after the first round key is checked
+against the key-expansion recurrence applied to the words before it, and
+the differing bits are summed; offsets with at most ``threshold`` bit
+errors whose 176 bytes pass the low-entropy filter are reported.  The
+checks run as NumPy operations over whole windows of a memory-mapped dump:
+a cheap uint32 XOR screen on two schedule words rejects nearly every
+offset, including runs of zero or constant words, and the few survivors
+are checked word by word and dropped as soon as their error count exceeds
+the threshold.  Results come back as
+arrays without a text round-trip.
+
+NumPy is optional for the rest of RAM-Extractor; it is only needed here.
+"""
+import argparse
+import mmap
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import dumps
+import prefilter
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+DEFAULT_THRESHOLD = 10
+WINDOW_SIZE = 16 * 1024 * 1024
+# Bytes of the longest schedule (AES-256, 60 words); windows overlap by this.
+SCHEDULE_256 = 240
+SCHEDULE_128 = 176
+# A candidate whose first 176 bytes repeat one value more often is skipped.
+ENTROPY_MAX_REPEATS = 8
+
+RCON = (0x00, 0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80, 0x1B, 0x36)
+
+
+def _make_sbox() -> list:
+    def rotl8(x, shift):
+        return ((x << shift) | (x >> (8 - shift))) & 0xFF
+
+    sbox = [0] * 256
+    p = q = 1
+    while True:
+        p = p ^ ((p << 1) & 0xFF) ^ (0x1B if p & 0x80 else 0)
+        q ^= q << 1
+        q ^= q << 2
+        q ^= q << 4
+        q &= 0xFF
+        if q & 0x80:
+            q ^= 0x09
+        sbox[p] = q ^ rotl8(q, 1) ^ rotl8(q, 2) ^ rotl8(q, 3) ^ rotl8(q, 4) ^ 0x63
+        if p == 1:
+            break
+    sbox[0] = 0x63
+    return sbox
+
+
+def expand_key(key: bytes) -> bytes:
+    """The AES-128/256 expanded key schedule (176 or 240 bytes) for ``key``."""
+    nk = len(key) // 4
+    if nk not in (4, 8):
+        raise ValueError("AES key must be 16 or 32 bytes")
+    sbox = _make_sbox()
+    words = [list(key[4 * i:4 * i + 4]) for i in range(nk)]
+    for i in range(nk, (SCHEDULE_128 if nk == 4 else SCHEDULE_256) // 4):
+        temp = list(words[i - 1])
+        if i % nk == 0:
+            temp = [sbox[b] for b in temp[1:] + temp[:1]]
+            temp[0] ^= RCON[i // nk]
+        elif nk == 8 and i % nk == 4:
+            temp = [sbox[b] for b in temp]
+        words.append([a ^ b for a, b in zip(words[i - nk], temp)])
+    return bytes(b for word in words for b in word)
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("numpy is required for the built-in AES detector (pip install numpy)")
+
+
+_tables = {}
+
+
+def _lookup_tables():
+    if not _tables:
+        _tables["sbox"] = np.array(_make_sbox(), dtype=np.uint8)
+        _tables["pop"] = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    return _tables["sbox"], _tables["pop"]
+
+
+def _word_errors(take, j: int, nk: int):
+    """Bit errors of schedule word ``j`` for every candidate ``take`` yields."""
+    sbox, pop = _lookup_tables()
+    errors = None
+    for b in range(4):
+        if j % nk == 0:
+            expected = sbox[take(4 * (j - 1) + (b + 1) % 4)]
+            if b == 0:
+                expected = expected ^ np.uint8(RCON[j // nk])
+        elif nk == 8 and j % nk == 4:
+            expected = sbox[take(4 * (j - 1) + b)]
+        else:
+            expected = take(4 * (j - 1) + b)
+        bits = pop[take(4 * (j - nk) + b) ^ expected ^ take(4 * j + b)]
+        errors = bits if errors is None else errors + bits
+    return errors
+
+
+def _low_entropy(data, offset: int) -> bool:
+    counts = np.bincount(data[offset:offset + SCHEDULE_128], minlength=256)
+    return bool(counts.max() > ENTROPY_MAX_REPEATS)
+
+
+def _popcount32(words):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    _, pop = _lookup_tables()
+    return pop[words.view(np.uint8)].reshape(-1, 4).sum(axis=1, dtype=np.uint8)
+
+
+def _repetitive(prev, cur, nxt):
+    """Mask of candidates whose words ``prev``, ``cur`` and ``nxt`` are equal and repeat a byte 3+ times.
+
+    Such a candidate holds one byte value at least 9 times in its first
+    176 bytes, so the entropy filter would drop it anyway; rejecting it in
+    the screen keeps zero fill, constant fill and arrays of small integers
+    out of the word-by-word check.
+    """
+    b = cur.view(np.uint8).reshape(-1, 4)
+    e01, e02, e03 = b[:, 0] == b[:, 1], b[:, 0] == b[:, 2], b[:, 0] == b[:, 3]
+    e12, e13 = b[:, 1] == b[:, 2], b[:, 1] == b[:, 3]
+    triple = (e01 & (e02 | e03)) | (e02 & e03) | (e12 & e13)
+    return triple & (cur == prev) & (cur == nxt)
+
+
+def _screen(data, n: int, nk: int, threshold: int):
+    """Offsets below ``n`` whose first two S-box-free schedule words are within threshold.
+
+    Words ``nk + 1`` and ``nk + 2`` are plain ``w[i - 1] ^ w[i - nk]``, so
+    they are checked with uint32 XORs in one pass per byte alignment over
+    the whole window.  Random data essentially never survives; repetitive
+    data, which does, is rejected here too (see :func:`_repetitive`).
+    """
+    s = nk + 1
+    survivors = []
+    for a in range(4):
+        m = (n - a + 3) // 4
+        if m <= 0:
+            continue
+        words = data[a:a + 4 * (m + s + 1)].view("<u4")
+        prev, cur, nxt = words[s - 1:s - 1 + m], words[s:s + m], words[s + 1:s + 1 + m]
+        errors = _popcount32(cur ^ prev ^ words[s - nk:s - nk + m])
+        errors += _popcount32(nxt ^ cur ^ words[s + 1 - nk:s + 1 - nk + m])
+        keep = errors <= threshold
+        hits = np.flatnonzero(keep)
+        if len(hits) > m // 64:
+            # Mostly repetitive data: masking whole arrays beats gathering.
+            hits = np.flatnonzero(keep & ~_repetitive(prev, cur, nxt))
+        elif len(hits):
+            hits = hits[~_repetitive(prev[hits], cur[hits], nxt[hits])]
+        survivors.append(a + 4 * hits)
+    return np.sort(np.concatenate(survivors))
+
+
+def scan_array(data, count: int, base: int = 0, threshold: int = DEFAULT_THRESHOLD):
+    """Find key schedules starting in the first ``count`` bytes of ``data``.
+
+    ``data`` is a uint8 array that extends past ``count`` far enough to hold
+    the schedules being tested; candidates whose schedule would run past
+    its end are skipped.  Returns ``(offsets, bits)`` arrays with offsets
+    shifted by ``base``.
+    """
+    _require_numpy()
+    found = []
+    for bits, nk, length in ((256, 8, SCHEDULE_256), (128, 4, SCHEDULE_128)):
+        n = min(count, len(data) - length + 1)
+        if n <= 0:
+            continue
+        idx = _screen(data, n, nk, threshold)
+        errors = np.zeros(len(idx), dtype=np.int32)
+        for j in range(nk, length // 4):
+            if not idx.size:
+                break
+            errors += _word_errors(lambda off: data[idx + off], j, nk)
+            keep = errors <= threshold
+            idx, errors = idx[keep], errors[keep]
+        for i in idx.tolist():
+            if not _low_entropy(data, i):
+                found.append((base + i, bits))
+    found.sort(key=lambda item: (item[0], -item[1]))
+    offsets = np.array([off for off, _ in found], dtype=np.uint64)
+    sizes = np.array([bits for _, bits in found], dtype=np.uint16)
+    return offsets, sizes
+
+
+def scan_file(path: str, threshold: int = DEFAULT_THRESHOLD, window: int = WINDOW_SIZE, progress=None):
+    """Scan a dump through mmap; returns ``(offsets, bits)`` arrays.
+
+    ``progress`` is called with the number of bytes scanned so far after
+    every window.
+    """
+    _require_numpy()
+    size = os.path.getsize(path)
+    all_offsets, all_sizes = [], []
+    if size == 0:
+        return np.array([], dtype=np.uint64), np.array([], dtype=np.uint16)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = np.frombuffer(mm, dtype=np.uint8)
+        for start in range(0, size, window):
+            view = data[start:start + window + SCHEDULE_256 - 1]
+            offsets, sizes = scan_array(view, min(window, size - start), start, threshold)
+            all_offsets.append(offsets)
+            all_sizes.append(sizes)
+            if progress is not None:
+                progress(min(start + window, size))
+        del data, view
+    return np.concatenate(all_offsets), np.concatenate(all_sizes)
+
+
+def scan_stream(reader, threshold: int = DEFAULT_THRESHOLD, window: int = WINDOW_SIZE, progress=None):
+    """Like :func:`scan_file` for a dump read front to back (a :class:`dumps.DumpReader`).
+
+    Each window is read after the last ``SCHEDULE_256 - 1`` bytes of the
+    previous one, so schedules spanning two windows are still found.
+    ``progress`` gets the reader's ``consumed`` bytes.
+    """
+    _require_numpy()
+    tail = SCHEDULE_256 - 1
+    buf = np.empty(window + tail, dtype=np.uint8)
+    all_offsets, all_sizes = [], []
+    base, carry = 0, 0
+    while True:
+        filled = carry + reader.readinto_full(memoryview(buf)[carry:])
+        eof = filled < len(buf)
+        count = filled if eof else window
+        if count:
+            offsets, sizes = scan_array(buf[:filled], count, base, threshold)
+            all_offsets.append(offsets)
+            all_sizes.append(sizes)
+        if progress is not None:
+            progress(reader.consumed)
+        if eof:
+            break
+        buf[:tail] = buf[window:]
+        base, carry = base + window, tail
+    if not all_offsets:
+        return np.array([], dtype=np.uint64), np.array([], dtype=np.uint16)
+    return np.concatenate(all_offsets), np.concatenate(all_sizes)
+
+
+def scan_filtered(dump, layout, threshold: int = DEFAULT_THRESHOLD, window: int = WINDOW_SIZE, progress=None):
+    """Scan only the candidate runs of ``layout`` (see :mod:`prefilter`) of a :class:`dumps.DumpSource`.
+
+    The runs are read back to back into the windows, so small runs cost no
+    more than large ones; offsets are mapped back to the dump.
+    """
+    with dump.open() as reader:
+        offsets, sizes = scan_stream(prefilter.FilteredReader(reader, layout), threshold, window, progress)
+    offsets, keep = layout.map_offsets(offsets)
+    return offsets[keep], sizes[keep]
+
+
+def write_values(out_path: str, offsets, sizes):
+    """Write an aes_values.txt in the same ``offset,size`` format as aes_parser."""
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(f"{int(off):x},{int(bits)}" for off, bits in zip(offsets, sizes)))
+
+
+def run(mem_path: str, res_dir: str, threshold: int = DEFAULT_THRESHOLD, log=print, progress=None,
+        page_filter: bool = False) -> int:
+    """Scan ``mem_path`` and write ``aes_values.txt``; returns the number of keys.
+
+    ``progress(done, total)`` is called after every window.  Split and
+    compressed dumps (see :mod:`dumps`) are read as a stream.  With
+    ``page_filter`` only the candidate pages of the dump's page map are
+    scanned (see :mod:`prefilter`).
+    """
+    os.makedirs(res_dir, exist_ok=True)
+    start = time.monotonic()
+    dump = dumps.open_source(mem_path)
+    total = dump.disk_size
+    report = None if progress is None else lambda done: progress(done, total)
+    layout = None
+    if page_filter:
+        page_map = prefilter.load(mem_path, res_dir, log=log, progress=progress)
+        layout = page_map.layout(SCHEDULE_256)
+        log(page_map.summary(layout))
+    if layout is not None:
+        offsets, sizes = scan_filtered(dump, layout, threshold, progress=report)
+    elif dump.is_file:
+        offsets, sizes = scan_file(dump.path, threshold, progress=report)
+    else:
+        with dump.open() as reader:
+            offsets, sizes = scan_stream(reader, threshold, progress=report)
+    elapsed = time.monotonic() - start
+    out_path = os.path.join(res_dir, "aes_values.txt")
+    write_values(out_path, offsets, sizes)
+    mib = dump.size / (1024 * 1024)
+    scanned = f"{mib:.0f} MiB" if layout is None else f"{layout.scanned / (1024 * 1024):.0f} of {mib:.0f} MiB"
+    log(f"Built-in AES detector scanned {scanned} in {elapsed:.1f}s "
+        f"({mib / max(elapsed, 1e-9):.0f} MiB/s), {len(offsets)} keys")
+    log(f"AES values saved to {out_path}")
+    return len(offsets)
+
+
+def compare(mem_path: str, threshold: int = DEFAULT_THRESHOLD, log=print) -> bool:
+    """Compare offsets and throughput against the external aeskeyfind."""
+    from parsers import iter_pairs
+
+    start = time.monotonic()
+    offsets, sizes = scan_file(mem_path, threshold)
+    builtin_time = time.monotonic() - start
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as out:
+        start = time.monotonic()
+        subprocess.run(["aeskeyfind", "-v", "-q", "-t", str(threshold), mem_path],
+                       stdout=out, stderr=subprocess.DEVNULL, check=False)
+        external_time = time.monotonic() - start
+        out.seek(0)
+        external = sorted({(int(off, 16), int(bits)) for off, bits in iter_pairs("aes", out)})
+    builtin = sorted({(int(off), int(bits)) for off, bits in zip(offsets, sizes)})
+    mib = os.path.getsize(mem_path) / (1024 * 1024)
+    log(f"built-in:   {builtin_time:8.2f}s {mib / max(builtin_time, 1e-9):8.1f} MiB/s {len(builtin)} keys")
+    log(f"aeskeyfind: {external_time:8.2f}s {mib / max(external_time, 1e-9):8.1f} MiB/s {len(external)} keys")
+    if builtin != external:
+        log(f"MISMATCH: {len(set(external) - set(builtin))} missing, "
+            f"{len(set(builtin) - set(external))} extra")
+        return False
+    log("Offsets match.")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Built-in AES key-schedule detector.")
+    parser.add_argument("memory", help="memory dump to scan")
+    parser.add_argument("-o", "--results", default=".", help="folder for aes_values.txt")
+    parser.add_argument("-t", "--threshold", type=int, default=DEFAULT_THRESHOLD,
+                        help="maximum bit errors in a key schedule")
+    parser.add_argument("--prefilter", action="store_true",
+                        help="scan only pages that are not zero, constant or low-entropy")
+    parser.add_argument("--compare", action="store_true",
+                        help="check offsets and throughput against aeskeyfind instead")
+    args = parser.parse_args()
+    if args.compare:
+        sys.exit(0 if compare(args.memory, args.threshold) else 1)
+    run(args.memory, args.results, args.threshold, page_filter=args.prefilter)
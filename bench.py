@@ -0,0 +1,551 @@
+"""Benchmarks for the scan, parse and zeroize stages on synthetic dumps.
+
+``generate`` writes a dump of the requested size (zero, random and
+low-entropy text pages) with AES-128/256 and Serpent key schedules, Twofish
+key contexts and DER-encoded RSA private keys planted at random offsets,
+and records those offsets in ``<dump>.keys.json``.  ``run`` measures every
+stage the launchers use on a dump, each in a fresh process so its peak RSS
+(of the process or any tool it ran) is its own, and scores each finder's
+values against the planted keys.  Pre-filtered scans (see prefilter.py)
+are also reported as a speedup over the matching full scan.  Results are written as JSON and can be
+compared with an earlier run::
+
+    python bench.py generate /tmp/bench.mem --size-mib 512
+    python bench.py run /tmp/bench.mem -o before.json
+    python bench.py run /tmp/bench.mem -o after.json --compare before.json
+
+Nothing here needs network access; stages whose tool is not installed are
+reported as skipped.
+"""
+import argparse
+import bisect
+import json
+import mmap
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import aesfind
+from finders import FINDERS
+from parallel import ScanSettings, parallel_scan
+from parsers import parse_file
+from pipeline import run_finder, scan_all
+import offset_index
+import prefilter
+import zeroize
+
+PAGE_SIZE = 4096
+BLOCK_SIZE = 1024 * 1024
+DEFAULT_SIZE_MIB = 256
+DEFAULT_KEYS = 8
+ALIGNMENT = 16
+# pre-filtered stage -> the full scan it is timed against
+FULL_SCANS = {"filtered:builtin": "builtin:aes", "filtered:scan-all": "scan-all"}
+
+# ------------------------------ Serpent --------------------------------- #
+SERPENT_SBOX = (
+    (3, 8, 15, 1, 10, 6, 5, 11, 14, 13, 4, 2, 7, 0, 9, 12),
+    (15, 12, 2, 7, 9, 0, 5, 10, 1, 11, 14, 8, 6, 13, 3, 4),
+    (8, 6, 7, 9, 3, 12, 10, 15, 13, 1, 14, 4, 0, 11, 5, 2),
+    (0, 15, 11, 8, 12, 9, 6, 3, 13, 1, 2, 4, 10, 7, 5, 14),
+    (1, 15, 8, 3, 12, 0, 11, 6, 2, 5, 4, 10, 9, 14, 7, 13),
+    (15, 5, 2, 11, 4, 10, 9, 12, 0, 3, 14, 8, 13, 6, 7, 1),
+    (7, 2, 12, 5, 8, 4, 6, 11, 14, 9, 1, 15, 13, 3, 10, 0),
+    (1, 13, 15, 0, 14, 8, 2, 11, 7, 4, 12, 10, 9, 3, 5, 6),
+)
+PHI = 0x9E3779B9
+
+
+def _rol(x: int, n: int) -> int:
+    return ((x << n) | (x >> (32 - n))) & 0xFFFFFFFF
+
+
+def serpent_schedule(key: bytes) -> bytes:
+    """The 132 Serpent subkeys (528 bytes) for a 256-bit key, as implementations store them."""
+    w = [int.from_bytes(key[4 * i:4 * i + 4], "little") for i in range(8)]
+    for i in range(132):
+        w.append(_rol(w[i] ^ w[i + 3] ^ w[i + 5] ^ w[i + 7] ^ PHI ^ i, 11))
+    pre = w[8:]
+    out = []
+    for i in range(33):
+        box = SERPENT_SBOX[(3 - i) % 8]
+        x = pre[4 * i:4 * i + 4]
+        k = [0, 0, 0, 0]
+        for bit in range(32):
+            nibble = box[sum(((x[j] >> bit) & 1) << j for j in range(4))]
+            for j in range(4):
+                k[j] |= ((nibble >> j) & 1) << bit
+        out.extend(k)
+    return b"".join(v.to_bytes(4, "little") for v in out)
+
+
+# ------------------------------ Twofish --------------------------------- #
+_Q_TABLES = (
+    ((0x8, 0x1, 0x7, 0xD, 0x6, 0xF, 0x3, 0x2, 0x0, 0xB, 0x5, 0x9, 0xE, 0xC, 0xA, 0x4),
+     (0xE, 0xC, 0xB, 0x8, 0x1, 0x2, 0x3, 0x5, 0xF, 0x4, 0xA, 0x6, 0x7, 0x0, 0x9, 0xD),
+     (0xB, 0xA, 0x5, 0xE, 0x6, 0xD, 0x9, 0x0, 0xC, 0x8, 0xF, 0x3, 0x2, 0x4, 0x7, 0x1),
+     (0xD, 0x7, 0xF, 0x4, 0x1, 0x2, 0x6, 0xE, 0x9, 0xB, 0x3, 0x0, 0x8, 0x5, 0xC, 0xA)),
+    ((0x2, 0x8, 0xB, 0xD, 0xF, 0x7, 0x6, 0xE, 0x3, 0x1, 0x9, 0x4, 0x0, 0xA, 0xC, 0x5),
+     (0x1, 0xE, 0x2, 0xB, 0x4, 0xC, 0x3, 0x7, 0x6, 0xD, 0xA, 0x5, 0xF, 0x9, 0x0, 0x8),
+     (0x4, 0xC, 0x7, 0x5, 0x1, 0x6, 0x9, 0xA, 0x0, 0xE, 0xD, 0x8, 0x2, 0xB, 0x3, 0xF),
+     (0xB, 0x9, 0x5, 0x1, 0xC, 0x3, 0xD, 0xE, 0x6, 0x4, 0x7, 0xF, 0x2, 0x0, 0x8, 0xA)),
+)
+MDS = ((0x01, 0xEF, 0x5B, 0x5B), (0x5B, 0xEF, 0xEF, 0x01), (0xEF, 0x5B, 0x01, 0xEF), (0xEF, 0x01, 0xEF, 0x5B))
+RS = ((0x01, 0xA4, 0x55, 0x87, 0x5A, 0x58, 0xDB, 0x9E),
+      (0xA4, 0x56, 0x82, 0xF3, 0x1E, 0xC6, 0x68, 0xE5),
+      (0x02, 0xA1, 0xFC, 0xC1, 0x47, 0xAE, 0x3D, 0x19),
+      (0xA4, 0x55, 0x87, 0x5A, 0x58, 0xDB, 0x9E, 0x03))
+
+
+def _q_permutation(t) -> list:
+    def ror4(x, n):
+        return ((x >> n) | (x << (4 - n))) & 0xF
+
+    def q(x):
+        a, b = x >> 4, x & 0xF
+        a, b = a ^ b, a ^ ror4(b, 1) ^ ((8 * a) & 0xF)
+        a, b = t[0][a], t[1][b]
+        a, b = a ^ b, a ^ ror4(b, 1) ^ ((8 * a) & 0xF)
+        a, b = t[2][a], t[3][b]
+        return 16 * b + a
+    return [q(x) for x in range(256)]
+
+
+Q0, Q1 = _q_permutation(_Q_TABLES[0]), _q_permutation(_Q_TABLES[1])
+
+
+def _gf_mul(a: int, b: int, poly: int) -> int:
+    r = 0
+    while b:
+        if b & 1:
+            r ^= a
+        a <<= 1
+        if a & 0x100:
+            a ^= poly
+        b >>= 1
+    return r
+
+
+def _mds(y) -> int:
+    out = 0
+    for i in range(4):
+        z = 0
+        for j in range(4):
+            z ^= _gf_mul(MDS[i][j], y[j], 0x169)
+        out |= z << 8 * i
+    return out
+
+
+def _twofish_sboxes(x: int, l0, l1) -> tuple:
+    """The four key-dependent S-box outputs for byte ``x`` of a 128-bit key (k = 2)."""
+    return (Q1[Q0[Q0[x] ^ l1[0]] ^ l0[0]],
+            Q0[Q0[Q1[x] ^ l1[1]] ^ l0[1]],
+            Q1[Q1[Q0[x] ^ l1[2]] ^ l0[2]],
+            Q0[Q1[Q1[x] ^ l1[3]] ^ l0[3]])
+
+
+def _twofish_h(word: int, l0, l1) -> int:
+    y = [(word >> 8 * j) & 0xFF for j in range(4)]
+    return _mds([_twofish_sboxes(y[j], l0, l1)[j] for j in range(4)])
+
+
+def twofish_context(key: bytes) -> bytes:
+    """A Linux ``struct twofish_ctx`` (MDS-folded S-boxes and 40 subkeys, 4256 bytes) for a 128-bit key."""
+    m = [int.from_bytes(key[4 * i:4 * i + 4], "little") for i in range(4)]
+    me = [[(w >> 8 * j) & 0xFF for j in range(4)] for w in (m[0], m[2])]
+    mo = [[(w >> 8 * j) & 0xFF for j in range(4)] for w in (m[1], m[3])]
+    s = [[0] * 4 for _ in range(2)]
+    for i in range(2):
+        for r in range(4):
+            for c in range(8):
+                s[i][r] ^= _gf_mul(RS[r][c], key[8 * i + c], 0x14D)
+    sbox_key = (s[1], s[0])
+    tables = [[0] * 256 for _ in range(4)]
+    for x in range(256):
+        out = _twofish_sboxes(x, *sbox_key)
+        for j in range(4):
+            y = [0, 0, 0, 0]
+            y[j] = out[j]
+            tables[j][x] = _mds(y)
+    subkeys = []
+    for i in range(20):
+        a = _twofish_h(2 * i * 0x01010101, *me)
+        b = _rol(_twofish_h((2 * i + 1) * 0x01010101, *mo), 8)
+        subkeys.append((a + b) & 0xFFFFFFFF)
+        subkeys.append(_rol((a + 2 * b) & 0xFFFFFFFF, 9))
+    words = [v for table in tables for v in table] + subkeys
+    return b"".join(v.to_bytes(4, "little") for v in words)
+
+
+# ------------------------------ RSA ------------------------------------- #
+def _der_length(n: int) -> bytes:
+    if n < 0x80:
+        return bytes([n])
+    body = n.to_bytes((n.bit_length() + 7) // 8, "big")
+    return bytes([0x80 | len(body)]) + body
+
+
+def _der_integer(value: bytes) -> bytes:
+    return b"\x02" + _der_length(len(value)) + value
+
+
+def rsa_private_key(rnd: random.Random, bits: int = 1024) -> bytes:
+    """A PKCS#1 RSAPrivateKey DER structure with random (not mathematically valid) numbers."""
+    def number(nbytes):
+        v = bytearray(rnd.randbytes(nbytes))
+        v[0] = (v[0] & 0x7F) | 0x40
+        return bytes(v)
+
+    n = bits // 8
+    fields = [b"\x00", number(n), b"\x01\x00\x01", number(n), number(n // 2), number(n // 2),
+              number(n // 2), number(n // 2), number(n // 2)]
+    body = b"".join(_der_integer(f) for f in fields)
+    return b"\x30" + _der_length(len(body)) + body
+
+
+# ------------------------------ Generator ------------------------------- #
+def _filler_block(rnd: random.Random, size: int) -> bytes:
+    text = b"The quick brown fox jumps over the lazy dog. /usr/lib/x86_64-linux-gnu\n"
+    pages = []
+    for _ in range(size // PAGE_SIZE):
+        kind = rnd.random()
+        if kind < 0.4:
+            pages.append(bytes(PAGE_SIZE))
+        elif kind < 0.8:
+            pages.append(rnd.randbytes(PAGE_SIZE))
+        else:
+            pages.append((text * (PAGE_SIZE // len(text) + 1))[:PAGE_SIZE])
+    return b"".join(pages)
+
+
+def _plant_offsets(rnd: random.Random, size: int, lengths) -> list:
+    """Non-overlapping, aligned offsets for regions of the given lengths."""
+    taken = []
+    out = []
+    for length in lengths:
+        for _ in range(1000):
+            offset = rnd.randrange(0, size - length) // ALIGNMENT * ALIGNMENT
+            i = bisect.bisect_left(taken, (offset,))
+            if (i == 0 or taken[i - 1][1] <= offset) and (i == len(taken) or offset + length <= taken[i][0]):
+                taken.insert(i, (offset, offset + length))
+                out.append(offset)
+                break
+        else:
+            raise ValueError("dump too small for the requested number of keys")
+    return out
+
+
+def generate(path: str, size: int, keys: int = DEFAULT_KEYS, seed: int = 0, log=print) -> dict:
+    """Write a synthetic dump with ``keys`` keys of each kind; returns the ground truth."""
+    rnd = random.Random(seed)
+    size = size // PAGE_SIZE * PAGE_SIZE
+    start = time.monotonic()
+    with open(path, "wb") as f:
+        for pos in range(0, size, BLOCK_SIZE):
+            f.write(_filler_block(rnd, min(BLOCK_SIZE, size - pos)))
+    material = []
+    for i in range(keys):
+        material.append(("aes", 128 if i % 2 else 256, aesfind.expand_key(rnd.randbytes(16 if i % 2 else 32))))
+        material.append(("rsa", 0, rsa_private_key(rnd, 2048 if i % 2 else 1024)))
+        material.append(("serpent", 0, serpent_schedule(rnd.randbytes(32))))
+        material.append(("twofish", 0, twofish_context(rnd.randbytes(16))))
+    offsets = _plant_offsets(rnd, size, [len(data) for _, _, data in material])
+    planted = []
+    with open(path, "r+b") as f:
+        for (algorithm, bits, data), offset in zip(material, offsets):
+            f.seek(offset)
+            f.write(data)
+            planted.append({"algorithm": algorithm, "offset": offset, "length": len(data), "bits": bits})
+    truth = {"dump": os.path.abspath(path), "size": size, "seed": seed,
+             "keys": sorted(planted, key=lambda k: k["offset"])}
+    with open(truth_path(path), "w", encoding="utf-8") as f:
+        json.dump(truth, f, indent=2)
+    log(f"Generated {size / 1e6:.0f} MB dump with {len(planted)} keys in {time.monotonic() - start:.1f}s: {path}")
+    return truth
+
+
+def truth_path(mem_path: str) -> str:
+    return mem_path + ".keys.json"
+
+
+# ------------------------------ Runner ---------------------------------- #
+def all_stages() -> list:
+    """Every stage name, in the order they are measured."""
+    return (["builtin:aes"] + [f"scan:{name}" for name in FINDERS] + [f"parse:{name}" for name in FINDERS]
+            + ["scan-all", "prefilter", "filtered:builtin", "filtered:scan-all"]
+            + [f"parallel:{name}" for name in FINDERS] + ["index", "zeroize:fast", "zeroize:dump", "zeroize:verify"])
+
+
+def available_stages() -> list:
+    """The stages whose tools are present here."""
+    present = [name for name, f in FINDERS.items() if not f.missing()]
+    stages = []
+    for stage in all_stages():
+        kind, _, name = stage.partition(":")
+        if kind in ("builtin", "prefilter", "filtered") and aesfind.np is None:
+            continue
+        if stage == "filtered:scan-all" and not present:
+            continue
+        if kind in ("scan", "parse", "parallel") and name not in present:
+            continue
+        if kind == "scan-all" and not present:
+            continue
+        if stage in ("zeroize:dump", "zeroize:verify") and not zeroize.find_binary():
+            continue
+        stages.append(stage)
+    return stages
+
+
+def _source_dir(work: str) -> str:
+    """Results folder the index and zeroize stages read: finder scans, else the built-in AES scan."""
+    scan_dir = os.path.join(work, "scan")
+    if any(os.path.isfile(offset_index.values_path(scan_dir, n)) for n in offset_index.ALGORITHMS):
+        return scan_dir
+    return os.path.join(work, "builtin")
+
+
+def _present(res_dir: str) -> list:
+    return [n for n in offset_index.ALGORITHMS if os.path.isfile(offset_index.values_path(res_dir, n))]
+
+
+def _execute(stage: str, mem_path: str, work: str) -> dict:
+    """Run one stage; returns the result folder, algorithms scored and bytes processed."""
+    kind, _, name = stage.partition(":")
+    quiet = lambda msg: None
+    size = os.path.getsize(mem_path)
+    if kind == "builtin":
+        res_dir = os.path.join(work, "builtin")
+        aesfind.run(mem_path, res_dir, log=quiet)
+        return {"results": res_dir, "algorithms": ["aes"], "bytes": size}
+    if kind == "scan":
+        res_dir = os.path.join(work, "scan")
+        code, _ = run_finder(name, mem_path, res_dir, log=quiet)
+        return {"results": res_dir, "algorithms": [name], "bytes": size, "code": code}
+    if kind == "parse":
+        src = os.path.join(work, "scan", FINDERS[name].output_name)
+        res_dir = os.path.join(work, "parse")
+        os.makedirs(res_dir, exist_ok=True)
+        parse_file(name, src, offset_index.values_path(res_dir, name))
+        return {"results": res_dir, "algorithms": [name], "bytes": os.path.getsize(src)}
+    if kind == "scan-all":
+        res_dir = os.path.join(work, "scan-all")
+        names = [n for n, f in FINDERS.items() if not f.missing()]
+        codes = scan_all(mem_path, res_dir, names, log=quiet)
+        return {"results": res_dir, "algorithms": names, "bytes": size,
+                "code": max(codes.values(), key=abs, default=0)}
+    if kind == "prefilter":
+        res_dir = os.path.join(work, "filtered")
+        prefilter.load(mem_path, res_dir, log=quiet)
+        return {"results": res_dir, "algorithms": [], "bytes": size}
+    if kind == "filtered":
+        # Reuses the page map of the prefilter stage, so only the scan is timed.
+        res_dir = os.path.join(work, "filtered")
+        if name == "builtin":
+            aesfind.run(mem_path, res_dir, log=quiet, page_filter=True)
+            return {"results": res_dir, "algorithms": ["aes"], "bytes": size}
+        names = [n for n, f in FINDERS.items() if not f.missing()]
+        codes = scan_all(mem_path, res_dir, names, log=quiet, page_filter=True)
+        return {"results": res_dir, "algorithms": names, "bytes": size,
+                "code": max(codes.values(), key=abs, default=0)}
+    if kind == "parallel":
+        res_dir = os.path.join(work, "parallel")
+        # Finders that need a file get their ranges copied into the bench's work folder.
+        settings = ScanSettings(copy_dir=os.path.join(work, "copies"))
+        count = parallel_scan(name, mem_path, res_dir, settings, log=quiet)
+        return {"results": res_dir, "algorithms": [name], "bytes": size, "code": 0 if count >= 0 else 1}
+    res_dir = _source_dir(work)
+    names = _present(res_dir)
+    if kind == "index":
+        offset_index.build(mem_path, res_dir)
+        return {"results": res_dir, "algorithms": [], "bytes": size}
+    if name == "verify":
+        # Fails the stage when fast zeroize and zeroize_dump disagree.
+        same = zeroize.verify_fast(mem_path, res_dir, names, log=quiet)
+        return {"results": res_dir, "algorithms": [], "bytes": size, "code": 0 if same else 1}
+    if name == "fast":
+        out = zeroize.fast_zeroize(mem_path, res_dir, names, "fast.mem", log=quiet)["output"]
+        return {"results": res_dir, "algorithms": [], "bytes": size, "zeroized": out, "names": names}
+    code = zeroize.run_zeroize(mem_path, res_dir, names, "dump.mem", log=quiet)
+    return {"results": res_dir, "algorithms": [], "bytes": size, "code": code,
+            "zeroized": zeroize.output_path(res_dir, "dump.mem"), "names": names}
+
+
+def _measure(stage: str, mem_path: str, work: str) -> dict:
+    """Runs in a fresh process: time a stage and read its peak RSS."""
+    start = time.monotonic()
+    try:
+        info = _execute(stage, mem_path, work)
+    except Exception as e:
+        info = {"error": str(e)}
+    info["seconds"] = time.monotonic() - start
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    info["peak_rss_mib"] = round(max(own, children) / 1024, 1)
+    return info
+
+
+def read_offsets(res_dir: str, name: str) -> list:
+    path = offset_index.values_path(res_dir, name)
+    return [offset for offset, _ in offset_index.read_values(path)] if os.path.isfile(path) else []
+
+
+def score(truth: dict, name: str, found) -> dict:
+    """Recall and precision of ``found`` offsets against the planted ``name`` keys.
+
+    An offset is a true positive if it falls inside a planted key of that
+    algorithm; a key counts as recalled if any offset falls inside it.
+    """
+    planted = [(k["offset"], k["offset"] + k["length"]) for k in truth["keys"] if k["algorithm"] == name]
+    starts = [start for start, _ in planted]
+    hits, recalled = 0, set()
+    for offset in found:
+        i = bisect.bisect_right(starts, offset) - 1
+        if i >= 0 and offset < planted[i][1]:
+            hits += 1
+            recalled.add(i)
+    return {
+        "planted": len(planted),
+        "found": len(found),
+        "true_positives": hits,
+        "recall": round(len(recalled) / len(planted), 4) if planted else None,
+        "precision": round(hits / len(found), 4) if found else None,
+    }
+
+
+def _zeroized(truth: dict, names, path: str) -> dict:
+    """How many planted keys of ``names`` are entirely zero in the zeroized dump."""
+    keys = [k for k in truth["keys"] if k["algorithm"] in names]
+    cleared = 0
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for k in keys:
+            if mm[k["offset"]:k["offset"] + k["length"]].count(0) == k["length"]:
+                cleared += 1
+    return {"planted": len(keys), "cleared": cleared,
+            "recall": round(cleared / len(keys), 4) if keys else None}
+
+
+def run(mem_path: str, stages=None, work=None, log=print) -> dict:
+    """Measure ``stages`` (default: all available) on ``mem_path``; returns the results document."""
+    with open(truth_path(mem_path), encoding="utf-8") as f:
+        truth = json.load(f)
+    stages = stages or all_stages()
+    available = available_stages()
+    own_work = work is None
+    work = work or tempfile.mkdtemp(prefix="ramx-bench-", dir=os.path.dirname(os.path.abspath(mem_path)))
+    results = []
+    try:
+        for stage in stages:
+            if stage not in available:
+                entry = {"stage": stage, "status": "skipped", "error": "tool not available"}
+                results.append(entry)
+                log(format_entry(entry))
+                continue
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                info = pool.submit(_measure, stage, mem_path, work).result()
+            entry = {"stage": stage, "seconds": round(info["seconds"], 3), "peak_rss_mib": info["peak_rss_mib"]}
+            if "error" in info or info.get("code", 0) != 0:
+                entry["status"] = "failed"
+                entry["error"] = info.get("error", f"exit code {info.get('code')}")
+            else:
+                entry["status"] = "ok"
+                entry["mb_per_s"] = round(info["bytes"] / 1e6 / max(info["seconds"], 1e-9), 1)
+                entry["accuracy"] = {name: score(truth, name, read_offsets(info["results"], name))
+                                     for name in info["algorithms"]}
+                if "zeroized" in info:
+                    entry["accuracy"] = {"zeroized": _zeroized(truth, info["names"], info["zeroized"])}
+                full = next((r for r in results if r["stage"] == FULL_SCANS.get(stage) and r["status"] == "ok"), None)
+                if full is not None:
+                    entry["speedup"] = round(full["seconds"] / max(entry["seconds"], 1e-9), 2)
+            results.append(entry)
+            log(format_entry(entry))
+    finally:
+        if own_work:
+            shutil.rmtree(work, ignore_errors=True)
+    return {"meta": run_meta(mem_path, truth), "stages": results}
+
+
+def run_meta(mem_path: str, truth: dict) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+        "dump": os.path.abspath(mem_path),
+        "dump_bytes": truth["size"],
+        "seed": truth["seed"],
+        "keys": len(truth["keys"]),
+    }
+
+
+def format_entry(entry: dict) -> str:
+    if entry["status"] != "ok":
+        return f"{entry['stage']:18} {entry['status']}: {entry['error']}"
+    scores = " ".join(f"{name} R={s['recall']} P={s.get('precision')}"
+                      for name, s in entry["accuracy"].items())
+    speedup = f"  {entry['speedup']}x vs full scan" if "speedup" in entry else ""
+    return (f"{entry['stage']:18} {entry['seconds']:8.2f}s {entry['mb_per_s']:9.1f} MB/s "
+            f"{entry['peak_rss_mib']:8.1f} MiB  {scores}{speedup}")
+
+
+def compare(old: dict, new: dict, log=print):
+    """Log per-stage time and throughput changes between two results documents."""
+    before = {s["stage"]: s for s in old["stages"] if s["status"] == "ok"}
+    for entry in new["stages"]:
+        prev = before.get(entry["stage"])
+        if entry["status"] != "ok" or prev is None:
+            continue
+        change = (entry["seconds"] - prev["seconds"]) / max(prev["seconds"], 1e-9) * 100
+        log(f"{entry['stage']:18} {prev['seconds']:8.2f}s -> {entry['seconds']:8.2f}s ({change:+.1f}%)  "
+            f"{prev['mb_per_s']:.1f} -> {entry['mb_per_s']:.1f} MB/s  "
+            f"RSS {prev['peak_rss_mib']:.0f} -> {entry['peak_rss_mib']:.0f} MiB")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="RAM-Extractor benchmarks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="write a synthetic dump with planted keys")
+    gen.add_argument("dump", help="path of the dump to write")
+    gen.add_argument("--size-mib", type=int, default=DEFAULT_SIZE_MIB, help="dump size in MiB")
+    gen.add_argument("--keys", type=int, default=DEFAULT_KEYS, help="keys planted per algorithm")
+    gen.add_argument("--seed", type=int, default=0, help="random seed")
+    run_p = sub.add_parser("run", help="measure the stages on a generated dump")
+    run_p.add_argument("dump", help="dump written by 'generate'")
+    run_p.add_argument("-s", "--stages", nargs="+", help="stages to run (default: all available)")
+    run_p.add_argument("-o", "--output", help="results JSON file (default: bench-<time>.json)")
+    run_p.add_argument("--compare", help="earlier results JSON to compare against")
+    sub.add_parser("stages", help="list the stages that can run here")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        generate(args.dump, args.size_mib * 1024 * 1024, args.keys, args.seed)
+        return 0
+    if args.command == "stages":
+        print("\n".join(available_stages()))
+        return 0
+    results = run(args.dump, args.stages)
+    output = args.output or time.strftime("bench-%Y%m%d-%H%M%S.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), results)
+    return 0 if all(s["status"] != "failed" for s in results["stages"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""Content-addressed cache of finder results.
+
+A cache key combines a fast dump fingerprint (size plus hashes of blocks
+sampled evenly across the file, or optionally a full hash) with the finder's
+name, command-line flags and installed version.  An entry keeps the raw
+output and the ``*_values.txt`` file, so a hit restores both without
+touching the dump again.  Entries are evicted least-recently-used once the
+cache grows past ``max_bytes``.
+
+Tool versions are the dpkg version (apt-installed finders) or the git HEAD
+(finders built from a checkout) plus the binary's size and mtime, so an
+update or rebuild by the startup tasks changes every affected key;
+:meth:`ResultCache.invalidate_stale` also drops the entries it orphaned.
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+import dumps
+
+SAMPLE_COUNT = 64
+SAMPLE_SIZE = 1024 * 1024
+DEFAULT_MAX_BYTES = 20 * 1024 ** 3
+
+_fingerprints = {}
+_versions = {}
+_lock = threading.Lock()
+
+
+def default_root() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "ram-extractor")
+
+
+def fingerprint(path: str, full: bool = False) -> str:
+    """Hash of the dump's size and sampled blocks (or all of it with ``full``).
+
+    Split and compressed dumps are hashed as their files on disk,
+    concatenated.  Results are memoised per (path, inode, size, mtime) of
+    every file for this process.
+    """
+    dump = dumps.open_source(path)
+    memo = (dump.identity, full)
+    with _lock:
+        if memo in _fingerprints:
+            return _fingerprints[memo]
+    size = dump.disk_size
+    h = hashlib.blake2b(digest_size=32)
+    h.update(f"{size}:{'full' if full else SAMPLE_COUNT}".encode())
+    if not dump.is_file:
+        h.update(f":{dump.codec}:{len(dump.parts)}".encode())
+    if full or size <= SAMPLE_COUNT * SAMPLE_SIZE:
+        for pos in range(0, size, 8 * 1024 * 1024):
+            h.update(dump.read_disk(pos, 8 * 1024 * 1024))
+    else:
+        span = size - SAMPLE_SIZE
+        for i in range(SAMPLE_COUNT):
+            h.update(dump.read_disk(span * i // (SAMPLE_COUNT - 1), SAMPLE_SIZE))
+    digest = h.hexdigest()
+    with _lock:
+        _fingerprints[memo] = digest
+    return digest
+
+
+def _output(cmd, cwd=None) -> str:
+    try:
+        return subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def tool_version(finder) -> str:
+    """Identify the installed build of a finder; memoised until invalidated."""
+    with _lock:
+        if finder.name in _versions:
+            return _versions[finder.name]
+    if finder.cwd:
+        version = _output(["git", "rev-parse", "HEAD"], cwd=finder.cwd)
+        binary = os.path.join(finder.cwd, finder.argv[0])
+    else:
+        version = _output(["dpkg-query", "-W", "-f=${Version}", finder.argv[0]])
+        binary = shutil.which(finder.argv[0])
+    if binary and os.path.isfile(binary):
+        st = os.stat(binary)
+        version = f"{version}|{st.st_size}|{st.st_mtime_ns}"
+    with _lock:
+        _versions[finder.name] = version
+    return version
+
+
+class ResultCache:
+    """On-disk store of finder results keyed by dump content and tool build."""
+
+    def __init__(self, root=None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root or default_root()
+        self.max_bytes = max_bytes
+
+    def key(self, mem_path: str, finder, full_hash: bool = False) -> str:
+        ident = {
+            "dump": fingerprint(mem_path, full_hash),
+            "tool": finder.name,
+            "argv": finder.argv,
+            "version": tool_version(finder),
+        }
+        return hashlib.sha256(json.dumps(ident, sort_keys=True).encode()).hexdigest()
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def restore(self, key: str, finder, res_dir: str):
+        """Copy a cached result into ``res_dir``; returns the value count or None on a miss."""
+        entry = self._entry(key)
+        meta_path = os.path.join(entry, "meta.json")
+        if not os.path.isfile(meta_path):
+            return None
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            os.makedirs(res_dir, exist_ok=True)
+            shutil.copyfile(os.path.join(entry, "output.txt"), os.path.join(res_dir, finder.output_name))
+            shutil.copyfile(os.path.join(entry, "values.txt"), os.path.join(res_dir, finder.values_name))
+            os.utime(meta_path)
+        except (OSError, ValueError):
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        return meta.get("values")
+
+    def store(self, key: str, finder, res_dir: str, mem_path: str, values: int):
+        """Save the finder's result files from ``res_dir`` under ``key``."""
+        entry = self._entry(key)
+        tmp = f"{entry}.tmp-{os.getpid()}-{threading.get_ident()}"
+        os.makedirs(tmp, exist_ok=True)
+        try:
+            shutil.copyfile(os.path.join(res_dir, finder.output_name), os.path.join(tmp, "output.txt"))
+            shutil.copyfile(os.path.join(res_dir, finder.values_name), os.path.join(tmp, "values.txt"))
+            meta = {
+                "tool": finder.name,
+                "version": tool_version(finder),
+                "argv": finder.argv,
+                "dump": os.path.abspath(mem_path),
+                "values": values,
+                "created": time.time(),
+            }
+            with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f, indent=2)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp, entry)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+
+    def _entries(self):
+        if not os.path.isdir(self.root):
+            return
+        for shard in os.listdir(self.root):
+            shard_dir = os.path.join(self.root, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                entry = os.path.join(shard_dir, name)
+                meta_path = os.path.join(entry, "meta.json")
+                if ".tmp-" not in name and os.path.isfile(meta_path):
+                    yield entry, meta_path
+
+    def evict(self):
+        """Drop least-recently-used entries until the cache fits in ``max_bytes``."""
+        entries, total = [], 0
+        for entry, meta_path in self._entries():
+            size = sum(os.path.getsize(os.path.join(entry, n)) for n in os.listdir(entry))
+            entries.append((os.path.getmtime(meta_path), size, entry))
+            total += size
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def invalidate_stale(self, finders) -> int:
+        """Forget memoised tool versions and drop entries made by other builds.
+
+        Call after the tools were installed, updated or rebuilt.  Returns
+        the number of entries removed.
+        """
+        with _lock:
+            _versions.clear()
+        current = {f.name: tool_version(f) for f in finders}
+        removed = 0
+        for entry, meta_path in list(self._entries()):
+            try:
+                with open(meta_path, encoding="utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                meta = {}
+            if meta.get("tool") in current and meta.get("version") != current[meta.get("tool")]:
+                shutil.rmtree(entry, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
@@ -0,0 +1,307 @@
+"""Headless batch mode: scan, parse and zeroize many dumps without the GUI.
+
+Imports nothing from Qt, so it starts quickly on scan servers without a
+display.  Example::
+
+    python cli.py /cases/dumps -o /cases/results -a aes rsa -j 2 --json
+
+Every dump gets its own results folder with the same files the GUI
+writes.  With more than one dump that is ``<results>/<dump file name>``,
+without segment number or compression suffix, plus a short hash of the
+dump's path when two dumps share that name.  Dumps may be split (``mem.001``…) or compressed (``.gz``, ``.zst``, ``.lz4``); they are
+streamed into the scans without writing a raw copy.  rsakeyfind,
+interrogate and parallel scans of compressed dumps need random access and
+fail on such dumps unless ``--raw-copy-dir`` names a folder for a
+temporary raw copy; parallel rsakeyfind and interrogate scans copy their
+byte ranges there too and fail without it.
+``--prefilter`` skips pages that cannot hold a key (see prefilter.py).  The exit code
+is 0 when every job succeeded, 1 when any failed and 2 on usage errors;
+``--json`` prints a per-dump summary with status, exit codes, value counts
+and timings.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aesfind
+import dumps
+from cache import DEFAULT_MAX_BYTES, ResultCache
+from finders import FINDERS
+from jobs import Job, JobState
+import metrics
+import progress
+import offset_index
+from parallel import ScanSettings, parallel_scan
+from pipeline import run_finder, scan_all
+import prefilter
+import zeroize
+
+DUMP_SUFFIXES = (".mem", ".raw", ".bin", ".dmp", ".lime", ".vmem", ".img")
+# Seconds between progress lines for one step.
+PROGRESS_INTERVAL = 5.0
+
+_print_lock = threading.Lock()
+
+
+def is_dump_name(path: str) -> bool:
+    """Whether a file in a scanned directory is a dump.
+
+    Dump suffixes count with or without a compression suffix; a split dump
+    counts once, by its first segment.
+    """
+    if dumps.SEGMENT_RE.search(path):
+        return not dumps.is_later_segment(path)
+    return dumps.strip_suffixes(path).lower().endswith(DUMP_SUFFIXES)
+
+
+def collect_dumps(paths) -> list:
+    """Expand the given files and directories into a sorted list of dumps.
+
+    Split dumps are listed by their first segment.
+    """
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for entry in sorted(os.listdir(path)):
+                full = os.path.join(path, entry)
+                if os.path.isfile(full) and is_dump_name(full):
+                    found.append(full)
+        elif os.path.isfile(path):
+            found.append(path)
+        else:
+            raise FileNotFoundError(f"Memory file not found: {path}")
+    return found
+
+
+def make_logger(prefix: str, quiet: bool = False):
+    def log(msg: str):
+        if quiet:
+            return
+        with _print_lock:
+            for line in str(msg).splitlines() or [""]:
+                print(f"[{prefix}] {line}", file=sys.stderr)
+    return log
+
+
+def make_progress(dump: str, step: str, mode: str, log):
+    """Progress callback for one step: text lines through ``log`` or JSON lines on stderr."""
+    if mode == "none":
+        return None
+    rate = progress.Rate()
+    last = [0.0]
+
+    def report(done, total):
+        r, eta = rate.update(done, total)
+        now = time.monotonic()
+        if now - last[0] < PROGRESS_INTERVAL and done < total:
+            return
+        last[0] = now
+        if mode == "json":
+            line = {"dump": dump, "step": step, "done": done, "total": total,
+                    "rate": None if r is None else round(r), "eta": None if eta is None else round(eta, 1)}
+            with _print_lock:
+                print(json.dumps(line), file=sys.stderr)
+        else:
+            log(f"{step}: {progress.format_progress(done, total, r, eta)}")
+    return report
+
+
+def process_dump(mem_path: str, res_dir: str, args) -> dict:
+    """Scan one dump with the selected finders and optionally zeroize it."""
+    log = make_logger(os.path.basename(mem_path), args.quiet)
+    job = Job("batch", os.path.basename(mem_path), mem_path, res_dir)
+    job.set_state(JobState.RUNNING)
+    os.makedirs(res_dir, exist_ok=True)
+    result = {"dump": mem_path, "results": res_dir, "algorithms": {}, "timings": {}}
+    failed = False
+    names = list(args.algorithms)
+    steps = {}
+    mode = "none" if args.quiet and args.progress == "text" else args.progress
+
+    def reporter(step):
+        return make_progress(mem_path, step, mode, log)
+
+    try:
+        if args.aes_engine == "builtin" and "aes" in names:
+            names.remove("aes")
+            start = time.monotonic()
+            with metrics.ThreadUsage() as usage:
+                count = aesfind.run(mem_path, res_dir, log=log, progress=reporter("aes"),
+                                    page_filter=args.prefilter)
+            steps["aes"] = usage.usage
+            result["timings"]["aes"] = round(time.monotonic() - start, 3)
+            result["algorithms"]["aes"] = {"code": 0, "values": count}
+
+        if args.mode == "all" and names:
+            start = time.monotonic()
+            codes = scan_all(mem_path, res_dir, names, log=log, usage=steps, progress=reporter("scan all"),
+                             page_filter=args.prefilter, copy_dir=args.raw_copy_dir)
+            result["timings"]["scan_all"] = round(time.monotonic() - start, 3)
+            for name in names:
+                code = codes.get(name, -1)
+                failed |= code != 0
+                result["algorithms"][name] = {"code": code, "values": _count_values(res_dir, name)}
+        elif names:
+            settings = ScanSettings(args.workers, args.chunk_mib * 1024 * 1024, copy_dir=args.raw_copy_dir)
+            if args.mode == "parallel" and args.prefilter:
+                log("The page pre-filter does not apply to parallel scans; scanning whole ranges.")
+            for name in names:
+                start = time.monotonic()
+                steps[name] = {}
+                if args.mode == "parallel":
+                    count = parallel_scan(name, mem_path, res_dir, settings, log=log, usage=steps[name],
+                                          progress=reporter(name))
+                    code = 0 if count >= 0 else 1
+                else:
+                    code, count = run_finder(name, mem_path, res_dir, log=log, cache=args.cache,
+                                             full_hash=args.full_hash, usage=steps[name],
+                                             progress=reporter(name), page_filter=args.prefilter,
+                                             copy_dir=args.raw_copy_dir)
+                result["timings"][name] = round(time.monotonic() - start, 3)
+                failed |= code != 0
+                result["algorithms"][name] = {"code": code, "values": count}
+
+        if any(os.path.isfile(offset_index.values_path(res_dir, n)) for n in offset_index.ALGORITHMS):
+            result["index"] = offset_index.build(mem_path, res_dir, log=log)
+            with offset_index.OffsetIndex(offset_index.index_path(res_dir)) as index:
+                log(index.summary())
+
+        if args.zeroize and not failed:
+            start = time.monotonic()
+            if args.zeroize_mode == "fast" or not zeroize.binary_supports(mem_path):
+                if args.zeroize_mode != "fast":
+                    log("zeroize_dump needs a single raw dump, using fast zeroize instead.")
+                result["zeroize"] = zeroize.fast_zeroize(mem_path, res_dir, args.zeroize, args.zero_name, log=log)
+                if args.verify_fast:
+                    if zeroize.binary_supports(mem_path) and zeroize.find_binary():
+                        result["zeroize"]["verified"] = zeroize.verify_fast(mem_path, res_dir, args.zeroize, log=log)
+                        failed |= not result["zeroize"]["verified"]
+                    else:
+                        log("Cannot verify fast zeroize: it needs zeroize_dump and a single raw dump.")
+            else:
+                code = zeroize.run_zeroize(mem_path, res_dir, args.zeroize, args.zero_name, log=log)
+                result["zeroize"] = {"code": code, "output": zeroize.output_path(res_dir, args.zero_name)}
+                failed |= code != 0
+            result["timings"]["zeroize"] = round(time.monotonic() - start, 3)
+    except Exception as e:
+        log(f"Error: {e}")
+        job.set_state(JobState.FAILED, e)
+    else:
+        job.set_state(JobState.FAILED if failed else JobState.DONE,
+                      "one or more steps failed" if failed else None)
+    job.values = sum(a["values"] for a in result["algorithms"].values() if a["values"] > 0)
+    job.metrics.update(metrics.combine(steps.values()), steps=steps)
+    result["status"] = job.state.value
+    result["error"] = job.error
+    result["elapsed"] = round(job.elapsed, 3)
+    try:
+        result["metrics"] = metrics.write_job(job)
+    except OSError as e:
+        log(f"Could not write job metrics: {e}")
+    return result
+
+
+def _count_values(res_dir: str, name: str) -> int:
+    path = os.path.join(res_dir, FINDERS[name].values_name)
+    if not os.path.isfile(path):
+        return 0
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="RAM-Extractor headless batch mode.")
+    parser.add_argument("dumps", nargs="+", help="memory dumps (raw, split or compressed) or directories containing them")
+    parser.add_argument("-o", "--results", required=True, help="folder for results")
+    parser.add_argument("-a", "--algorithms", nargs="+", choices=sorted(FINDERS),
+                        default=list(FINDERS), help="finders to run (default: all)")
+    parser.add_argument("-m", "--mode", choices=("single", "all", "parallel"), default="single",
+                        help="one finder at a time, one pass for all finders, or chunked parallel")
+    parser.add_argument("--aes-engine", choices=("aeskeyfind", "builtin"), default="aeskeyfind",
+                        help="use aeskeyfind or the built-in NumPy AES detector")
+    parser.add_argument("--prefilter", action="store_true",
+                        help="scan only pages that are not zero, constant or low-entropy (needs NumPy)")
+    parser.add_argument("--raw-copy-dir", default=None,
+                        help="folder for temporary raw copies of split or compressed dumps, and of the "
+                             "ranges of parallel rsakeyfind/interrogate scans, for finders that cannot "
+                             "read them through a pipe (default: refuse)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="dumps processed concurrently")
+    parser.add_argument("--workers", type=int, default=None, help="parallel mode: worker processes")
+    parser.add_argument("--chunk-mib", type=int, default=256, help="parallel mode: chunk size in MiB")
+    parser.add_argument("-z", "--zeroize", nargs="+", choices=sorted(zeroize.FLAGS), default=[],
+                        help="zeroize these algorithms' keys after scanning")
+    parser.add_argument("--zero-name", default="", help="filename for the zeroed dump")
+    parser.add_argument("--zeroize-mode", choices=("zeroize_dump", "fast"), default="zeroize_dump",
+                        help="rewrite the dump with zeroize_dump, or clone it and patch key regions")
+    parser.add_argument("--verify-fast", action="store_true",
+                        help="fast mode: also run zeroize_dump and check both outputs are identical")
+    parser.add_argument("--no-cache", action="store_true", help="always rescan, ignoring cached results")
+    parser.add_argument("--cache-dir", default=None, help="result cache folder")
+    parser.add_argument("--cache-max-gib", type=float, default=DEFAULT_MAX_BYTES / 1024 ** 3,
+                        help="evict least-recently-used results beyond this size")
+    parser.add_argument("--full-hash", action="store_true",
+                        help="key the cache on a full hash of the dump instead of sampled blocks")
+    parser.add_argument("--json", action="store_true", help="print a JSON summary on stdout")
+    parser.add_argument("-q", "--quiet", action="store_true", help="suppress tool output")
+    parser.add_argument("--progress", choices=("text", "json", "none"), default="text",
+                        help="report scan progress as log lines or JSON lines on stderr")
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        paths = collect_dumps(args.dumps)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    if not paths:
+        parser.error("no memory dumps found")
+    if args.prefilter and prefilter.np is None:
+        parser.error("numpy is required for --prefilter")
+    args.cache = None
+    if not args.no_cache:
+        args.cache = ResultCache(args.cache_dir, int(args.cache_max_gib * 1024 ** 3))
+    for name in args.algorithms:
+        if name == "aes" and args.aes_engine == "builtin":
+            continue
+        error = FINDERS[name].missing()
+        if error:
+            parser.error(error)
+
+    names = [dumps.strip_suffixes(os.path.basename(p)) for p in paths]
+    clashes = {name for name in names if names.count(name) > 1}
+
+    def res_dir_for(path):
+        if len(paths) == 1:
+            return args.results
+        name = dumps.strip_suffixes(os.path.basename(path))
+        if name in clashes:
+            # The same name in another folder, or raw and compressed copies of one dump.
+            name += "-" + hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:8]
+        return os.path.join(args.results, name)
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        results = list(pool.map(lambda p: process_dump(p, res_dir_for(p), args), paths))
+    summary = {
+        "ok": all(r["status"] == JobState.DONE.value for r in results),
+        "elapsed": round(time.monotonic() - start, 3),
+        "dumps": results,
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        for r in results:
+            counts = ", ".join(f"{n}={a['values']}" for n, a in r["algorithms"].items())
+            print(f"{r['status']:6} {r['elapsed']:9.1f}s  {r['dump']}  {counts}")
+    return 0 if summary["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
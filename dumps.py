@@ -0,0 +1,538 @@
+"""Dump inputs: raw files, split segments and compressed acquisitions.
+
+A dump path may name a raw file, the first segment of a split dump
+(``mem.001``; ``mem.002``… next to it are read after it, in order) or a
+file compressed with gzip (``.gz``), zstd (``.zst``) or LZ4 (``.lz4``);
+split compressed streams (``mem.raw.zst.001``…) work too.  Scans read the
+logical, raw byte stream front to back (:meth:`DumpSource.open`), so every
+offset a finder reports is already an offset into the raw dump and nothing
+is written to disk.  Decompression runs in the ``pigz``/``gzip``,
+``zstd`` or ``lz4`` command when one is installed, a separate process that
+overlaps with scanning, and falls back to the Python module otherwise.
+
+Split raw dumps are also readable at any offset.  Finders and steps that
+need one seekable file get a temporary raw copy (:func:`materialize`), but
+only in a folder the user chose for it; without one they fail with an
+error saying so.
+"""
+import bisect
+import contextlib
+import gzip
+import os
+import re
+import shutil
+import stat
+import subprocess
+import tempfile
+import threading
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - depends on the environment
+    lz4_frame = None
+
+SEGMENT_RE = re.compile(r"\.(\d{3,})$")
+CODECS = {".gz": "gzip", ".zst": "zstd", ".lz4": "lz4"}
+# codec -> commands writing the decompressed stream to stdout, preferred first
+COMMANDS = {
+    "gzip": (["pigz", "-dc"], ["gzip", "-dc"]),
+    "zstd": (["zstd", "-dcq"],),
+    "lz4": (["lz4", "-dcq"],),
+}
+MODULES = {"gzip": "gzip", "zstd": "zstandard", "lz4": "lz4"}
+READ_SIZE = 8 * 1024 * 1024
+
+# Logical sizes of compressed dumps, learnt whenever one is read to the end.
+_sizes = {}
+_lock = threading.Lock()
+
+
+def segments(path: str) -> list:
+    """``path`` followed by the rest of its split dump, or just ``path``."""
+    m = SEGMENT_RE.search(path)
+    if not m:
+        return [path]
+    base, digits = path[:m.start()], m.group(1)
+    parts, n = [], int(digits)
+    while os.path.isfile(f"{base}.{n:0{len(digits)}d}"):
+        parts.append(f"{base}.{n:0{len(digits)}d}")
+        n += 1
+    return parts or [path]
+
+
+def is_later_segment(path: str) -> bool:
+    """Whether ``path`` continues a split dump (its predecessor exists)."""
+    m = SEGMENT_RE.search(path)
+    if not m or int(m.group(1)) == 0:
+        return False
+    digits = m.group(1)
+    return os.path.isfile(f"{path[:m.start()]}.{int(digits) - 1:0{len(digits)}d}")
+
+
+def strip_suffixes(name: str) -> str:
+    """``name`` without its segment number and compression suffix."""
+    name = SEGMENT_RE.sub("", name)
+    root, ext = os.path.splitext(name)
+    return root if ext.lower() in CODECS else name
+
+
+def decompressor(codec: str):
+    """The first installed decompression command for ``codec``, or None."""
+    for cmd in COMMANDS[codec]:
+        if shutil.which(cmd[0]):
+            return cmd
+    return None
+
+
+def open_source(path: str):
+    return DumpSource(path)
+
+
+class DumpSource:
+    """A dump as its files on disk: ``parts`` (one or more) and ``codec`` (None when raw)."""
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self.parts = [os.path.abspath(p) for p in segments(path)]
+        ext = os.path.splitext(SEGMENT_RE.sub("", self.parts[0]))[1].lower()
+        self.codec = CODECS.get(ext)
+        stats = [os.stat(p) for p in self.parts]
+        self.identity = tuple((p, st.st_ino, st.st_size, st.st_mtime_ns)
+                              for p, st in zip(self.parts, stats))
+        self._starts = [0]
+        for st in stats:
+            self._starts.append(self._starts[-1] + st.st_size)
+        self.disk_size = self._starts[-1]
+
+    @property
+    def is_file(self) -> bool:
+        """A single raw file: tools and mmap can use ``path`` directly."""
+        return self.codec is None and len(self.parts) == 1
+
+    @property
+    def seekable(self) -> bool:
+        return self.codec is None
+
+    @property
+    def size(self):
+        """Logical (raw) size, or None for a compressed dump that was not read through yet."""
+        if self.codec is None:
+            return self.disk_size
+        with _lock:
+            return _sizes.get(self.identity)
+
+    def describe(self) -> str:
+        text = os.path.basename(self.parts[0])
+        if len(self.parts) > 1:
+            text += f" + {len(self.parts) - 1} segments"
+        if self.codec:
+            text += f", {self.codec}"
+        size = self.disk_size / 1024 ** 2
+        return f"{text}, {size / 1024:.1f} GiB on disk" if size >= 1024 else f"{text}, {size:.0f} MiB on disk"
+
+    def _spans(self, offset: int, length: int):
+        """``(part, offset in part, length)`` pieces of a range of the concatenated files."""
+        i = max(0, bisect.bisect_right(self._starts, offset) - 1)
+        while length > 0 and i < len(self.parts):
+            inner = offset - self._starts[i]
+            n = min(length, self._starts[i + 1] - offset)
+            if n > 0:
+                yield self.parts[i], inner, n
+                offset += n
+                length -= n
+            i += 1
+
+    def read_disk(self, offset: int, length: int) -> bytes:
+        """Bytes of the files on disk, concatenated (the dump itself when raw)."""
+        out = bytearray()
+        for part, inner, n in self._spans(offset, length):
+            with open(part, "rb") as f:
+                f.seek(inner)
+                out += f.read(n)
+        return bytes(out)
+
+    def copy_range(self, dst_fd: int, offset: int, length: int):
+        """Write ``[offset, offset + length)`` of a raw dump to ``dst_fd`` in the kernel.
+
+        Into a regular file this is ``copy_file_range``, which shares the
+        blocks instead of copying them on file systems with reflinks.
+        """
+        if not self.seekable:
+            raise ValueError(f"{self.describe()} is compressed and cannot be read at an offset")
+        regular = stat.S_ISREG(os.fstat(dst_fd).st_mode)
+        for part, inner, n in self._spans(offset, length):
+            src_fd = os.open(part, os.O_RDONLY)
+            try:
+                while n > 0:
+                    done = 0
+                    if regular:
+                        try:
+                            done = os.copy_file_range(src_fd, dst_fd, min(n, 1 << 30), inner)
+                        except OSError:
+                            regular = False
+                    if not regular:
+                        done = os.sendfile(dst_fd, src_fd, inner, min(n, 1 << 30))
+                    if done == 0:
+                        break
+                    inner += done
+                    n -= done
+            finally:
+                os.close(src_fd)
+
+    def open(self):
+        """A :class:`DumpReader` over the logical bytes."""
+        return DumpReader(self)
+
+    def view(self, offsets=(), width: int = 0):
+        """Random access to the dump for index building without a raw copy.
+
+        Raw dumps are read on demand; a compressed one is read through once
+        and only ``width`` bytes from each of ``offsets`` are kept.  The view
+        supports ``len()``, indexing and slicing.
+        """
+        if self.seekable:
+            return _SegmentView(self)
+        return _Excerpts(self, offsets, width)
+
+    def extract(self, dst_fd: int) -> tuple:
+        """Write the raw dump into ``dst_fd``; returns ``(method, bytes written)``.
+
+        Segments are copied in the kernel; decompressed data skips all-zero
+        chunks, leaving holes.
+        """
+        if self.seekable:
+            for part, start in zip(self.parts, self._starts):
+                src_fd = os.open(part, os.O_RDONLY)
+                try:
+                    _copy_at(src_fd, dst_fd, start, self._starts[self.parts.index(part) + 1] - start)
+                finally:
+                    os.close(src_fd)
+            os.ftruncate(dst_fd, self.disk_size)
+            return "segment copy", self.disk_size
+        written, zero = 0, bytes(READ_SIZE)
+        buf = bytearray(READ_SIZE)
+        with self.open() as reader:
+            while True:
+                n = reader.readinto_full(buf)
+                if not n:
+                    break
+                if buf[:n] != zero[:n]:
+                    os.pwrite(dst_fd, memoryview(buf)[:n], reader.position - n)
+                    written += n
+            os.ftruncate(dst_fd, reader.position)
+        return "decompress", written
+
+
+def _copy_at(src_fd: int, dst_fd: int, dst_offset: int, length: int):
+    """Copy all of ``src_fd`` to ``dst_offset``, in the kernel where possible."""
+    pos = 0
+    while pos < length:
+        try:
+            n = os.copy_file_range(src_fd, dst_fd, min(length - pos, 1 << 30), pos, dst_offset + pos)
+        except OSError:
+            chunk = os.pread(src_fd, min(length - pos, READ_SIZE), pos)
+            n = os.pwrite(dst_fd, chunk, dst_offset + pos) if chunk else 0
+        if n == 0:
+            break
+        pos += n
+
+
+class _PartReader:
+    """Reads files back to back; ``consumed`` counts the bytes read."""
+
+    def __init__(self, parts, starts=None):
+        self.parts = list(parts)
+        self.consumed = 0
+        self._starts = starts
+        self._index = 0
+        self._file = None
+
+    def seek(self, offset: int):
+        """Continue at ``offset`` into the concatenated files (``starts`` must be given)."""
+        i = max(0, bisect.bisect_right(self._starts, offset) - 1)
+        if i != self._index or self._file is None:
+            self.close()
+            self._index = i
+            if i >= len(self.parts):
+                self.consumed = offset
+                return
+            self._file = open(self.parts[i], "rb", buffering=0)
+        self._file.seek(offset - self._starts[i])
+        self.consumed = offset
+
+    def readinto(self, buf) -> int:
+        while self._index < len(self.parts):
+            if self._file is None:
+                self._file = open(self.parts[self._index], "rb", buffering=0)
+            n = self._file.readinto(buf)
+            if n:
+                self.consumed += n
+                return n
+            self._file.close()
+            self._file = None
+            self._index += 1
+        return 0
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            chunks = []
+            while True:
+                chunk = self.read(READ_SIZE)
+                if not chunk:
+                    return b"".join(chunks)
+                chunks.append(chunk)
+        buf = bytearray(size)
+        return bytes(buf[:self.readinto(buf)])
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class DumpReader:
+    """The logical bytes of a dump, read front to back.
+
+    ``position`` is the logical offset reached and ``consumed`` the bytes of
+    the files on disk read so far (the same for raw dumps); progress is
+    ``consumed`` against :attr:`DumpSource.disk_size`.
+    """
+
+    def __init__(self, source: DumpSource):
+        self.source = source
+        self.position = 0
+        self._parts = _PartReader(source.parts, source._starts)
+        self._proc = self._input = self._feeder = None
+        if source.codec is None:
+            self._stream = self._parts
+            return
+        cmd = decompressor(source.codec)
+        if cmd is not None:
+            self._start(cmd)
+        else:
+            self._stream = self._module_stream()
+
+    def _start(self, cmd):
+        if len(self.source.parts) == 1:
+            # The child shares this file's offset, which gives ``consumed``.
+            self._input = open(self.source.parts[0], "rb")
+        self._proc = subprocess.Popen(cmd, stdin=self._input or subprocess.PIPE,
+                                      stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._stream = self._proc.stdout
+        if self._input is None:
+            self._feeder = threading.Thread(target=self._feed, daemon=True)
+            self._feeder.start()
+
+    def _feed(self):
+        buf = bytearray(READ_SIZE)
+        try:
+            while True:
+                n = self._parts.readinto(buf)
+                if not n:
+                    break
+                self._proc.stdin.write(memoryview(buf)[:n])
+        except (BrokenPipeError, ValueError):
+            pass
+        finally:
+            self._parts.close()
+            try:
+                self._proc.stdin.close()
+            except OSError:
+                pass
+
+    def _module_stream(self):
+        codec = self.source.codec
+        if codec == "gzip":
+            return gzip.GzipFile(fileobj=self._parts, mode="rb")
+        if codec == "zstd" and zstandard is not None:
+            return zstandard.ZstdDecompressor().stream_reader(self._parts, read_across_frames=True)
+        if codec == "lz4" and lz4_frame is not None:
+            return lz4_frame.LZ4FrameFile(self._parts, mode="rb")
+        names = " or ".join(cmd[0] for cmd in COMMANDS[codec])
+        raise RuntimeError(f"Reading {codec} dumps needs the {names} command "
+                           f"or the {MODULES[codec]} Python module")
+
+    @property
+    def consumed(self) -> int:
+        if self._input is not None:
+            try:
+                return os.lseek(self._input.fileno(), 0, os.SEEK_CUR)
+            except (OSError, ValueError):
+                return self.source.disk_size
+        return self._parts.consumed
+
+    def readinto(self, buf) -> int:
+        n = self._stream.readinto(buf)
+        if n:
+            self.position += n
+            return n
+        self._finish()
+        return 0
+
+    def readinto_full(self, buf) -> int:
+        """Fill ``buf`` unless the dump ends first; returns the bytes read."""
+        view, filled = memoryview(buf), 0
+        while filled < len(buf):
+            n = self.readinto(view[filled:])
+            if not n:
+                break
+            filled += n
+        return filled
+
+    def skip(self, n: int) -> int:
+        """Move ``n`` bytes ahead without returning them; returns the bytes skipped.
+
+        Raw dumps seek; compressed ones are decompressed and discarded.
+        """
+        if self.source.seekable:
+            n = max(0, min(n, self.source.disk_size - self.position))
+            self._parts.seek(self.position + n)
+            self.position += n
+            return n
+        buf, skipped = bytearray(min(n, READ_SIZE)), 0
+        while skipped < n:
+            got = self.readinto(memoryview(buf)[:min(len(buf), n - skipped)])
+            if not got:
+                break
+            skipped += got
+        return skipped
+
+    def _finish(self):
+        if self._proc is not None and self._proc.returncode is None:
+            code = self._proc.wait()
+            if code != 0:
+                error = self._proc.stderr.read().decode(errors="replace").strip()
+                raise OSError(f"Decompressing {self.source.describe()} failed: {error or f'exit code {code}'}")
+        if self.source.codec is not None:
+            with _lock:
+                _sizes[self.source.identity] = self.position
+
+    def close(self):
+        if self._proc is not None:
+            if self._proc.poll() is None:
+                self._proc.kill()
+            self._proc.wait()
+            for pipe in (self._proc.stdout, self._proc.stderr):
+                pipe.close()
+        if self._feeder is not None:
+            self._feeder.join()
+        if self._input is not None:
+            self._input.close()
+        if self._stream is not self._parts and self._proc is None:
+            self._stream.close()
+        self._parts.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _SegmentView:
+    def __init__(self, source: DumpSource):
+        self.source = source
+
+    def __len__(self):
+        return self.source.disk_size
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, _ = key.indices(len(self))
+            return self.source.read_disk(start, max(0, stop - start))
+        if key < 0:
+            key += len(self)
+        data = self.source.read_disk(key, 1)
+        if not data:
+            raise IndexError(key)
+        return data[0]
+
+
+class _Excerpts:
+    """``width`` bytes at each of ``offsets`` of a compressed dump, gathered in one pass."""
+
+    def __init__(self, source: DumpSource, offsets, width: int):
+        self._starts = sorted(set(offsets)) if width else []
+        self._data = {}
+        self._size = source.size
+        if not self._starts and self._size is not None:
+            return
+        buf = bytearray(READ_SIZE)
+        with source.open() as reader:
+            i = 0
+            while True:
+                base = reader.position
+                n = reader.readinto_full(buf)
+                if not n:
+                    break
+                # excerpts that overlap this chunk
+                i = bisect.bisect_left(self._starts, base - width + 1, lo=i)
+                j = i
+                while j < len(self._starts) and self._starts[j] < base + n:
+                    start = self._starts[j]
+                    lo, hi = max(start, base), min(start + width, base + n)
+                    piece = self._data.setdefault(start, bytearray())
+                    if len(piece) == lo - start:
+                        piece += buf[lo - base:hi - base]
+                    j += 1
+            self._size = reader.position
+
+    def __len__(self):
+        return self._size
+
+    def _piece(self, index: int):
+        i = bisect.bisect_right(self._starts, index) - 1
+        if i < 0:
+            raise KeyError(f"offset {index:#x} was not read")
+        start = self._starts[i]
+        piece = self._data.get(start, b"")
+        if index - start >= len(piece):
+            raise KeyError(f"offset {index:#x} was not read")
+        return start, piece
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, _ = key.indices(len(self))
+            if stop <= start:
+                return b""
+            first, piece = self._piece(start)
+            return bytes(piece[start - first:stop - first])
+        if key < 0:
+            key += len(self)
+        first, piece = self._piece(key)
+        return piece[key - first]
+
+
+@contextlib.contextmanager
+def materialize(source: DumpSource, directory=None, log=print, tool: str = "This step"):
+    """Path of a raw single-file copy of the dump in ``directory``, removed on exit.
+
+    A dump that already is one raw file is used as it is.  For a split or
+    compressed one the copy is as large as the whole raw dump, so it is
+    only written when the caller names a ``directory`` for it (never the
+    results folder by default); otherwise ValueError explains that ``tool``
+    needs one seekable file.
+    """
+    if source.is_file:
+        yield source.path
+        return
+    if directory is None:
+        raise ValueError(f"{tool} needs random access to the dump and cannot read a split or compressed "
+                         f"dump ({source.describe()}) through a pipe. Decompress or join the dump first, "
+                         f"or choose a folder for a temporary raw copy of it.")
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix="ramx-raw-", suffix=".mem", dir=directory)
+    try:
+        log(f"Writing a raw copy of {source.describe()} to {path}…")
+        try:
+            method, written = source.extract(fd)
+        finally:
+            os.close(fd)
+        log(f"Raw copy ready ({method}, {written / 1024 ** 2:.0f} MiB written)")
+        yield path
+    finally:
+        os.remove(path)
@@ -0,0 +1,67 @@
+"""Definitions of the external key finders driven by RAM-Extractor."""
+import os
+import shutil
+
+from parsers import PARSERS
+
+INTERROGATE_DIR = "interrogate"
+
+
+class Finder:
+    """How one key finder is launched and where its results go.
+
+    ``streamable`` marks tools that read the dump strictly sequentially and
+    can therefore be fed through a pipe instead of a path on disk.  Only
+    aeskeyfind does; rsakeyfind and interrogate size the file and load or
+    map it whole, so they always get a path, and split or compressed dumps
+    need a raw copy for them (see :func:`dumps.materialize`).
+    ``overlap`` is the longest key structure the tool matches, in bytes; a
+    dump split into byte ranges must overlap by at least this much so no
+    key straddling a boundary is missed.
+    """
+
+    def __init__(self, name, label, title, argv, output_name, overlap, cwd=None, streamable=False):
+        self.name = name
+        self.label = label
+        self.title = title
+        self.argv = argv
+        self.output_name = output_name
+        self.overlap = overlap
+        self.cwd = cwd
+        self.streamable = streamable
+
+    @property
+    def values_name(self) -> str:
+        return f"{self.name}_values.txt"
+
+    def command(self, mem_path: str) -> list:
+        return [*self.argv, mem_path]
+
+    def parse(self, input_path: str, out_path: str):
+        PARSERS[self.name](input_path, out_path)
+
+    def missing(self):
+        """Return an error message if the tool is not installed, else None."""
+        if self.cwd == INTERROGATE_DIR:
+            if not os.path.isdir(INTERROGATE_DIR):
+                return "interrogate directory not found. Run startup first."
+        elif shutil.which(self.argv[0]) is None:
+            return f"{self.argv[0]} not found. Run startup tasks first."
+        return None
+
+
+# Overlaps: AES-256 expanded key schedule (15 round keys * 16 bytes), an
+# RSA-8192 DER private key with headroom, the Serpent key schedule
+# (132 words) and the Twofish key-dependent S-boxes plus 40 subkeys.
+# aeskeyfind only uses the file size for its progress display, which -q
+# turns off, so its output on a FIFO is the same as on the file.
+FINDERS = {
+    "aes": Finder("aes", "AES", "aeskeyfind", ["aeskeyfind", "-v", "-q"],
+                  "aeskeyfind_output.txt", overlap=240, streamable=True),
+    "rsa": Finder("rsa", "RSA", "rsakeyfind", ["rsakeyfind"],
+                  "rsakeyfind_output.txt", overlap=16384),
+    "serpent": Finder("serpent", "Serpent", "Serpent finder", ["./interrogate", "-a", "serpent"],
+                      "serpent_output.txt", overlap=528, cwd=INTERROGATE_DIR),
+    "twofish": Finder("twofish", "Twofish", "Twofish finder", ["./interrogate", "-a", "twofish"],
+                      "twofish_output.txt", overlap=4256, cwd=INTERROGATE_DIR),
+}
@@ -0,0 +1,181 @@
+"""Job model tracking every finder run from queueing to its parsed results."""
+import enum
+import itertools
+import os
+import signal
+import threading
+import time
+
+from progress import Rate
+
+
+class JobState(enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    PARSING = "parsing"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+# Seconds between SIGTERM and SIGKILL when a job's processes are cancelled.
+TERMINATE_GRACE = 5.0
+
+
+class Cancelled(Exception):
+    """Raised inside a job's work when it notices it was cancelled."""
+
+
+def _group_alive(pgid: int) -> bool:
+    try:
+        os.killpg(pgid, 0)
+        return True
+    except (ProcessLookupError, PermissionError):
+        return False
+
+
+def kill_group(pgid: int, grace: float = TERMINATE_GRACE):
+    """SIGTERM a process group, then SIGKILL it if it is still there after ``grace`` seconds.
+
+    Does not block; the SIGKILL is sent from a timer thread.
+    """
+    try:
+        os.killpg(pgid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+
+    def escalate():
+        if _group_alive(pgid):
+            try:
+                os.killpg(pgid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+    timer = threading.Timer(grace, escalate)
+    timer.daemon = True
+    timer.start()
+
+
+class CancelToken:
+    """Cancellation flag shared by a job and the code doing its work.
+
+    Tool processes are started in their own session (process group) and
+    registered here, so :meth:`cancel` can terminate them with everything
+    they spawned; ``on_cancel`` callbacks cover work that is not a single
+    registered process.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._groups = set()
+        self._callbacks = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def register(self, pgid: int):
+        with self._lock:
+            self._groups.add(pgid)
+            cancelled = self.cancelled
+        if cancelled:
+            kill_group(pgid)
+
+    def unregister(self, pgid: int):
+        with self._lock:
+            self._groups.discard(pgid)
+
+    def on_cancel(self, callback):
+        with self._lock:
+            self._callbacks.append(callback)
+            cancelled = self.cancelled
+        if cancelled:
+            callback()
+
+    def remove_on_cancel(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def cancel(self):
+        with self._lock:
+            if self.cancelled:
+                return
+            self._event.set()
+            groups, callbacks = list(self._groups), list(self._callbacks)
+        for pgid in groups:
+            kill_group(pgid)
+        for callback in callbacks:
+            callback()
+
+    def check(self):
+        """Raise :class:`Cancelled` if the job was cancelled."""
+        if self.cancelled:
+            raise Cancelled()
+
+
+class Job:
+    """One run of a finder (or a pipeline of finders) over one dump.
+
+    ``listener`` is called with the job after every state change, from
+    whichever thread made the change.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, kind: str, title: str, mem_path: str, res_dir: str, listener=None):
+        self.id = next(Job._ids)
+        self.kind = kind
+        self.title = title
+        self.mem_path = mem_path
+        self.res_dir = res_dir
+        self.listener = listener
+        self.state = JobState.QUEUED
+        self.error = None
+        self.returncode = None
+        self.values = None
+        # resource usage of the job's tools, see metrics.py
+        self.metrics = {}
+        # (bytes done, total) once the scan reports progress
+        self.progress = None
+        self.rate = None
+        self.eta = None
+        self._rate = Rate()
+        self.priority = 0
+        self.cancel_token = CancelToken()
+        # files the job writes; removed if it is cancelled after starting
+        self.outputs = []
+        self.created = time.time()
+        self.started = None
+        self.ended = None
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (JobState.DONE, JobState.FAILED, JobState.CANCELLED)
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.ended or time.time()) - self.started
+
+    def set_progress(self, done: int, total: int):
+        """Record how far the scan has got; updates throughput and ETA."""
+        with self._lock:
+            self.rate, self.eta = self._rate.update(done, total)
+            self.progress = (done, total)
+        if self.listener is not None:
+            self.listener(self)
+
+    def set_state(self, state: JobState, error=None):
+        with self._lock:
+            self.state = state
+            if state is JobState.RUNNING and self.started is None:
+                self.started = time.time()
+            if state in (JobState.DONE, JobState.FAILED, JobState.CANCELLED):
+                self.ended = time.time()
+            if error is not None:
+                self.error = str(error)
+        if self.listener is not None:
+            self.listener(self)
@@ -0,0 +1,75 @@
+"""Coalescing of high-volume tool output into periodic log batches."""
+import os
+import threading
+
+FLUSH_INTERVAL = 0.1
+
+
+class LogBatcher:
+    """Collects log lines and passes them to ``emit`` as one string per interval.
+
+    A tool printing hundreds of thousands of lines then costs one call to
+    ``emit`` (one Qt signal) every ``interval`` seconds instead of one per
+    line.  Call :meth:`close` when the producer is done to flush the rest.
+    """
+
+    def __init__(self, emit, interval: float = FLUSH_INTERVAL):
+        self._emit = emit
+        self._interval = interval
+        self._lines = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __call__(self, line: str):
+        with self._lock:
+            self._lines.append(line)
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            lines, self._lines = self._lines, []
+        if lines:
+            self._emit("\n".join(lines))
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LogFile:
+    """Appends log lines to ``path``, written and flushed from a :class:`LogBatcher` thread.
+
+    The file is opened once, so whoever logs (the GUI thread) only appends
+    to a list; a failing write is dropped rather than reported.
+    """
+
+    def __init__(self, path: str, interval: float = FLUSH_INTERVAL):
+        self.path = os.path.abspath(path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._batcher = LogBatcher(self._write, interval)
+
+    def __call__(self, line: str):
+        self._batcher(line)
+
+    def _write(self, text: str):
+        try:
+            self._file.write(text + "\n")
+            self._file.flush()
+        except OSError:
+            pass
+
+    def close(self):
+        self._batcher.close()
+        self._file.close()
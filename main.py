@@ -1,499 +1,1011 @@
-import sys
-import os
-import subprocess
-import re
-import shutil
-
-from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QHBoxLayout,
-    QVBoxLayout, QTextEdit, QPushButton, QLabel, QLineEdit,
-    QFileDialog, QMessageBox, QCheckBox
-)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
-
-
-# ------------------------------ Workers ---------------------------------- #
-class RedirectionWorker(QThread):
-    output = pyqtSignal(str)
-    finished = pyqtSignal()
-
-    def __init__(self, command_str, cwd=None, parent=None):
-        super().__init__(parent)
-        self.command_str = command_str
-        self.cwd = cwd
-
-    def run(self):
-        self.output.emit(f"Executing command: {self.command_str}")
-        try:
-            proc = subprocess.Popen(
-                self.command_str,
-                shell=True,
-                cwd=self.cwd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True
-            )
-            for line in iter(proc.stdout.readline, ""):
-                if line:
-                    self.output.emit(line.strip())
-            proc.stdout.close()
-            proc.wait()
-            self.output.emit(f"Command finished with code: {proc.returncode}")
-        except Exception as e:
-            self.output.emit(f"Error while running command: {e}")
-        self.finished.emit()
-
-
-class CommandWorker(QThread):
-    output = pyqtSignal(str)
-    finished = pyqtSignal(int)  
-
-    def __init__(self, command, cwd=None, parent=None):
-        super().__init__(parent)
-        self.command = command
-        self.cwd = cwd
-
-    def run(self):
-        self.output.emit("Running command: " + " ".join(self.command))
-        try:
-            proc = subprocess.Popen(
-                self.command,
-                cwd=self.cwd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True
-            )
-            for line in iter(proc.stdout.readline, ""):
-                if line:
-                    self.output.emit(line.strip())
-            proc.stdout.close()
-            proc.wait()
-            self.output.emit(f"Command finished with code: {proc.returncode}")
-            self.finished.emit(proc.returncode)
-        except Exception as e:
-            self.output.emit(f"Error executing command: {e}")
-            self.finished.emit(-1)
-
-
-class StartupWorker(QThread):
-    output = pyqtSignal(str)
-
-    def run(self):
-        """Performs all startup‑time installation / build tasks."""
-        # Git
-        if self.command_exists("git"):
-            self.output.emit("Git is installed, skipping installation.")
-        else:
-            self.output.emit("Git not found, installing git…")
-            self.run_command(["sudo", "apt", "install", "-y", "git"])
-
-        # build‑essential
-        if self.command_exists("make"):
-            self.output.emit("build‑essential is installed, skipping installation.")
-        else:
-            self.output.emit("build‑essential not found, installing…")
-            self.run_command(["sudo", "apt", "install", "-y", "build-essential"])
-
-        # aes/rsakeyfind
-        self.output.emit("Installing/updating aeskeyfind…")
-        self.run_command(["sudo", "apt", "install", "-y", "aeskeyfind"])
-        self.output.emit("Installing/updating rsakeyfind…")
-        self.run_command(["sudo", "apt", "install", "-y", "rsakeyfind"])
-
-        # interrogate (serpent/twofish)
-        repo = "https://github.com/carmaa/interrogate.git"
-        interrogate_dir = "interrogate"
-        if not os.path.exists(interrogate_dir):
-            self.output.emit("Cloning interrogate…")
-            self.run_command(["git", "clone", repo, interrogate_dir])
-        else:
-            self.output.emit("Updating interrogate…")
-            self.run_command(["git", "pull"], cwd=interrogate_dir)
-        if os.path.exists(interrogate_dir):
-            self.output.emit("Building interrogate…")
-            self.run_command(["make"], cwd=interrogate_dir)
-
-        # Zeroize_dump
-        repo2 = "https://github.com/kacper0N/Zeroizer.git"
-        wyc_dir = "Zeroizer"
-        if not os.path.exists(wyc_dir):
-            self.output.emit("Cloning Zeroizer…")
-            self.run_command(["git", "clone", repo2, wyc_dir])
-        else:
-            self.output.emit("Updating Zeroizer…")
-            self.run_command(["git", "pull"], cwd=wyc_dir)
-        if os.path.exists(wyc_dir):
-            self.output.emit("Building Zeroizer…")
-            self.run_command(["make"], cwd=wyc_dir)
-
-    # -------------------- helpers -------------------- #
-    def command_exists(self, cmd: str) -> bool:
-        try:
-            result = subprocess.run(["which", cmd], capture_output=True, text=True, check=True)
-            return bool(result.stdout.strip())
-        except subprocess.CalledProcessError:
-            return False
-
-    def run_command(self, command, cwd=None):
-        try:
-            proc = subprocess.Popen(
-                command,
-                cwd=cwd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True
-            )
-            for line in iter(proc.stdout.readline, ""):
-                if line:
-                    self.output.emit(line.strip())
-            proc.stdout.close()
-            proc.wait()
-            self.output.emit(f"Command finished with code: {proc.returncode}")
-        except Exception as e:
-            self.output.emit(f"Error: {e}")
-
-
-# ------------------------------ Main Window ------------------------------ #
-class LauncherWindow(QMainWindow):
-    """Main GUI window for RAM‑Extractor."""
-
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("RAM-Extractor")  
-        self.resize(950, 650)
-        self.initUI()
-
-    # -------------------- UI setup -------------------- #
-    def initUI(self):
-        central_widget = QWidget()
-        self.setCentralWidget(central_widget)
-
-        main_layout = QHBoxLayout(central_widget)
-
-        # -------- Left: Console output -------- #
-        self.console = QTextEdit(readOnly=True)
-        self.console.setLineWrapMode(QTextEdit.NoWrap)
-        main_layout.addWidget(self.console, stretch=3)
-
-        # -------- Right: Controls -------- #
-        control_panel = QWidget()
-        control_layout = QVBoxLayout(control_panel)
-        main_layout.addWidget(control_panel, stretch=1)
-
-        # --- Startup tasks --- #
-        control_layout.addWidget(QLabel("Startup Tasks"))
-        self.startup_button = QPushButton("Check updates and install tools")
-        self.startup_button.clicked.connect(self.start_startup_tasks)
-        control_layout.addWidget(self.startup_button)
-        control_layout.addSpacing(20)
-
-        # --- Paths: memory + result folder --- #
-        control_layout.addWidget(QLabel("Path to memory for analysis:"))
-        self.mem_path_edit = QLineEdit()
-        control_layout.addWidget(self.mem_path_edit)
-        browse_mem_btn = QPushButton("Browse file")
-        browse_mem_btn.clicked.connect(self.browse_memory_path)
-        control_layout.addWidget(browse_mem_btn)
-
-        control_layout.addWidget(QLabel("Folder for results:"))  
-        self.res_path_edit = QLineEdit()
-        control_layout.addWidget(self.res_path_edit)
-        browse_res_btn = QPushButton("Browse folder")
-        browse_res_btn.clicked.connect(self.browse_results_folder)
-        control_layout.addWidget(browse_res_btn)
-        control_layout.addSpacing(20)
-
-        # --- Tool buttons --- #
-        control_layout.addWidget(QLabel("Run tools:"))
-        self.aeskey_button = QPushButton("Run aeskeyfind")
-        self.aeskey_button.clicked.connect(self.start_aeskeyfind)
-        control_layout.addWidget(self.aeskey_button)
-
-        self.rsakey_button = QPushButton("Run rsakeyfind")
-        self.rsakey_button.clicked.connect(self.start_rsakeyfind)
-        control_layout.addWidget(self.rsakey_button)
-
-        self.serpent_button = QPushButton("Run serpent finder")
-        self.serpent_button.clicked.connect(self.start_serpent)
-        control_layout.addWidget(self.serpent_button)
-
-        self.twofish_button = QPushButton("Run twofish finder")
-        self.twofish_button.clicked.connect(self.start_twofish)
-        control_layout.addWidget(self.twofish_button)
-        control_layout.addStretch()
-
-        # --- Zeroize section --- #
-        control_layout.addSpacing(10)
-        control_layout.addWidget(QLabel("Zeroize keys:"))
-
-        self.cb_aes_zero = QCheckBox("AES")      
-        self.cb_rsa_zero = QCheckBox("RSA")      
-        self.cb_serpent_zero = QCheckBox("Serpent")  
-        self.cb_twofish_zero = QCheckBox("Twofish")  
-
-        for cb in (self.cb_aes_zero, self.cb_rsa_zero, self.cb_serpent_zero, self.cb_twofish_zero):
-            control_layout.addWidget(cb)
-
-        # Filename for zeroed dump
-        control_layout.addWidget(QLabel("Filename for zeroed dump (.mem):"))
-        self.zero_filename_edit = QLineEdit()
-        self.zero_filename_edit.setPlaceholderText("zero_mem.mem")
-        control_layout.addWidget(self.zero_filename_edit)
-
-        self.zero_button = QPushButton("Zero selected keys")
-        self.zero_button.clicked.connect(self.start_zeroize_dump)
-        control_layout.addWidget(self.zero_button)
-
-    # -------------------- Logging -------------------- #
-    def log(self, msg: str):
-        """Append a message to the console."""
-        self.console.append(msg)
-
-    def separator(self):
-        """Insert a blank line to visually separate blocks of output."""
-        self.console.append("")
-
-    # -------------------- Common helpers -------------------- #
-    def browse_memory_path(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Select memory file")
-        if path:
-            self.mem_path_edit.setText(path)
-
-    def browse_results_folder(self):
-        path = QFileDialog.getExistingDirectory(self, "Select results folder")
-        if path:
-            self.res_path_edit.setText(path)
-
-    # -------------------- Startup tasks -------------------- #
-    def start_startup_tasks(self):
-        self.startup_button.setEnabled(False)
-        self.log("Starting startup tasks…")
-        self.startup_worker = StartupWorker()
-        self.startup_worker.output.connect(self.log)
-        self.startup_worker.finished.connect(lambda: (self.log("Startup tasks completed."), self.startup_button.setEnabled(True)))
-        self.startup_worker.start()
-
-    # -------------------- Parsers -------------------- #
-    def aes_parser(self, input_path: str, out_path: str):
-        try:
-            data = re.sub(r"\s+", "", open(input_path, encoding="utf-8").read())
-            pattern = r"FOUNDPOSSIBLE(128|256)-BITKEYATBYTE([0-9A-Fa-f]+)KEY"
-            pairs = [(m.group(2), m.group(1)) for m in re.finditer(pattern, data)]
-            with open(out_path, "w", encoding="utf-8") as f:
-                f.write("\n".join(f"{offset},{size}" for offset, size in pairs))
-        except Exception as e:
-            self.log(f"Error in aes_parser: {e}")
-
-    def rsa_parser(self, input_path: str, out_path: str):
-        try:
-            data = re.sub(r"\s+", "", open(input_path, encoding="utf-8").read())
-            pattern = r"FOUNDPRIVATEKEYAT([0-9A-Fa-f]+)version"
-            offsets = [m.group(1) for m in re.finditer(pattern, data)]
-            with open(out_path, "w", encoding="utf-8") as f:
-                f.write("\n".join(f"{off},0" for off in offsets))
-        except Exception as e:
-            self.log(f"Error in rsa_parser: {e}")
-
-    def twofish_parser(self, input_path: str, out_path: str):
-        try:
-            data = re.sub(r"\s+", "", open(input_path, encoding="utf-8").read())
-            pattern = r"Twofishkeyfoundat([0-9A-Fa-f]+)\."
-            offsets = [m.group(1) for m in re.finditer(pattern, data)]
-            with open(out_path, "w", encoding="utf-8") as f:
-                f.write("\n".join(f"{off},0" for off in offsets))
-        except Exception as e:
-            self.log(f"Error in twofish_parser: {e}")
-
-    def serpent_parser(self, input_path: str, out_path: str):
-        try:
-            data = re.sub(r"\s+", "", open(input_path, encoding="utf-8").read())
-            pattern = r"Found\(probable\)SERPENTkeyatoffset([0-9A-Fa-f]+):"
-            offsets = [m.group(1) for m in re.finditer(pattern, data)]
-            with open(out_path, "w", encoding="utf-8") as f:
-                f.write("\n".join(f"{off},0" for off in offsets))
-        except Exception as e:
-            self.log(f"Error in serpent_parser: {e}")
-
-    # -------------------- Tool launchers -------------------- #
-    def start_aeskeyfind(self):
-        self.separator()
-        m = self.mem_path_edit.text().strip()
-        r = self.res_path_edit.text().strip()
-        if not m or not r:
-            QMessageBox.critical(self, "Error", "Provide mem file and results folder")
-            return
-        if not os.path.isfile(m):
-            QMessageBox.critical(self, "Error", f"Memory file not found:\n{m}")
-            return
-        if shutil.which("aeskeyfind") is None:
-            QMessageBox.critical(self, "Error", "aeskeyfind not found. Run startup tasks first.")
-            return
-        os.makedirs(r, exist_ok=True)
-        out_txt = os.path.join(r, "aeskeyfind_output.txt")
-        cmd = f"aeskeyfind -v -q {m} > {out_txt}"
-        self.log("Aeskeyfind is working, please wait…")
-        self.log(f"Running aeskeyfind on: {m}")
-
-        self.aes_worker = RedirectionWorker(cmd)
-        self.aes_worker.output.connect(self.log)
-        self.aes_worker.finished.connect(lambda: self._finish_aes(out_txt, r))
-        self.aes_worker.start()
-
-    def _finish_aes(self, out_txt: str, res_dir: str):
-        self.log(f"aeskeyfind finished. Output saved to {out_txt}")
-        self.aes_parser(out_txt, os.path.join(res_dir, "aes_values.txt"))
-        self.log(f"AES values saved to {os.path.join(res_dir, 'aes_values.txt')}")
-
-    def start_rsakeyfind(self):
-        self.separator()
-        m = self.mem_path_edit.text().strip()
-        r = self.res_path_edit.text().strip()
-        if not m or not r:
-            QMessageBox.critical(self, "Error", "Provide mem file and results folder")
-            return
-        if not os.path.isfile(m):
-            QMessageBox.critical(self, "Error", f"Memory file not found:\n{m}")
-            return
-        if shutil.which("rsakeyfind") is None:
-            QMessageBox.critical(self, "Error", "rsakeyfind not found. Run startup tasks first.")
-            return
-        os.makedirs(r, exist_ok=True)
-        out_txt = os.path.join(r, "rsakeyfind_output.txt")
-        cmd = f"rsakeyfind {m} > {out_txt}"
-        self.log("Rsakeyfind is working, please wait…")
-        self.log(f"Running rsakeyfind on: {m}")
-
-        self.rsa_worker = RedirectionWorker(cmd)
-        self.rsa_worker.output.connect(self.log)
-        self.rsa_worker.finished.connect(lambda: self._finish_rsa(out_txt, r))
-        self.rsa_worker.start()
-
-    def _finish_rsa(self, out_txt: str, res_dir: str):
-        self.log(f"rsakeyfind finished. Output saved to {out_txt}")
-        self.rsa_parser(out_txt, os.path.join(res_dir, "rsa_values.txt"))
-        self.log(f"RSA values saved to {os.path.join(res_dir, 'rsa_values.txt')}")
-
-    def start_serpent(self):
-        self.separator()
-        m = self.mem_path_edit.text().strip()
-        r = self.res_path_edit.text().strip()
-        if not m or not r:
-            QMessageBox.critical(self, "Error", "Provide mem file and results folder")
-            return
-        if not os.path.isdir("interrogate"):
-            QMessageBox.critical(self, "Error", "interrogate directory not found. Run startup first.")
-            return
-        os.makedirs(r, exist_ok=True)
-        out_txt = os.path.join(r, "serpent_output.txt")
-        cmd = f"./interrogate -a serpent {m} > {out_txt}"
-        self.log("Serpent finder is working, please wait…")
-        self.log(f"Running serpent finder on: {m}")
-
-        self.serpent_worker = RedirectionWorker(cmd, cwd="interrogate")
-        self.serpent_worker.output.connect(self.log)
-        self.serpent_worker.finished.connect(lambda: self._finish_serpent(out_txt, r))
-        self.serpent_worker.start()
-
-    def _finish_serpent(self, out_txt: str, res_dir: str):
-        self.log(f"Serpent finder finished. Output saved to {out_txt}")
-        self.serpent_parser(out_txt, os.path.join(res_dir, "serpent_values.txt"))
-        self.log(f"Serpent values saved to {os.path.join(res_dir, 'serpent_values.txt')}")
-
-    def start_twofish(self):
-        self.separator()
-        m = self.mem_path_edit.text().strip()
-        r = self.res_path_edit.text().strip()
-        if not m or not r:
-            QMessageBox.critical(self, "Error", "Provide mem file and results folder")
-            return
-        if not os.path.isdir("interrogate"):
-            QMessageBox.critical(self, "Error", "interrogate directory not found. Run startup first.")
-            return
-        os.makedirs(r, exist_ok=True)
-        out_txt = os.path.join(r, "twofish_output.txt")
-        cmd = f"./interrogate -a twofish {m} > {out_txt}"
-        self.log("Twofish finder is working, please wait…")
-        self.log(f"Running twofish finder on: {m}")
-
-        self.twofish_worker = RedirectionWorker(cmd, cwd="interrogate")
-        self.twofish_worker.output.connect(self.log)
-        self.twofish_worker.finished.connect(lambda: self._finish_twofish(out_txt, r))
-        self.twofish_worker.start()
-
-    def _finish_twofish(self, out_txt: str, res_dir: str):
-        self.log(f"Twofish finder finished. Output saved to {out_txt}")
-        self.twofish_parser(out_txt, os.path.join(res_dir, "twofish_values.txt"))
-        self.log(f"Twofish values saved to {os.path.join(res_dir, 'twofish_values.txt')}")
-
-    # -------------------- zeroize_dump / zeroize -------------------- #
-    def start_zeroize_dump(self):
-        self.separator()
-        m = self.mem_path_edit.text().strip()
-        r = self.res_path_edit.text().strip()
-
-        if not m or not r:
-            QMessageBox.critical(self, "Error", "Provide mem file and results folder")
-            return
-        if not os.path.isfile(m):
-            QMessageBox.critical(self, "Error", f"Memory file not found:\n{m}")
-            return
-
-        # --- collect selected algorithms & corresponding value files --- #
-        algo_map = {
-            "aes": ("-a", self.cb_aes_zero),
-            "rsa": ("-r", self.cb_rsa_zero),
-            "serpent": ("-s", self.cb_serpent_zero),
-            "twofish": ("-t", self.cb_twofish_zero),
-        }
-
-        cli_args = []
-        selected = []
-        for name, (flag, cb) in algo_map.items():
-            if cb.isChecked():
-                val_path = os.path.join(r, f"{name}_values.txt")
-                if not os.path.isfile(val_path):
-                    QMessageBox.critical(self, "Error", f"{val_path} not found. Run {name} finder first.")
-                    return
-                cli_args.extend([flag, val_path])
-                selected.append(name)
-
-        if not selected:
-            QMessageBox.information(self, "Nothing selected", "Select at least one algorithm to zeroize.")
-            return
-
-        # --- locate zeroize_dump binary --- #
-        dump_bin = os.path.join("Zeroizer", "zeroize_dump") if os.path.isfile(os.path.join("Zeroizer", "zeroize_dump")) else "./zeroize_dump"
-        if not os.path.isfile(dump_bin):
-            QMessageBox.critical(self, "Error", "zeroize_dump binary not found. Build Zeroizer first (run startup tasks).")
-            return
-        os.chmod(dump_bin, 0o755)
-
-        # --- destination file --- #
-        filename = self.zero_filename_edit.text().strip()
-        if not filename:
-            filename = "zero_mem.mem"
-        if not filename.lower().endswith(".mem"):
-            filename += ".mem"
-        out_file = os.path.join(r, filename)
-
-        # --- run --- #
-        cmd = [dump_bin, *cli_args, "-o", out_file, m]
-        self.log("Zeroizing selected keys, please wait…")
-        self.log("Running: " + " ".join(cmd))
-
-        self.dump_worker = CommandWorker(cmd)
-        self.dump_worker.output.connect(self.log)
-        self.dump_worker.finished.connect(lambda code: self.log(f"zeroize_dump finished with exit code {code}\nZeroed dump saved to: {out_file}" if code == 0 else "zeroize_dump failed"))
-        self.dump_worker.start()
-
-
-# ------------------------------ main ------------------------------------- #
-if __name__ == "__main__":
-    
-    if not os.environ.get("XDG_RUNTIME_DIR"):
-        os.environ["XDG_RUNTIME_DIR"] = f"/run/user/{os.geteuid()}"
-
-    app = QApplication(sys.argv)
-    window = LauncherWindow()
-    window.show()
-    sys.exit(app.exec_())
+import sys
+import os
+
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QHBoxLayout,
+    QVBoxLayout, QTextEdit, QPushButton, QLabel, QLineEdit,
+    QFileDialog, QMessageBox, QCheckBox, QSpinBox, QTableView, QHeaderView,
+    QStyledItemDelegate, QStyleOptionProgressBar, QStyle
+)
+from PyQt5.QtCore import (
+    Qt, QThread, pyqtSignal, QObject, QRunnable, QThreadPool,
+    QAbstractTableModel, QModelIndex
+)
+
+import aesfind
+from cache import ResultCache
+import dumps
+from finders import FINDERS
+from jobs import Cancelled, Job, JobState
+from logbuffer import LogBatcher, LogFile
+import metrics
+import offset_index
+import progress
+from parallel import ScanSettings, parallel_scan
+from parsers import ChunkParser
+from pipeline import run_finder, scan_all
+import prefilter
+import procengine
+from provision import provision
+from scheduler import DEFAULT_MAX_IO, Scheduler
+import zeroize
+
+MAX_CONSOLE_LINES = 20000
+LOG_FILE_NAME = "ram_extractor.log"
+# Split dumps are opened by their first segment.
+DUMP_FILTER = ("Memory dumps (*.mem *.raw *.bin *.dmp *.lime *.vmem *.img *.gz *.zst *.lz4 *.000 *.001);;"
+               "All files (*)")
+
+
+# ------------------------------ Workers ---------------------------------- #
+class ProcessRunner(QObject):
+    """Runs one command on the shared :mod:`procengine` loop and reports it through signals.
+
+    Has the ``start``/``wait`` interface of the QThread workers but no
+    thread of its own.  Output arrives in batches, one ``output`` signal per
+    batch, and ``finished`` is emitted once ``returncode`` and ``usage`` are
+    set (``returncode`` is -1 if the command could not be started).
+    """
+    output = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    # ``stdout_path`` receives the command's stdout.  ``follow`` is an
+    # optional (finder name, values file) pair; stdout is then parsed on
+    # the engine's loop as it arrives, into ``parser``.  ``watch`` is an optional (dump path,
+    # callback) pair; the callback gets the command's read position in the
+    # dump as (done, total).  The command runs in its own process group,
+    # registered with ``cancel`` if given.
+    def __init__(self, command, cwd=None, stdout_path=None, follow=None, watch=None, cancel=None,
+                 timeout=None, parent=None):
+        super().__init__(parent)
+        self.command = list(command)
+        self.cwd = cwd
+        self.stdout_path = stdout_path
+        self.follow = follow
+        self.watch = watch
+        self.cancel = cancel
+        self.timeout = timeout
+        self.parser = None
+        self.returncode = None
+        self.usage = {}
+        self._future = None
+
+    def start(self):
+        text = " ".join(self.command)
+        if self.stdout_path:
+            text += f" > {self.stdout_path}"
+        self.output.emit(f"Executing command: {text}")
+        try:
+            if self.follow:
+                self.parser = ChunkParser(*self.follow)
+            self._future = procengine.submit(
+                self.command, cwd=self.cwd, stdout_path=self.stdout_path,
+                output=lambda lines: self.output.emit("\n".join(lines)),
+                parse=self.parser.feed if self.parser else None,
+                watch=self.watch, timeout=self.timeout, cancel=self.cancel)
+        except Exception as e:
+            self.output.emit(f"Error while running command: {e}")
+            self.returncode = -1
+            self.finished.emit()
+            return
+        self._future.add_done_callback(self._done)
+
+    def _done(self, future):
+        try:
+            result = future.result()
+            self.returncode, self.usage = result.returncode, result.usage
+            self.output.emit(f"Command finished with code: {self.returncode} ({metrics.summary(self.usage)})")
+        except Exception as e:
+            self.returncode = -1
+            self.output.emit(f"Error while running command: {e}")
+        self.finished.emit()
+
+    def wait(self):
+        if self._future is not None:
+            self._future.exception()
+
+
+class ScanAllWorker(QThread):
+    output = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, job, names, page_filter=False, copy_dir=None, parent=None):
+        super().__init__(parent)
+        self.job = job
+        self.names = names
+        self.page_filter = page_filter
+        self.copy_dir = copy_dir
+
+    def run(self):
+        self.job.set_state(JobState.RUNNING)
+        log = LogBatcher(self.output.emit)
+        try:
+            usage = {}
+            codes = scan_all(self.job.mem_path, self.job.res_dir, self.names, log=log, usage=usage,
+                             progress=self.job.set_progress, cancel=self.job.cancel_token,
+                             page_filter=self.page_filter, copy_dir=self.copy_dir)
+            self.job.metrics.update(metrics.combine(usage.values()), steps=usage)
+            failed = [name for name, code in codes.items() if code != 0]
+            if failed or len(codes) != len(self.names):
+                self.job.set_state(JobState.FAILED, f"failed: {', '.join(failed) or 'start-up'}")
+            else:
+                self.job.set_state(JobState.DONE)
+        except Cancelled:
+            self.job.metrics.update(metrics.combine(usage.values()), steps=usage)
+            log(f"{self.job.title} cancelled.")
+            self.job.set_state(JobState.CANCELLED)
+        except Exception as e:
+            log(f"Error during scan: {e}")
+            self.job.set_state(JobState.FAILED, e)
+        log.close()
+        self.finished.emit()
+
+
+class FinderWorker(QThread):
+    """Runs one finder on a split or compressed dump or on pre-filtered pages, streaming them in."""
+    output = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, job, cache=None, page_filter=False, copy_dir=None, parent=None):
+        super().__init__(parent)
+        self.job = job
+        self.cache = cache
+        self.page_filter = page_filter
+        self.copy_dir = copy_dir
+
+    def run(self):
+        self.job.set_state(JobState.RUNNING)
+        log = LogBatcher(self.output.emit)
+        try:
+            code, count = run_finder(self.job.kind, self.job.mem_path, self.job.res_dir, log=log,
+                                     cache=self.cache, usage=self.job.metrics,
+                                     progress=self.job.set_progress, cancel=self.job.cancel_token,
+                                     page_filter=self.page_filter, copy_dir=self.copy_dir)
+            self.job.returncode = code
+            self.job.values = count
+            if code != 0:
+                self.job.set_state(JobState.FAILED, f"exit code {code}")
+            else:
+                self.job.set_state(JobState.DONE)
+        except Cancelled:
+            log(f"{self.job.title} cancelled.")
+            self.job.set_state(JobState.CANCELLED)
+        except Exception as e:
+            log(f"Error while running {self.job.title}: {e}")
+            self.job.set_state(JobState.FAILED, e)
+        log.close()
+        self.finished.emit()
+
+
+class ParallelScanWorker(QThread):
+    output = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, job, settings, parent=None):
+        super().__init__(parent)
+        self.job = job
+        self.settings = settings
+
+    def run(self):
+        self.job.set_state(JobState.RUNNING)
+        log = LogBatcher(self.output.emit)
+        try:
+            count = parallel_scan(self.job.kind, self.job.mem_path, self.job.res_dir,
+                                  self.settings, log=log, usage=self.job.metrics,
+                                  progress=self.job.set_progress, cancel=self.job.cancel_token)
+            if count < 0:
+                self.job.set_state(JobState.FAILED, "one or more ranges failed")
+            else:
+                self.job.values = count
+                self.job.set_state(JobState.DONE)
+        except Cancelled:
+            log(f"{self.job.title} cancelled.")
+            self.job.set_state(JobState.CANCELLED)
+        except Exception as e:
+            log(f"Error during parallel scan: {e}")
+            self.job.set_state(JobState.FAILED, e)
+        log.close()
+        self.finished.emit()
+
+
+class CacheLookupWorker(QThread):
+    output = pyqtSignal(str)
+    done = pyqtSignal(str, int)
+
+    def __init__(self, cache, job, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.job = job
+
+    def run(self):
+        finder = FINDERS[self.job.kind]
+        try:
+            key = self.cache.key(self.job.mem_path, finder)
+            count = self.cache.restore(key, finder, self.job.res_dir)
+        except Exception as e:
+            self.output.emit(f"Result cache unavailable: {e}")
+            key, count = "", None
+        self.done.emit(key, -1 if count is None else count)
+
+
+class BuiltinAesWorker(QThread):
+    output = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, job, page_filter=False, parent=None):
+        super().__init__(parent)
+        self.job = job
+        self.page_filter = page_filter
+
+    def progress(self, done, total):
+        # The scan notices a cancel between windows.
+        self.job.cancel_token.check()
+        self.job.set_progress(done, total)
+
+    def run(self):
+        self.job.set_state(JobState.RUNNING)
+        try:
+            with metrics.ThreadUsage() as usage:
+                self.job.values = aesfind.run(self.job.mem_path, self.job.res_dir, log=self.output.emit,
+                                              progress=self.progress, page_filter=self.page_filter)
+            self.job.metrics.update(usage.usage)
+            self.job.set_state(JobState.DONE)
+        except Cancelled:
+            self.output.emit(f"{self.job.title} cancelled.")
+            self.job.set_state(JobState.CANCELLED)
+        except Exception as e:
+            self.output.emit(f"Error in built-in AES detector: {e}")
+            self.job.set_state(JobState.FAILED, e)
+        self.finished.emit()
+
+
+class FastZeroizeWorker(QThread):
+    output = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, job, names, filename, parent=None):
+        super().__init__(parent)
+        self.job = job
+        self.names = names
+        self.filename = filename
+
+    def run(self):
+        self.job.set_state(JobState.RUNNING)
+        try:
+            with metrics.ThreadUsage() as usage:
+                stats = zeroize.fast_zeroize(self.job.mem_path, self.job.res_dir, self.names,
+                                             self.filename, log=self.output.emit)
+            self.job.metrics.update(usage.usage)
+            self.job.values = stats["regions"]
+            # Patching is not interruptible; a cancelled job discards its output.
+            self.job.set_state(JobState.CANCELLED if self.job.cancel_token.cancelled else JobState.DONE)
+        except Exception as e:
+            self.output.emit(f"Error while zeroizing: {e}")
+            self.job.set_state(JobState.FAILED, e)
+        self.finished.emit()
+
+
+# ------------------------------ Jobs ------------------------------------- #
+class JobEvents(QObject):
+    """Signals carrying job updates from worker and pool threads to the GUI."""
+    changed = pyqtSignal(object)
+    output = pyqtSignal(str)
+
+
+class PostProcessTask(QRunnable):
+    """Runs a job's post-processing (parsing, result file I/O) on a thread pool."""
+
+    def __init__(self, job, func, events):
+        super().__init__()
+        self.job = job
+        self.func = func
+        self.events = events
+
+    def run(self):
+        self.job.set_state(JobState.PARSING)
+        try:
+            self.job.values = self.func()
+        except Cancelled:
+            self.events.output.emit(f"{self.job.title} cancelled.")
+            self.job.set_state(JobState.CANCELLED)
+            return
+        except Exception as e:
+            self.events.output.emit(f"Error while processing {self.job.title} results: {e}")
+            self.job.set_state(JobState.FAILED, e)
+            return
+        if self.job.returncode not in (0, None):
+            self.job.set_state(JobState.FAILED, f"exit code {self.job.returncode}")
+        else:
+            self.job.set_state(JobState.DONE)
+
+
+class JobTableModel(QAbstractTableModel):
+    COLUMNS = ("#", "Job", "Dump", "State", "Progress", "Values", "Time", "CPU", "Peak RSS", "Read")
+    PROGRESS_COLUMN = 4
+    # Percent complete for the progress column, -1 when the job reports none.
+    PercentRole = Qt.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.jobs = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.jobs)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole, self.PercentRole):
+            return None
+        job = self.jobs[index.row()]
+        if role == Qt.ToolTipRole:
+            return job.error
+        if role == self.PercentRole:
+            if job.state is JobState.DONE:
+                return 100
+            if job.progress is None or not job.progress[1]:
+                return -1
+            return int(100 * job.progress[0] / job.progress[1])
+        if job.state is JobState.DONE:
+            done = "100%"
+        elif job.progress is not None and job.state is JobState.RUNNING:
+            done = progress.format_progress(*job.progress, job.rate, job.eta)
+        else:
+            done = ""
+        values = "" if job.values is None else str(job.values)
+        m = job.metrics
+        cpu = f"{m['cpu_user'] + m['cpu_system']:.1f}s" if "cpu_user" in m else ""
+        rss = f"{m['max_rss_kib'] / 1024:.0f} MiB" if "max_rss_kib" in m else ""
+        read = f"{m['rchar'] / 1024 ** 2:.0f} MiB" if "rchar" in m else ""
+        row = (str(job.id), job.title, os.path.basename(job.mem_path), job.state.value,
+               done, values, f"{job.elapsed:.1f}s", cpu, rss, read)
+        return row[index.column()]
+
+    def add_job(self, job):
+        self.beginInsertRows(QModelIndex(), len(self.jobs), len(self.jobs))
+        self.jobs.append(job)
+        self.endInsertRows()
+
+    def update_job(self, job):
+        row = self.jobs.index(job)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.COLUMNS) - 1))
+
+
+class ProgressDelegate(QStyledItemDelegate):
+    """Draws the job table's progress column as a progress bar."""
+
+    def paint(self, painter, option, index):
+        percent = index.data(JobTableModel.PercentRole)
+        if percent is None or percent < 0:
+            super().paint(painter, option, index)
+            return
+        bar = QStyleOptionProgressBar()
+        bar.rect = option.rect.adjusted(1, 1, -1, -1)
+        bar.minimum, bar.maximum, bar.progress = 0, 100, percent
+        bar.text = index.data(Qt.DisplayRole)
+        bar.textVisible = True
+        QApplication.style().drawControl(QStyle.CE_ProgressBar, bar, painter)
+
+
+class StartupWorker(QThread):
+    output = pyqtSignal(str)
+
+    def __init__(self, cache=None, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+
+    def run(self):
+        """Performs all startup‑time installation / build tasks."""
+        with LogBatcher(self.output.emit) as log:
+            provision(log)
+
+        # Results cached from tool builds that were just replaced
+        if self.cache is not None:
+            removed = self.cache.invalidate_stale(FINDERS.values())
+            self.output.emit(f"Result cache checked, {removed} stale entries removed.")
+
+
+# ------------------------------ Main Window ------------------------------ #
+class LauncherWindow(QMainWindow):
+    """Main GUI window for RAM‑Extractor."""
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("RAM-Extractor")  
+        self.resize(950, 650)
+        self.log_file = None
+        # job id -> worker thread, kept until the worker finishes
+        self.workers = {}
+        self.cache_workers = {}
+        self.cache = ResultCache()
+        self.pool = QThreadPool(self)
+        self.scheduler = Scheduler(log=self.log)
+        self.job_model = JobTableModel(self)
+        self.job_events = JobEvents()
+        self.job_events.changed.connect(self.job_model.update_job)
+        self.job_events.changed.connect(self.scheduler.job_changed)
+        self.initUI()
+        self.job_events.output.connect(self.log)
+
+    # -------------------- UI setup -------------------- #
+    def initUI(self):
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+
+        main_layout = QHBoxLayout(central_widget)
+
+        # -------- Left: Console output + jobs -------- #
+        output_layout = QVBoxLayout()
+        self.console = QTextEdit(readOnly=True)
+        self.console.setLineWrapMode(QTextEdit.NoWrap)
+        self.console.document().setMaximumBlockCount(MAX_CONSOLE_LINES)
+        output_layout.addWidget(self.console, stretch=3)
+
+        self.job_view = QTableView()
+        self.job_view.setModel(self.job_model)
+        self.job_view.verticalHeader().hide()
+        self.job_view.setItemDelegateForColumn(JobTableModel.PROGRESS_COLUMN, ProgressDelegate(self.job_view))
+        self.job_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.job_view.horizontalHeader().setStretchLastSection(True)
+        self.job_view.horizontalHeader().setSectionResizeMode(JobTableModel.PROGRESS_COLUMN, QHeaderView.Fixed)
+        self.job_view.setColumnWidth(JobTableModel.PROGRESS_COLUMN, 240)
+        self.job_view.setSelectionBehavior(QTableView.SelectRows)
+        output_layout.addWidget(self.job_view, stretch=1)
+        self.cancel_button = QPushButton("Cancel selected jobs")
+        self.cancel_button.clicked.connect(self.cancel_selected_jobs)
+        output_layout.addWidget(self.cancel_button)
+        main_layout.addLayout(output_layout, stretch=3)
+
+        # -------- Right: Controls -------- #
+        control_panel = QWidget()
+        control_layout = QVBoxLayout(control_panel)
+        main_layout.addWidget(control_panel, stretch=1)
+
+        # --- Startup tasks --- #
+        control_layout.addWidget(QLabel("Startup Tasks"))
+        self.startup_button = QPushButton("Check updates and install tools")
+        self.startup_button.clicked.connect(self.start_startup_tasks)
+        control_layout.addWidget(self.startup_button)
+        control_layout.addSpacing(20)
+
+        # --- Paths: memory + result folder --- #
+        control_layout.addWidget(QLabel("Path to memory for analysis:"))
+        self.mem_path_edit = QLineEdit()
+        control_layout.addWidget(self.mem_path_edit)
+        browse_mem_btn = QPushButton("Browse file")
+        browse_mem_btn.clicked.connect(self.browse_memory_path)
+        control_layout.addWidget(browse_mem_btn)
+
+        control_layout.addWidget(QLabel("Folder for results:"))  
+        self.res_path_edit = QLineEdit()
+        control_layout.addWidget(self.res_path_edit)
+        browse_res_btn = QPushButton("Browse folder")
+        browse_res_btn.clicked.connect(self.browse_results_folder)
+        control_layout.addWidget(browse_res_btn)
+        self.copy_dir_edit = QLineEdit()
+        self.copy_dir_edit.setPlaceholderText("Folder for temporary dump copies (optional)")
+        self.copy_dir_edit.setToolTip("rsakeyfind and interrogate need one seekable file, parallel scans a "
+                                      "seekable dump: split or compressed dumps, and the ranges of a parallel "
+                                      "rsakeyfind or interrogate scan, are copied here. Without a folder "
+                                      "those scans are refused.")
+        control_layout.addWidget(self.copy_dir_edit)
+        control_layout.addSpacing(20)
+
+        # --- Tool buttons --- #
+        control_layout.addWidget(QLabel("Run tools:"))
+        self.aeskey_button = QPushButton("Run aeskeyfind")
+        self.aeskey_button.clicked.connect(self.start_aeskeyfind)
+        control_layout.addWidget(self.aeskey_button)
+        self.cb_builtin_aes = QCheckBox("Use built-in AES detector (NumPy)")
+        control_layout.addWidget(self.cb_builtin_aes)
+
+        self.rsakey_button = QPushButton("Run rsakeyfind")
+        self.rsakey_button.clicked.connect(self.start_rsakeyfind)
+        control_layout.addWidget(self.rsakey_button)
+
+        self.serpent_button = QPushButton("Run serpent finder")
+        self.serpent_button.clicked.connect(self.start_serpent)
+        control_layout.addWidget(self.serpent_button)
+
+        self.twofish_button = QPushButton("Run twofish finder")
+        self.twofish_button.clicked.connect(self.start_twofish)
+        control_layout.addWidget(self.twofish_button)
+
+        self.cb_cache = QCheckBox("Reuse cached results for unchanged dumps")
+        self.cb_cache.setChecked(True)
+        control_layout.addWidget(self.cb_cache)
+        self.cb_prefilter = QCheckBox("Skip zero and low-entropy pages (pre-filter, NumPy)")
+        control_layout.addWidget(self.cb_prefilter)
+
+        # --- Job queue --- #
+        queue_row = QHBoxLayout()
+        queue_row.addWidget(QLabel("Max concurrent scans:"))
+        self.max_jobs_spin = QSpinBox()
+        self.max_jobs_spin.setRange(1, 64)
+        self.max_jobs_spin.setValue(DEFAULT_MAX_IO)
+        self.max_jobs_spin.valueChanged.connect(self.scheduler.set_limit)
+        queue_row.addWidget(self.max_jobs_spin)
+        queue_row.addWidget(QLabel("Priority:"))
+        self.priority_spin = QSpinBox()
+        self.priority_spin.setRange(-10, 10)
+        self.priority_spin.setToolTip("Queued jobs with a higher priority start first")
+        queue_row.addWidget(self.priority_spin)
+        control_layout.addLayout(queue_row)
+
+        # --- Parallel scan settings --- #
+        self.cb_parallel = QCheckBox("Parallel scan (split dump across CPU cores)")
+        control_layout.addWidget(self.cb_parallel)
+        parallel_row = QHBoxLayout()
+        parallel_row.addWidget(QLabel("Workers:"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 256)
+        self.workers_spin.setValue(os.cpu_count() or 1)
+        parallel_row.addWidget(self.workers_spin)
+        parallel_row.addWidget(QLabel("Chunk (MiB):"))
+        self.chunk_spin = QSpinBox()
+        self.chunk_spin.setRange(16, 65536)
+        self.chunk_spin.setValue(256)
+        parallel_row.addWidget(self.chunk_spin)
+        control_layout.addLayout(parallel_row)
+
+        # --- Scan all (single pass over the dump) --- #
+        control_layout.addSpacing(10)
+        control_layout.addWidget(QLabel("Scan all (reads the dump once):"))
+        self.cb_aes_scan = QCheckBox("AES")
+        self.cb_rsa_scan = QCheckBox("RSA")
+        self.cb_serpent_scan = QCheckBox("Serpent")
+        self.cb_twofish_scan = QCheckBox("Twofish")
+        for cb in (self.cb_aes_scan, self.cb_rsa_scan, self.cb_serpent_scan, self.cb_twofish_scan):
+            cb.setChecked(True)
+            control_layout.addWidget(cb)
+
+        self.scan_all_button = QPushButton("Scan all selected")
+        self.scan_all_button.clicked.connect(self.start_scan_all)
+        control_layout.addWidget(self.scan_all_button)
+
+        # --- Combined results (key_index.bin) --- #
+        near_row = QHBoxLayout()
+        near_row.addWidget(QLabel("Keys near offset:"))
+        self.near_edit = QLineEdit()
+        self.near_edit.setPlaceholderText("0x1f000")
+        self.near_edit.returnPressed.connect(self.show_keys_near)
+        near_row.addWidget(self.near_edit)
+        near_button = QPushButton("Show")
+        near_button.clicked.connect(self.show_keys_near)
+        near_row.addWidget(near_button)
+        control_layout.addLayout(near_row)
+        control_layout.addStretch()
+
+        # --- Zeroize section --- #
+        control_layout.addSpacing(10)
+        control_layout.addWidget(QLabel("Zeroize keys:"))
+
+        self.cb_aes_zero = QCheckBox("AES")      
+        self.cb_rsa_zero = QCheckBox("RSA")      
+        self.cb_serpent_zero = QCheckBox("Serpent")  
+        self.cb_twofish_zero = QCheckBox("Twofish")  
+
+        for cb in (self.cb_aes_zero, self.cb_rsa_zero, self.cb_serpent_zero, self.cb_twofish_zero):
+            control_layout.addWidget(cb)
+
+        # Filename for zeroed dump
+        control_layout.addWidget(QLabel("Filename for zeroed dump (.mem):"))
+        self.zero_filename_edit = QLineEdit()
+        self.zero_filename_edit.setPlaceholderText("zero_mem.mem")
+        control_layout.addWidget(self.zero_filename_edit)
+
+        self.cb_fast_zero = QCheckBox("Fast zeroize (clone dump, patch key regions only)")
+        control_layout.addWidget(self.cb_fast_zero)
+
+        self.zero_button = QPushButton("Zero selected keys")
+        self.zero_button.clicked.connect(self.start_zeroize_dump)
+        control_layout.addWidget(self.zero_button)
+
+    # -------------------- Logging -------------------- #
+    def log(self, msg: str):
+        """Append a message to the console and to the current job's log file."""
+        self.console.append(msg)
+        if self.log_file is not None:
+            self.log_file(msg)
+
+    def separator(self):
+        """Insert a blank line to visually separate blocks of output."""
+        self.log("")
+
+    def _bind_log_file(self, res_dir: str):
+        """Stream the full, untruncated log to ``res_dir`` from now on.
+
+        Called when a job is created, so the log follows the jobs' results
+        folders rather than whatever the folder field holds later.
+        """
+        path = os.path.abspath(os.path.join(res_dir, LOG_FILE_NAME))
+        if self.log_file is not None:
+            if self.log_file.path == path:
+                return
+            self.log_file.close()
+        try:
+            self.log_file = LogFile(path)
+        except OSError:
+            self.log_file = None
+
+    def closeEvent(self, event):
+        if self.log_file is not None:
+            self.log_file.close()
+        super().closeEvent(event)
+
+    # -------------------- Common helpers -------------------- #
+    def browse_memory_path(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Select memory file", "", DUMP_FILTER)
+        if path:
+            self.mem_path_edit.setText(path)
+
+    def browse_results_folder(self):
+        path = QFileDialog.getExistingDirectory(self, "Select results folder")
+        if path:
+            self.res_path_edit.setText(path)
+
+    def copy_dir(self):
+        """Folder the user allows temporary raw dump copies in, or None."""
+        return self.copy_dir_edit.text().strip() or None
+
+    # -------------------- Startup tasks -------------------- #
+    def start_startup_tasks(self):
+        self.startup_button.setEnabled(False)
+        self.log("Starting startup tasks…")
+        self.startup_worker = StartupWorker(self.cache)
+        self.startup_worker.output.connect(self.log)
+        self.startup_worker.finished.connect(lambda: (self.log("Startup tasks completed."), self.startup_button.setEnabled(True)))
+        self.startup_worker.start()
+
+    # -------------------- Jobs -------------------- #
+    def _job_changed(self, job: Job):
+        # Called from whichever thread changed the job.
+        if job.finished:
+            try:
+                metrics.write_job(job)
+            except OSError as e:
+                self.job_events.output.emit(f"Could not write job metrics: {e}")
+            text = metrics.summary(job.metrics)
+            if text:
+                self.job_events.output.emit(f"{job.title}: {job.elapsed:.1f}s, {text}")
+        self.job_events.changed.emit(job)
+
+    def _new_job(self, kind: str, title: str, mem_path: str, res_dir: str, outputs=()) -> Job:
+        job = Job(kind, title, mem_path, res_dir, listener=self._job_changed)
+        job.outputs = list(outputs)
+        self._bind_log_file(res_dir)
+        self.job_model.add_job(job)
+        return job
+
+    def _submit(self, job: Job, start):
+        """Queue ``job``; ``start(job)`` runs once the scheduler gives it a slot."""
+        self.scheduler.submit(job, start, self.priority_spin.value())
+
+    def _run_worker(self, job: Job, worker):
+        """Start ``worker`` for ``job`` and keep a reference until it finishes."""
+        worker.output.connect(self.log)
+        worker.finished.connect(lambda *_: self._release_worker(job.id))
+        self.workers[job.id] = worker
+        worker.start()
+
+    def _release_worker(self, job_id: int):
+        worker = self.workers.pop(job_id, None)
+        if worker is not None:
+            worker.wait()
+
+    def cancel_selected_jobs(self):
+        rows = self.job_view.selectionModel().selectedRows()
+        if not rows:
+            QMessageBox.information(self, "Nothing selected", "Select the jobs to cancel in the job table.")
+            return
+        for index in rows:
+            job = self.job_model.jobs[index.row()]
+            if not self.scheduler.cancel(job):
+                self.log(f"{job.title} has already finished.")
+
+    # -------------------- Tool launchers -------------------- #
+    def start_aeskeyfind(self):
+        self._start_finder("aes")
+
+    def start_rsakeyfind(self):
+        self._start_finder("rsa")
+
+    def start_serpent(self):
+        self._start_finder("serpent")
+
+    def start_twofish(self):
+        self._start_finder("twofish")
+
+    def _start_finder(self, name: str):
+        self.separator()
+        finder = FINDERS[name]
+        m = self.mem_path_edit.text().strip()
+        r = self.res_path_edit.text().strip()
+        if not m or not r:
+            QMessageBox.critical(self, "Error", "Provide mem file and results folder")
+            return
+        if not os.path.isfile(m):
+            QMessageBox.critical(self, "Error", f"Memory file not found:\n{m}")
+            return
+        page_filter = self.cb_prefilter.isChecked()
+        if page_filter and prefilter.np is None:
+            QMessageBox.critical(self, "Error", "numpy is required for the page pre-filter.")
+            return
+        if name == "aes" and self.cb_builtin_aes.isChecked():
+            if aesfind.np is None:
+                QMessageBox.critical(self, "Error", "numpy is required for the built-in AES detector.")
+                return
+            os.makedirs(r, exist_ok=True)
+            job = self._new_job("aes", "AES (built-in)", m, r, [os.path.join(r, finder.values_name)])
+            self._submit(job, lambda job: self._start_builtin_aes(job, page_filter))
+            return
+        error = finder.missing()
+        if error:
+            QMessageBox.critical(self, "Error", error)
+            return
+        os.makedirs(r, exist_ok=True)
+        outputs = [os.path.join(r, finder.output_name), os.path.join(r, finder.values_name)]
+        if self.cb_parallel.isChecked():
+            if page_filter:
+                self.log("The page pre-filter does not apply to parallel scans; scanning whole ranges.")
+            job = self._new_job(name, f"{finder.title} (parallel)", m, r, outputs)
+            self._submit(job, self._start_parallel)
+            return
+
+        job = self._new_job(name, finder.title, m, r, outputs)
+        if page_filter or not dumps.open_source(m).is_file:
+            cache = self.cache if self.cb_cache.isChecked() else None
+            self._submit(job, lambda job: self._start_streamed_finder(job, cache, page_filter))
+            return
+        self._submit(job, self._start_cache_lookup if self.cb_cache.isChecked()
+                     else lambda job: self._launch_finder(job, None))
+
+    def _start_streamed_finder(self, job: Job, cache, page_filter=False):
+        finder = FINDERS[job.kind]
+        self.log(f"{finder.title[0].upper()}{finder.title[1:]} is working, please wait…")
+        self.log(f"Running {finder.title.lower()} on: {dumps.open_source(job.mem_path).describe()}")
+        worker = FinderWorker(job, cache, page_filter, self.copy_dir())
+        worker.finished.connect(lambda: self.log(f"{finder.title} finished."))
+        self._run_worker(job, worker)
+
+    def _start_cache_lookup(self, job: Job):
+        # Hashing the dump is I/O too, so the lookup runs in the job's slot.
+        job.set_state(JobState.RUNNING)
+        lookup = CacheLookupWorker(self.cache, job)
+        lookup.output.connect(self.log)
+        lookup.done.connect(lambda key, count: self._after_cache_lookup(job, key, count))
+        self.cache_workers[job.id] = lookup
+        lookup.start()
+
+    def _after_cache_lookup(self, job: Job, key: str, count: int):
+        lookup = self.cache_workers.pop(job.id, None)
+        if lookup is not None:
+            lookup.wait()
+        if job.cancel_token.cancelled:
+            self.log(f"{job.title} cancelled.")
+            job.set_state(JobState.CANCELLED)
+            return
+        if count < 0:
+            self._launch_finder(job, key or None)
+            return
+        finder = FINDERS[job.kind]
+        self.log(f"{finder.title}: unchanged dump, restored {count} values from cache "
+                 f"into {os.path.join(job.res_dir, finder.values_name)}")
+        job.values = count
+        job.metrics["cached"] = True
+        job.set_state(JobState.DONE)
+
+    def _launch_finder(self, job: Job, cache_key):
+        finder = FINDERS[job.kind]
+        m, r = job.mem_path, job.res_dir
+        out_txt = os.path.join(r, finder.output_name)
+        values = os.path.join(r, finder.values_name)
+        self.log(f"{finder.title[0].upper()}{finder.title[1:]} is working, please wait…")
+        self.log(f"Running {finder.title.lower()} on: {m}")
+
+        worker = ProcessRunner(finder.command(m), cwd=finder.cwd, stdout_path=out_txt,
+                               follow=(job.kind, values), watch=(m, job.set_progress),
+                               cancel=job.cancel_token)
+        worker.finished.connect(lambda: self._finish_finder(job, worker, out_txt, values, cache_key))
+        job.set_state(JobState.RUNNING)
+        self._run_worker(job, worker)
+
+    def _finish_finder(self, job: Job, worker: ProcessRunner, out_txt: str, values: str, cache_key=None):
+        finder = FINDERS[job.kind]
+        job.returncode = worker.returncode
+        job.metrics.update(worker.usage)
+        self.log(f"{finder.title} finished. Output saved to {out_txt}")
+
+        def post_process():
+            count = worker.parser.finish()
+            job.metrics["parse_seconds"] = worker.parser.parse_seconds
+            job.cancel_token.check()
+            self.job_events.output.emit(f"{finder.label} values saved to {values} ({count} values)")
+            if cache_key and job.returncode == 0:
+                self.cache.store(cache_key, finder, job.res_dir, job.mem_path, count)
+            return count
+
+        self.pool.start(PostProcessTask(job, post_process, self.job_events))
+
+    def _start_builtin_aes(self, job: Job, page_filter=False):
+        self.log("Built-in AES detector is working, please wait…")
+        self.log(f"Running built-in AES detector on: {job.mem_path}")
+        self._run_worker(job, BuiltinAesWorker(job, page_filter))
+
+    def _start_parallel(self, job: Job):
+        finder = FINDERS[job.kind]
+        settings = ScanSettings(self.workers_spin.value(), self.chunk_spin.value() * 1024 * 1024,
+                                copy_dir=self.copy_dir())
+        self.log(f"{finder.title[0].upper()}{finder.title[1:]} is working in parallel, please wait…")
+
+        worker = ParallelScanWorker(job, settings)
+        worker.finished.connect(lambda: self.log(f"Parallel {finder.title} finished."))
+        self._run_worker(job, worker)
+
+    def start_scan_all(self):
+        self.separator()
+        m = self.mem_path_edit.text().strip()
+        r = self.res_path_edit.text().strip()
+        if not m or not r:
+            QMessageBox.critical(self, "Error", "Provide mem file and results folder")
+            return
+        if not os.path.isfile(m):
+            QMessageBox.critical(self, "Error", f"Memory file not found:\n{m}")
+            return
+
+        scan_map = {
+            "aes": self.cb_aes_scan,
+            "rsa": self.cb_rsa_scan,
+            "serpent": self.cb_serpent_scan,
+            "twofish": self.cb_twofish_scan,
+        }
+        selected = [name for name, cb in scan_map.items() if cb.isChecked()]
+        if not selected:
+            QMessageBox.information(self, "Nothing selected", "Select at least one algorithm to scan.")
+            return
+        for name in selected:
+            error = FINDERS[name].missing()
+            if error:
+                QMessageBox.critical(self, "Error", error)
+                return
+        page_filter = self.cb_prefilter.isChecked()
+        if page_filter and prefilter.np is None:
+            QMessageBox.critical(self, "Error", "numpy is required for the page pre-filter.")
+            return
+
+        os.makedirs(r, exist_ok=True)
+        outputs = [os.path.join(r, FINDERS[name].output_name) for name in selected]
+        outputs += [os.path.join(r, FINDERS[name].values_name) for name in selected]
+        job = self._new_job("scan_all", f"Scan all ({', '.join(selected)})", m, r, outputs)
+        self._submit(job, lambda job: self._start_scan_all(job, selected, page_filter))
+
+    def _start_scan_all(self, job: Job, selected, page_filter=False):
+        self.log(f"Scanning {job.mem_path} for {', '.join(selected)} in a single pass, please wait…")
+        worker = ScanAllWorker(job, selected, page_filter, self.copy_dir())
+        worker.finished.connect(lambda: self.log("Scan all finished."))
+        self._run_worker(job, worker)
+
+    # -------------------- Combined results -------------------- #
+    def show_keys_near(self):
+        """Log the index summary and every key within NEAR_DISTANCE bytes of the given offset."""
+        self.separator()
+        m = self.mem_path_edit.text().strip()
+        r = self.res_path_edit.text().strip()
+        if not m or not r:
+            QMessageBox.critical(self, "Error", "Provide mem file and results folder")
+            return
+        try:
+            offset = int(self.near_edit.text().strip(), 0)
+        except ValueError:
+            QMessageBox.critical(self, "Error", "Enter an offset, e.g. 0x1f000 or 126976")
+            return
+        if not any(os.path.isfile(offset_index.values_path(r, n)) for n in offset_index.ALGORITHMS):
+            QMessageBox.information(self, "No results", f"No *_values.txt files in {r} yet.")
+            return
+        try:
+            with offset_index.load(m, r, log=self.log) as index:
+                self.log(index.summary())
+                found = index.near(offset)
+                for start, length, mask, gap in found:
+                    where = "contains it" if gap == 0 else f"{gap} bytes away"
+                    self.log(f"{'+'.join(offset_index.names_of(mask))} key at {start:#x} "
+                             f"({length} bytes), {where}")
+        except Exception as e:
+            self.log(f"Could not read the results index: {e}")
+            return
+        if not found:
+            self.log(f"No keys within {offset_index.NEAR_DISTANCE} bytes of {offset:#x}.")
+
+    # -------------------- zeroize_dump / zeroize -------------------- #
+    def start_zeroize_dump(self):
+        self.separator()
+        m = self.mem_path_edit.text().strip()
+        r = self.res_path_edit.text().strip()
+
+        if not m or not r:
+            QMessageBox.critical(self, "Error", "Provide mem file and results folder")
+            return
+        if not os.path.isfile(m):
+            QMessageBox.critical(self, "Error", f"Memory file not found:\n{m}")
+            return
+
+        # --- collect selected algorithms & corresponding value files --- #
+        zero_map = {
+            "aes": self.cb_aes_zero,
+            "rsa": self.cb_rsa_zero,
+            "serpent": self.cb_serpent_zero,
+            "twofish": self.cb_twofish_zero,
+        }
+        selected = [name for name, cb in zero_map.items() if cb.isChecked()]
+        if not selected:
+            QMessageBox.information(self, "Nothing selected", "Select at least one algorithm to zeroize.")
+            return
+
+        fast = self.cb_fast_zero.isChecked()
+        if not fast and not zeroize.binary_supports(m):
+            self.log("zeroize_dump needs a single raw dump, using fast zeroize instead.")
+            fast = True
+        if fast:
+            try:
+                zeroize.value_args(r, selected)
+            except FileNotFoundError as e:
+                QMessageBox.critical(self, "Error", str(e))
+                return
+            filename = self.zero_filename_edit.text()
+            job = self._new_job("zeroize", f"Zeroize ({', '.join(selected)})", m, r,
+                                [zeroize.output_path(r, filename)])
+            self._submit(job, lambda job: self._start_fast_zeroize(job, selected, filename))
+            return
+
+        # --- values files, zeroize_dump binary & destination file --- #
+        try:
+            cmd, out_file = zeroize.build_command(m, r, selected, self.zero_filename_edit.text())
+        except FileNotFoundError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+
+        # --- run --- #
+        job = self._new_job("zeroize_dump", f"zeroize_dump ({', '.join(selected)})", m, r, [out_file])
+        self._submit(job, lambda job: self._start_zeroize_dump(job, cmd, out_file))
+
+    def _start_fast_zeroize(self, job: Job, selected, filename: str):
+        self.log("Zeroizing selected keys (clone + patch), please wait…")
+        self._run_worker(job, FastZeroizeWorker(job, selected, filename))
+
+    def _start_zeroize_dump(self, job: Job, cmd, out_file: str):
+        self.log("Zeroizing selected keys, please wait…")
+        worker = ProcessRunner(cmd, cancel=job.cancel_token)
+        worker.finished.connect(lambda: self._finish_zeroize_dump(job, worker, worker.returncode, out_file))
+        job.set_state(JobState.RUNNING)
+        self._run_worker(job, worker)
+
+    def _finish_zeroize_dump(self, job: Job, worker: ProcessRunner, code: int, out_file: str):
+        job.returncode = code
+        job.metrics.update(worker.usage)
+        if job.cancel_token.cancelled:
+            self.log("zeroize_dump cancelled.")
+            job.set_state(JobState.CANCELLED)
+        elif code == 0:
+            self.log(f"zeroize_dump finished with exit code {code}\nZeroed dump saved to: {out_file}")
+            job.set_state(JobState.DONE)
+        else:
+            self.log("zeroize_dump failed")
+            job.set_state(JobState.FAILED, f"exit code {code}")
+
+
+# ------------------------------ main ------------------------------------- #
+if __name__ == "__main__":
+    
+    if not os.environ.get("XDG_RUNTIME_DIR"):
+        os.environ["XDG_RUNTIME_DIR"] = f"/run/user/{os.geteuid()}"
+
+    app = QApplication(sys.argv)
+    window = LauncherWindow()
+    window.show()
+    sys.exit(app.exec_())
@@ -0,0 +1,133 @@
+"""Per-job resource metrics and the ``metrics.jsonl`` file they are kept in.
+
+Tool processes are waited for with ``wait4`` so their user/system CPU time
+and peak RSS come from the kernel, and ``/proc/<pid>/io`` is read just
+before the process is reaped (``waitid`` with ``WNOWAIT``) for the bytes it
+read.  Work done in-process (the built-in AES detector, fast zeroize) is
+measured per thread instead.  Every finished job appends one JSON object
+per line to ``metrics.jsonl`` in its results folder.
+"""
+import json
+import os
+import resource
+import threading
+import time
+
+METRICS_NAME = "metrics.jsonl"
+
+_write_lock = threading.Lock()
+
+
+def _read_io(path: str) -> dict:
+    io = {}
+    try:
+        with open(path, encoding="ascii") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("rchar", "read_bytes"):
+                    io[key] = int(value)
+    except (OSError, ValueError):
+        pass
+    return io
+
+
+def proc_io(pid: int) -> dict:
+    """``rchar`` (bytes passed to read calls) and ``read_bytes`` (fetched from storage) of a process."""
+    return _read_io(f"/proc/{pid}/io")
+
+
+def wait(proc) -> dict:
+    """Wait for a ``subprocess.Popen`` to exit and return its resource usage.
+
+    Sets ``proc.returncode`` like ``proc.wait()`` does.  The usage includes
+    any descendants the process itself waited for.
+    """
+    try:
+        os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+    except ChildProcessError:
+        proc.wait()
+        return {}
+    io = proc_io(proc.pid)
+    _, status, ru = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return {
+        "cpu_user": round(ru.ru_utime, 3),
+        "cpu_system": round(ru.ru_stime, 3),
+        "max_rss_kib": ru.ru_maxrss,
+        **io,
+    }
+
+
+def combine(usages) -> dict:
+    """Sum CPU time and I/O of several usages; the peak RSS is the largest one."""
+    out = {}
+    for usage in usages:
+        for key, value in usage.items():
+            if key == "max_rss_kib":
+                out[key] = max(out.get(key, 0), value)
+            elif isinstance(value, (int, float)):
+                out[key] = round(out.get(key, 0) + value, 3)
+    return out
+
+
+class ThreadUsage:
+    """Context manager measuring the CPU time and reads of the current thread.
+
+    ``usage`` is filled in on exit; the peak RSS is the whole process's.
+    """
+
+    def __enter__(self):
+        self._io_path = f"/proc/self/task/{threading.get_native_id()}/io"
+        self._io = _read_io(self._io_path)
+        self._cpu = resource.getrusage(resource.RUSAGE_THREAD)
+        self.usage = {}
+        return self
+
+    def __exit__(self, *exc):
+        cpu = resource.getrusage(resource.RUSAGE_THREAD)
+        io = _read_io(self._io_path)
+        self.usage = {
+            "cpu_user": round(cpu.ru_utime - self._cpu.ru_utime, 3),
+            "cpu_system": round(cpu.ru_stime - self._cpu.ru_stime, 3),
+            "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            **{key: io[key] - self._io.get(key, 0) for key in io},
+        }
+
+
+def record(job) -> dict:
+    """The metrics line for a finished job."""
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(job.ended or time.time())),
+        "job": job.id,
+        "kind": job.kind,
+        "title": job.title,
+        "dump": os.path.abspath(job.mem_path),
+        "state": job.state.value,
+        "returncode": job.returncode,
+        "wall_seconds": round(job.elapsed, 3),
+        "offsets": job.values,
+        **job.metrics,
+    }
+
+
+def write_job(job) -> dict:
+    """Append ``job``'s metrics to ``metrics.jsonl`` in its results folder; returns the record."""
+    line = record(job)
+    os.makedirs(job.res_dir, exist_ok=True)
+    with _write_lock, open(os.path.join(job.res_dir, METRICS_NAME), "a", encoding="utf-8") as f:
+        f.write(json.dumps(line) + "\n")
+    return line
+
+
+def summary(usage: dict) -> str:
+    """Short human-readable form, e.g. ``cpu 3.1s, peak RSS 48 MiB, read 512.0 MiB``."""
+    parts = []
+    if "cpu_user" in usage:
+        parts.append(f"cpu {usage['cpu_user'] + usage.get('cpu_system', 0):.1f}s")
+    if "max_rss_kib" in usage:
+        parts.append(f"peak RSS {usage['max_rss_kib'] / 1024:.0f} MiB")
+    if "rchar" in usage:
+        parts.append(f"read {usage['rchar'] / 1024 ** 2:.1f} MiB")
+    if "parse_seconds" in usage:
+        parts.append(f"parse {usage['parse_seconds']:.2f}s")
+    return ", ".join(parts)
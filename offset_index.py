@@ -0,0 +1,366 @@
+"""Binary index of the key offsets found in a dump.
+
+``key_index.bin`` is written next to the ``*_values.txt`` files and holds
+every hit as an (offset, length, algorithms) record, sorted by offset.  A
+key reported twice, by one finder or by several with the same extent, is
+a single record whose algorithm mask has a bit for each.  The records are
+stored as three packed little-endian columns after a fixed
+header, so opening the index is a single mmap regardless of its size and
+lookups are binary searches over the offset column.  The text files stay
+the source of truth (zeroize_dump and other tools read them); the index is
+rebuilt from them whenever one of them is newer, and whenever the dump's
+files are not the ones it was built from (inode, size and mtime).
+
+Record lengths are the bytes a key occupies in the dump: the whole AES
+schedule for its key size, the DER SEQUENCE of an RSA key, and the
+Serpent and Twofish schedules interrogate matches.  An RSA hit without a
+DER header gets the conservative ``RSA_FALLBACK_LENGTH``.  Offsets and lengths
+are in the raw dump also for split and compressed dumps (see :mod:`dumps`).
+
+The index answers "what was found near offset X" (:meth:`OffsetIndex.near`),
+shows where finders agree (:meth:`OffsetIndex.correlated`), lists the
+hits not already covered by others (:meth:`OffsetIndex.non_redundant`)
+and gives fast zeroize the coalesced ranges (:meth:`OffsetIndex.merged`).
+Usable on its own::
+
+    python offset_index.py dump.mem results --near 0x1f000
+"""
+import argparse
+import bisect
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+
+import dumps
+
+INDEX_NAME = "key_index.bin"
+MAGIC = b"RAMXIDX2"
+# magic, record count, dump size on disk, dump stamp, longest record, algorithms indexed (bit mask)
+HEADER = struct.Struct("<8sQQQII")
+
+ALGORITHMS = ("aes", "rsa", "serpent", "twofish")
+BITS = {name: 1 << i for i, name in enumerate(ALGORITHMS)}
+
+AES_LENGTHS = {"128": 176, "256": 240}
+FIXED_LENGTHS = {"serpent": 528, "twofish": 4256}
+# SEQUENCE tag, length byte and up to four length octets
+DER_HEADER_MAX = 6
+# Length given to an RSA hit without a parseable DER header: rsakeyfind's
+# scan overlap (see finders.py), the most a key it reports can span.
+RSA_FALLBACK_LENGTH = 16384
+# Default reach of OffsetIndex.near, in bytes either side.
+NEAR_DISTANCE = 4096
+
+
+def index_path(res_dir: str) -> str:
+    return os.path.join(res_dir, INDEX_NAME)
+
+
+def values_path(res_dir: str, name: str) -> str:
+    return os.path.join(res_dir, f"{name}_values.txt")
+
+
+def mask_of(names) -> int:
+    mask = 0
+    for name in names:
+        mask |= BITS[name]
+    return mask
+
+
+def names_of(mask: int) -> list:
+    return [name for name in ALGORITHMS if mask & BITS[name]]
+
+
+def lowest_bit(mask: int) -> int:
+    return mask & -mask
+
+
+def read_values(path: str) -> list:
+    """Parse a ``*_values.txt`` file into ``(offset, size)`` pairs."""
+    pairs = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                offset, size = line.split(",")
+                pairs.append((int(offset, 16), size))
+    return pairs
+
+
+def _der_length(data, offset: int) -> int:
+    """Total length of the DER SEQUENCE at ``offset``, or 0 if there is none."""
+    if offset + 2 > len(data) or data[offset] != 0x30:
+        return 0
+    first = data[offset + 1]
+    if first < 0x80:
+        return 2 + first
+    n = first & 0x7F
+    if n == 0 or n > 4 or offset + 2 + n > len(data):
+        return 0
+    return 2 + n + int.from_bytes(data[offset + 2:offset + 2 + n], "big")
+
+
+def key_length(name: str, size: str, data, offset: int) -> int:
+    """Bytes taken by a ``name`` key reported at ``offset`` with ``size``, clipped to the dump.
+
+    0 only for a hit lying outside the dump or an AES size that is not a
+    key size.
+    """
+    if name == "aes":
+        length = AES_LENGTHS.get(size, 0)
+    elif name == "rsa":
+        length = _der_length(data, offset) or RSA_FALLBACK_LENGTH
+    else:
+        length = FIXED_LENGTHS[name]
+    return max(0, min(length, len(data) - offset))
+
+
+def collect(data, res_dir: str, names, log=None) -> list:
+    """Sorted ``(offset, length, mask)`` records for the given finders' values files.
+
+    Hits with the same offset and length are one record, ``mask`` having
+    the bits of every finder that reported it.  RSA hits given the fallback
+    length and hits left out (no length) are reported to ``log``.
+    """
+    masks = {}
+    for name in names:
+        bit = BITS[name]
+        for offset, size in read_values(values_path(res_dir, name)):
+            length = key_length(name, size, data, offset)
+            if length:
+                masks[offset, length] = masks.get((offset, length), 0) | bit
+            if log is None:
+                continue
+            if not length:
+                log(f"{name} hit at {offset:#x} (size {size}) is outside the dump or has no known "
+                    f"length, not indexed")
+            elif name == "rsa" and not _der_length(data, offset):
+                log(f"rsa hit at {offset:#x} has no DER header, indexed with the fallback length "
+                    f"of {length} bytes")
+    return sorted((offset, length, mask) for (offset, length), mask in masks.items())
+
+
+def dump_stamp(dump) -> int:
+    """64-bit digest of the inode, size and mtime of every file of a :class:`dumps.DumpSource`."""
+    stamp = repr([identity[1:] for identity in dump.identity]).encode()
+    return int.from_bytes(hashlib.blake2b(stamp, digest_size=8).digest(), "little")
+
+
+def _column(typecode: str, values) -> bytes:
+    col = array(typecode, values)
+    if sys.byteorder == "big":
+        col.byteswap()
+    return col.tobytes()
+
+
+def write_index(path: str, records, dump, mask: int):
+    """Write sorted ``records`` found in ``dump`` (a :class:`dumps.DumpSource`) to ``path`` atomically."""
+    max_length = max((length for _, length, _ in records), default=0)
+    tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(records), dump.disk_size, dump_stamp(dump), max_length, mask))
+        f.write(_column("Q", (r[0] for r in records)))
+        f.write(_column("I", (r[1] for r in records)))
+        f.write(_column("B", (r[2] for r in records)))
+    os.replace(tmp, path)
+
+
+def build(mem_path: str, res_dir: str, names=None, log=None) -> int:
+    """(Re)build the index from the values files present in ``res_dir``; returns the record count."""
+    if names is None:
+        names = [n for n in ALGORITHMS if os.path.isfile(values_path(res_dir, n))]
+    dump = dumps.open_source(mem_path)
+    if not dump.is_file:
+        # Only RSA lengths need the dump's bytes: its DER headers.
+        rsa = [offset for offset, _ in read_values(values_path(res_dir, "rsa"))] if "rsa" in names else []
+        records = collect(dump.view(rsa, DER_HEADER_MAX), res_dir, names, log)
+    elif dump.disk_size:
+        with open(dump.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            records = collect(data, res_dir, names, log)
+    else:
+        records = []
+    write_index(index_path(res_dir), records, dump, mask_of(names))
+    return len(records)
+
+
+def is_current(mem_path: str, res_dir: str, names=()) -> bool:
+    """Whether the index exists, was built from this dump, covers ``names`` and is newer than every values file."""
+    path = index_path(res_dir)
+    try:
+        with open(path, "rb") as f:
+            magic, _, dump_size, stamp, _, mask = HEADER.unpack(f.read(HEADER.size))
+        index_mtime = os.stat(path).st_mtime_ns
+        dump = dumps.open_source(mem_path)
+    except (OSError, struct.error):
+        return False
+    if magic != MAGIC or dump_size != dump.disk_size or stamp != dump_stamp(dump):
+        return False
+    if mask & mask_of(names) != mask_of(names):
+        return False
+    for name in ALGORITHMS:
+        vp = values_path(res_dir, name)
+        present = os.path.isfile(vp)
+        if present != bool(mask & BITS[name]):
+            return False
+        if present and os.stat(vp).st_mtime_ns >= index_mtime:
+            return False
+    return True
+
+
+def load(mem_path: str, res_dir: str, names=(), log=None):
+    """Open the index for ``res_dir``, rebuilding it first if it is missing or stale."""
+    if not is_current(mem_path, res_dir, names):
+        build(mem_path, res_dir, log=log)
+    return OffsetIndex(index_path(res_dir))
+
+
+class OffsetIndex:
+    """Read-only, memory-mapped view of a ``key_index.bin`` file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, self.dump_size, self.dump_stamp, self.max_length, self.mask = HEADER.unpack_from(self._mm)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a key index")
+        view = memoryview(self._mm)
+        pos = HEADER.size
+        self.offsets = view[pos:pos + 8 * count].cast("Q")
+        pos += 8 * count
+        self.lengths = view[pos:pos + 4 * count].cast("I")
+        pos += 4 * count
+        self.algorithms = view[pos:pos + count]
+        if sys.byteorder == "big":
+            self.offsets = array("Q", self.offsets)
+            self.offsets.byteswap()
+            self.lengths = array("I", self.lengths)
+            self.lengths.byteswap()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, i):
+        return self.offsets[i], self.lengths[i], self.algorithms[i]
+
+    def __iter__(self):
+        return zip(self.offsets, self.lengths, self.algorithms)
+
+    def overlapping(self, start: int, end: int, names=None):
+        """Yield records intersecting ``[start, end)``, optionally only for ``names``."""
+        want = mask_of(names) if names else 0xFF
+        i = bisect.bisect_left(self.offsets, max(0, start - self.max_length))
+        hi = bisect.bisect_left(self.offsets, end)
+        for i in range(i, hi):
+            offset, length, mask = self.offsets[i], self.lengths[i], self.algorithms[i]
+            if offset + length > start and mask & want:
+                yield offset, length, mask
+
+    def near(self, offset: int, distance: int = NEAR_DISTANCE, names=None) -> list:
+        """Records within ``distance`` bytes of ``offset``, closest first.
+
+        Returns ``(offset, length, mask, gap)`` tuples, ``gap`` being the
+        bytes between ``offset`` and the record (0 when it is inside).
+        """
+        found = []
+        for start, length, mask in self.overlapping(offset - distance, offset + distance + 1, names):
+            gap = max(0, start - offset, offset - (start + length - 1))
+            found.append((start, length, mask, gap))
+        found.sort(key=lambda record: (record[3], record[0]))
+        return found
+
+    def merged(self, names=None) -> list:
+        """Coalesce overlapping and adjacent ranges across algorithms.
+
+        Returns ``(offset, length, mask)`` tuples, ``mask`` being the
+        algorithms whose keys make up the range.
+        """
+        want = mask_of(names) if names else 0xFF
+        out = []
+        cur_start = cur_end = cur_mask = None
+        for offset, length, mask in self:
+            mask &= want
+            if not mask:
+                continue
+            if cur_end is not None and offset <= cur_end:
+                cur_end = max(cur_end, offset + length)
+                cur_mask |= mask
+                continue
+            if cur_end is not None:
+                out.append((cur_start, cur_end - cur_start, cur_mask))
+            cur_start, cur_end, cur_mask = offset, offset + length, mask
+        if cur_end is not None:
+            out.append((cur_start, cur_end - cur_start, cur_mask))
+        return out
+
+    def correlated(self, names=None) -> list:
+        """Merged ranges made up of keys of more than one algorithm."""
+        return [r for r in self.merged(names) if r[2] != lowest_bit(r[2])]
+
+    def non_redundant(self, names=None) -> list:
+        """Records not lying entirely inside records kept before them.
+
+        Records are taken by offset, longest first, so the ones returned
+        cover exactly the :meth:`merged` ranges.
+        """
+        want = mask_of(names) if names else 0xFF
+        records = sorted(((o, n, m & want) for o, n, m in self if m & want), key=lambda r: (r[0], -r[1]))
+        out, covered = [], 0
+        for offset, length, mask in records:
+            if offset + length > covered:
+                out.append((offset, length, mask))
+                covered = offset + length
+        return out
+
+    def summary(self, names=None) -> str:
+        """E.g. ``12 keys (aes 8, rsa 4) in 11 ranges covering 3.1 KiB, 1 shared by several algorithms``."""
+        want = mask_of(names) if names else 0xFF
+        counts = {name: 0 for name in ALGORITHMS}
+        for _, _, mask in self:
+            for name in names_of(mask & want):
+                counts[name] += 1
+        merged = self.merged(names)
+        per_name = ", ".join(f"{name} {n}" for name, n in counts.items() if n)
+        covered = sum(length for _, length, _ in merged) / 1024
+        shared = sum(1 for r in merged if r[2] != lowest_bit(r[2]))
+        return (f"{sum(counts.values())} keys ({per_name or 'none'}) in {len(merged)} ranges "
+                f"covering {covered:.1f} KiB, {shared} shared by several algorithms")
+
+    def close(self):
+        self.offsets = self.lengths = self.algorithms = None
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _describe(offset: int, length: int, mask: int) -> str:
+    return f"{offset:#014x}  {length:6d}  {'+'.join(names_of(mask))}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Combined view of the keys found in a dump.")
+    parser.add_argument("memory", help="memory dump the results belong to")
+    parser.add_argument("results", help="results folder with *_values.txt files")
+    parser.add_argument("--near", type=lambda text: int(text, 0), help="list keys near this offset")
+    parser.add_argument("--distance", type=int, default=NEAR_DISTANCE, help="bytes either side of --near")
+    parser.add_argument("--ranges", action="store_true", help="list the merged ranges zeroizing covers")
+    args = parser.parse_args()
+    with load(args.memory, args.results, log=print) as index:
+        print(index.summary())
+        for offset, length, mask in index.correlated():
+            print(f"shared  {_describe(offset, length, mask)}")
+        if args.ranges:
+            for offset, length, mask in index.merged():
+                print(f"range   {_describe(offset, length, mask)}")
+        if args.near is not None:
+            for offset, length, mask, gap in index.near(args.near, args.distance):
+                print(f"near    {_describe(offset, length, mask)}  {gap} bytes away")
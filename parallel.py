@@ -0,0 +1,307 @@
+"""Chunked parallel scanning of large dumps.
+
+The dump is split into byte ranges that overlap by the finder's
+``overlap`` (its longest key structure), every range is scanned by its own
+finder process from a process pool, and the reported offsets are rebased
+onto the whole dump and de-duplicated before ``*_values.txt`` is written.
+Split dumps are cut into ranges across their segments.  Compressed ones
+cannot be read at arbitrary offsets: they are decompressed once into
+``ScanSettings.copy_dir`` when one is set and refused otherwise.
+
+Streamable finders read their range through a FIFO, so nothing is copied.
+The others need one seekable file and take no offset or length argument,
+so their ranges are copied into ``copy_dir`` (in the kernel, and as
+reflinks where the file system supports them); without one such a scan is
+refused before it starts.
+"""
+import argparse
+import contextlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import dumps
+from finders import FINDERS
+from jobs import kill_group
+import metrics
+from parsers import iter_pairs, write_values
+from pipeline import _open_fifo_writer
+
+# Written into each range's work directory so a cancel can find its tool,
+# and removed once the tool has exited.
+PID_FILE = "pid"
+
+
+class ScanSettings:
+    """Scheduler settings for a parallel scan.
+
+    ``copy_dir`` is the folder temporary raw copies may be written to;
+    without one, scans that would need a copy fail instead.
+    """
+
+    def __init__(self, workers=None, chunk_size=256 * 1024 * 1024, tmp_dir=None, copy_dir=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.tmp_dir = tmp_dir
+        self.copy_dir = copy_dir
+
+
+def plan_chunks(total: int, chunk_size: int, overlap: int) -> list:
+    """Split ``total`` bytes into ``(start, length)`` ranges.
+
+    Every range but the last is ``chunk_size + overlap`` bytes long, so a key
+    starting anywhere in ``[start, start + chunk_size)`` lies entirely inside
+    that range.
+    """
+    chunks = []
+    start = 0
+    while start < total:
+        chunks.append((start, min(chunk_size + overlap, total - start)))
+        start += chunk_size
+    return chunks or [(0, 0)]
+
+
+def offset_style(offsets) -> tuple:
+    """``(width, upper)`` of the hex offset tokens one tool printed.
+
+    A token with a leading zero shows the tool pads offsets to its width;
+    any letter shows the case it prints them in.
+    """
+    width, upper = 0, False
+    for offset in offsets:
+        if len(offset) > 1 and offset[0] == "0":
+            width = max(width, len(offset))
+        upper = upper or offset != offset.lower()
+    return width, upper
+
+
+def rebase(offset: str, base: int, style=(0, False)) -> str:
+    """Shift a hex offset token by ``base``, printed in the tool's ``style`` (see :func:`offset_style`)."""
+    width, upper = style
+    return format(int(offset, 16) + base, f"0{width}{'X' if upper else 'x'}")
+
+
+def _scan_chunk(name: str, mem_path: str, start: int, length: int, tmp_dir: str):
+    """Run one finder over ``[start, start + length)`` of the dump.
+
+    Streamable finders read the range through a FIFO; the others get a
+    copy of it in ``tmp_dir``.  Returns ``(start, output path, pairs, code,
+    resource usage)``.
+    """
+    f = FINDERS[name]
+    work = tempfile.mkdtemp(prefix=f"{name}-{start:x}-", dir=tmp_dir)
+    source = os.path.join(work, "chunk.fifo" if f.streamable else "chunk.bin")
+    out_txt = os.path.join(work, "output.txt")
+    dump = dumps.open_source(mem_path)
+    try:
+        if f.streamable:
+            os.mkfifo(source)
+        else:
+            dst_fd = os.open(source, os.O_WRONLY | os.O_CREAT, 0o600)
+            try:
+                dump.copy_range(dst_fd, start, length)
+            finally:
+                os.close(dst_fd)
+        with open(out_txt, "wb") as out:
+            proc = subprocess.Popen(f.command(source), cwd=f.cwd, stdout=out,
+                                    stderr=subprocess.DEVNULL, start_new_session=True)
+            pid_path = os.path.join(work, PID_FILE)
+            with open(pid_path, "w", encoding="ascii") as fh:
+                fh.write(str(proc.pid))
+            if f.streamable:
+                fd = _open_fifo_writer(source, proc)
+                if fd is not None:
+                    try:
+                        dump.copy_range(fd, start, length)
+                    except BrokenPipeError:
+                        pass
+                    finally:
+                        os.close(fd)
+            # Until it is reaped the exited tool keeps its PID, so a cancel
+            # reading the file cannot signal a process that reused it.
+            os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+            os.remove(pid_path)
+            usage = metrics.wait(proc)
+            code = proc.returncode
+    finally:
+        if os.path.exists(source):
+            os.remove(source)
+    parse_start = time.thread_time()
+    with open(out_txt, encoding="utf-8", errors="replace") as fh:
+        pairs = list(iter_pairs(name, fh))
+    usage["parse_seconds"] = round(time.thread_time() - parse_start, 3)
+    return start, out_txt, pairs, code, usage
+
+
+def merge_pairs(chunk_pairs) -> list:
+    """Rebase per-range ``(offset, size)`` pairs and drop overlap duplicates."""
+    chunk_pairs = list(chunk_pairs)
+    style = offset_style(offset for _, pairs in chunk_pairs for offset, _ in pairs)
+    seen = {}
+    for start, pairs in chunk_pairs:
+        for offset, size in pairs:
+            key = (int(offset, 16) + start, size)
+            seen.setdefault(key, (rebase(offset, start, style), size))
+    return [seen[key] for key in sorted(seen)]
+
+
+def _kill_ranges(tmp: str, futures):
+    """Cancel ranges that have not started and terminate the tools of those that have."""
+    for fut in futures:
+        fut.cancel()
+    try:
+        entries = os.listdir(tmp)
+    except FileNotFoundError:
+        return  # the scan has finished and cleaned up
+    for entry in entries:
+        try:
+            with open(os.path.join(tmp, entry, PID_FILE), encoding="ascii") as fh:
+                kill_group(int(fh.read()))
+        except (OSError, ValueError):
+            pass
+
+
+def parallel_scan(name: str, mem_path: str, res_dir: str, settings=None, log=print, usage=None,
+                  progress=None, cancel=None) -> int:
+    """Scan ``mem_path`` with one finder split across a process pool.
+
+    Writes the finder's raw output (one section per range, offsets relative
+    to that range) and its rebased, de-duplicated ``*_values.txt`` into
+    ``res_dir``.  Returns the number of values written, or -1 if any range
+    failed.  A ``usage`` dict is filled with the combined resource usage of
+    every range, and ``progress(done, total)`` is called as ranges finish.
+    Setting the ``cancel`` token drops pending ranges, terminates the
+    running ones and raises :class:`jobs.Cancelled` without writing output.
+    """
+    settings = settings or ScanSettings()
+    f = FINDERS[name]
+    os.makedirs(res_dir, exist_ok=True)
+    dump = dumps.open_source(mem_path)
+
+    if not f.streamable and settings.copy_dir is None:
+        raise ValueError(f"{f.title} needs one seekable file and cannot read a byte range through a pipe, "
+                         f"so a parallel scan with it copies every range. Choose a folder for temporary "
+                         f"copies, or scan in a single process.")
+
+    results, failed, usages = {}, False, []
+    if f.streamable:
+        tmp = tempfile.mkdtemp(prefix="ramx-par-", dir=settings.tmp_dir)
+    else:
+        # Range copies only go where the caller allowed copies.
+        os.makedirs(settings.copy_dir, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix="ramx-par-", dir=settings.copy_dir)
+    raw_copy = contextlib.ExitStack()
+    futures = {}
+
+    def kill():
+        _kill_ranges(tmp, futures)
+
+    try:
+        if not dump.seekable:
+            # Ranges are read at arbitrary offsets: decompress once, if allowed.
+            dump = dumps.open_source(raw_copy.enter_context(
+                dumps.materialize(dump, settings.copy_dir, log, "A parallel scan")))
+        mem_path, total = dump.path, dump.disk_size
+        chunks = plan_chunks(total, settings.chunk_size, f.overlap)
+        log(f"Scanning {dump.describe()} with {f.title}: {len(chunks)} ranges, "
+            f"{settings.workers} workers, {f.overlap} bytes overlap")
+        with ProcessPoolExecutor(max_workers=settings.workers) as pool:
+            futures = {pool.submit(_scan_chunk, name, mem_path, start, length, tmp): length
+                       for start, length in chunks}
+            scanned = 0
+            if cancel is not None:
+                cancel.on_cancel(kill)
+            for done, fut in enumerate(as_completed(futures), 1):
+                if cancel is not None and cancel.cancelled:
+                    # A range may have started after the first kill.
+                    kill()
+                    continue
+                scanned += futures[fut]
+                if progress is not None:
+                    progress(min(scanned, total), total)
+                try:
+                    start, out_txt, pairs, code, chunk_usage = fut.result()
+                except Exception as e:
+                    log(f"Error while scanning range: {e}")
+                    failed = True
+                    continue
+                if code != 0:
+                    log(f"{f.title} exited with code {code} on range at {start:#x}")
+                    failed = True
+                results[start] = (out_txt, pairs)
+                usages.append(chunk_usage)
+                log(f"{f.title}: {done}/{len(chunks)} ranges done")
+        if cancel is not None:
+            cancel.check()
+
+        with open(os.path.join(res_dir, f.output_name), "wb") as raw:
+            for start in sorted(results):
+                out_txt, _ = results[start]
+                raw.write(f"# range at {start:#x}, offsets below are relative to it\n".encode())
+                with open(out_txt, "rb") as fh:
+                    shutil.copyfileobj(fh, raw)
+    finally:
+        if cancel is not None:
+            cancel.remove_on_cancel(kill)
+        raw_copy.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    if usage is not None:
+        usage.update(metrics.combine(usages))
+    merged = merge_pairs((start, pairs) for start, (_, pairs) in results.items())
+    write_values(os.path.join(res_dir, f.values_name), merged)
+    log(f"{f.label} values saved to {os.path.join(res_dir, f.values_name)} ({len(merged)} unique)")
+    return -1 if failed else len(merged)
+
+
+def verify(name: str, mem_path: str, settings=None, log=print) -> bool:
+    """Check that a parallel scan reports exactly what a single process does.
+
+    Range copies for finders that need them go to ``settings.copy_dir`` or,
+    without one, to the check's own temporary folder.
+    """
+    f = FINDERS[name]
+    settings = settings or ScanSettings()
+    with tempfile.TemporaryDirectory(prefix="ramx-verify-") as tmp:
+        if settings.copy_dir is None:
+            settings = ScanSettings(settings.workers, settings.chunk_size, settings.tmp_dir,
+                                    os.path.join(tmp, "copies"))
+        single_out = os.path.join(tmp, "single.txt")
+        with open(single_out, "wb") as out:
+            subprocess.run(f.command(os.path.abspath(mem_path)), cwd=f.cwd, stdout=out,
+                           stderr=subprocess.DEVNULL)
+        with open(single_out, encoding="utf-8", errors="replace") as fh:
+            single = sorted({(int(o, 16), s) for o, s in iter_pairs(name, fh)})
+        parallel_scan(name, mem_path, tmp, settings, log)
+        with open(os.path.join(tmp, f.values_name), encoding="utf-8") as fh:
+            merged = [(int(o, 16), s) for o, s in
+                      (line.strip().split(",") for line in fh if line.strip())]
+    if single == merged:
+        log(f"{f.title}: parallel scan matches single-process run ({len(merged)} values)")
+        return True
+    missing = sorted(set(single) - set(merged))
+    extra = sorted(set(merged) - set(single))
+    log(f"{f.title}: MISMATCH, {len(missing)} missing and {len(extra)} extra values")
+    for off, size in missing[:20]:
+        log(f"  missing {off:#x},{size}")
+    for off, size in extra[:20]:
+        log(f"  extra {off:#x},{size}")
+    return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify parallel scans against a single-process run.")
+    parser.add_argument("memory", help="memory dump to scan")
+    parser.add_argument("algorithms", nargs="+", choices=sorted(FINDERS))
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument("--chunk-mib", type=int, default=256)
+    parser.add_argument("--copy-dir", default=None,
+                        help="folder for range copies of finders that need a file (default: a temporary folder)")
+    args = parser.parse_args()
+    settings = ScanSettings(args.workers, args.chunk_mib * 1024 * 1024, copy_dir=args.copy_dir)
+    ok = all([verify(name, args.memory, settings) for name in args.algorithms])
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,214 @@
+"""Parsers turning raw finder output into ``offset,size`` value files.
+
+Finder output is consumed incrementally: whitespace is dropped (records are
+split across lines, e.g. aeskeyfind puts the offset and the ``KEY:`` label
+on different lines) and only the unmatched tail is kept between feeds, so
+memory use stays constant however verbose the tool is.
+"""
+import codecs
+import os
+import re
+import threading
+import time
+
+# name -> (pattern, offset group, size group or None for a fixed size of 0)
+PATTERNS = {
+    "aes": (r"FOUNDPOSSIBLE(128|256)-BITKEYATBYTE([0-9A-Fa-f]+)KEY", 2, 1),
+    "rsa": (r"FOUNDPRIVATEKEYAT([0-9A-Fa-f]+)version", 1, None),
+    "twofish": (r"Twofishkeyfoundat([0-9A-Fa-f]+)\.", 1, None),
+    "serpent": (r"Found\(probable\)SERPENTkeyatoffset([0-9A-Fa-f]+):", 1, None),
+}
+
+# Longest unmatched tail kept between feeds; far longer than any record.
+MAX_PENDING = 4096
+_WHITESPACE = re.compile(r"\s+")
+
+
+class StreamParser:
+    """Incremental parser for one finder's output."""
+
+    def __init__(self, name: str):
+        pattern, self._off_group, self._size_group = PATTERNS[name]
+        self._regex = re.compile(pattern)
+        self._pending = ""
+
+    def feed(self, text: str) -> list:
+        """Consume more output and return the ``(offset, size)`` pairs it completes."""
+        self._pending += _WHITESPACE.sub("", text)
+        pairs, end = [], 0
+        for m in self._regex.finditer(self._pending):
+            size = m.group(self._size_group) if self._size_group else "0"
+            pairs.append((m.group(self._off_group), size))
+            end = m.end()
+        self._pending = self._pending[end:][-MAX_PENDING:]
+        return pairs
+
+
+class ValuesWriter:
+    """Writes ``offset,size`` lines as they are found, flushing every batch."""
+
+    def __init__(self, out_path: str):
+        self._f = open(out_path, "w", encoding="utf-8")
+        self.count = 0
+
+    def write(self, pairs):
+        for offset, size in pairs:
+            self._f.write(f"\n{offset},{size}" if self.count else f"{offset},{size}")
+            self.count += 1
+        if pairs:
+            self._f.flush()
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_pairs(name: str, lines):
+    """Yield ``(offset, size)`` pairs from an iterable of output lines."""
+    parser = StreamParser(name)
+    for line in lines:
+        yield from parser.feed(line)
+
+
+def extract(name: str, text: str) -> list:
+    """Return the ``(offset, size)`` pairs reported in finder output ``text``."""
+    return list(iter_pairs(name, text.splitlines()))
+
+
+def write_values(out_path: str, pairs):
+    with ValuesWriter(out_path) as writer:
+        writer.write(pairs)
+
+
+def parse_file(name: str, input_path: str, out_path: str) -> int:
+    """Parse a finished output file line by line; returns the number of values."""
+    parser = StreamParser(name)
+    with open(input_path, encoding="utf-8") as src, ValuesWriter(out_path) as writer:
+        for line in src:
+            writer.write(parser.feed(line))
+        return writer.count
+
+
+def follow(name: str, input_path: str, out_path: str, done, poll_interval: float = 0.2) -> int:
+    """Parse ``input_path`` while a finder is still writing it.
+
+    Values are appended to ``out_path`` as soon as their record is complete.
+    ``done`` is a ``threading.Event`` set once the finder has exited; the
+    rest of the file is drained after that.  Returns the number of values.
+    """
+    while not os.path.exists(input_path):
+        if done.is_set():
+            break
+        time.sleep(poll_interval)
+    parser = StreamParser(name)
+    with ValuesWriter(out_path) as writer:
+        if not os.path.exists(input_path):
+            return 0
+        with open(input_path, encoding="utf-8", errors="replace") as src:
+            while True:
+                finished = done.is_set()
+                line = src.readline()
+                if line:
+                    writer.write(parser.feed(line))
+                elif finished:
+                    break
+                else:
+                    time.sleep(poll_interval)
+        return writer.count
+
+
+class ChunkParser:
+    """Parses a finder's stdout from byte chunks as they are read from its pipe.
+
+    Values are written to ``out_path`` as soon as their record is complete.
+    :meth:`feed` never raises: a parse error is kept and raised by
+    :meth:`finish`.  ``parse_seconds`` is the CPU time spent parsing.
+    """
+
+    def __init__(self, name: str, out_path: str):
+        self._parser = StreamParser(name)
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._writer = ValuesWriter(out_path)
+        self.error = None
+        self.parse_seconds = 0.0
+
+    def feed(self, chunk: bytes, final: bool = False):
+        if self.error is not None:
+            return
+        start = time.thread_time()
+        try:
+            self._writer.write(self._parser.feed(self._decoder.decode(chunk, final)))
+        except Exception as e:
+            self.error = e
+        self.parse_seconds += time.thread_time() - start
+
+    def finish(self) -> int:
+        """Parse what is left once the finder has exited; returns the number of values."""
+        self.feed(b"", final=True)
+        self._writer.close()
+        self.parse_seconds = round(self.parse_seconds, 3)
+        if self.error is not None:
+            raise self.error
+        return self._writer.count
+
+
+class Follower(threading.Thread):
+    """Runs :func:`follow` in the background for the lifetime of a finder.
+
+    ``parse_seconds`` is the CPU time the thread spent parsing.
+    """
+
+    def __init__(self, name: str, input_path: str, out_path: str):
+        super().__init__(daemon=True)
+        self.finder = name
+        self.input_path = input_path
+        self.out_path = out_path
+        self.done = threading.Event()
+        self.count = 0
+        self.error = None
+        self.parse_seconds = 0.0
+
+    def run(self):
+        start = time.thread_time()
+        try:
+            self.count = follow(self.finder, self.input_path, self.out_path, self.done)
+        except Exception as e:
+            self.error = e
+        self.parse_seconds = round(time.thread_time() - start, 3)
+
+    def finish(self) -> int:
+        """Drain the rest of the output once the finder has exited."""
+        self.done.set()
+        self.join()
+        if self.error is not None:
+            raise self.error
+        return self.count
+
+
+def aes_parser(input_path: str, out_path: str):
+    parse_file("aes", input_path, out_path)
+
+
+def rsa_parser(input_path: str, out_path: str):
+    parse_file("rsa", input_path, out_path)
+
+
+def twofish_parser(input_path: str, out_path: str):
+    parse_file("twofish", input_path, out_path)
+
+
+def serpent_parser(input_path: str, out_path: str):
+    parse_file("serpent", input_path, out_path)
+
+
+PARSERS = {
+    "aes": aes_parser,
+    "rsa": rsa_parser,
+    "serpent": serpent_parser,
+    "twofish": twofish_parser,
+}
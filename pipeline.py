@@ -0,0 +1,350 @@
+"""Single-pass "Scan all" pipeline.
+
+The dump is read once, in large chunks, and every chunk is written to a named
+pipe per streamable finder, so N finders cost one sequential read of the dump
+instead of N.  Finders that need random access to their input (see
+``Finder.streamable``) are started on the dump path at the same time, so
+their reads overlap with the streaming pass and are mostly served from the
+page cache it populates.
+
+Split and compressed dumps (see :mod:`dumps`) are streamed the same way.
+Finders that need random access cannot read them through a pipe: they get
+a temporary raw copy only in a folder the caller names (``copy_dir``), and
+the scan fails with an error saying so otherwise.  With the
+page pre-filter (see :mod:`prefilter`) only candidate runs are streamed,
+and finders that need random access get a file of just those runs.
+"""
+import contextlib
+import errno
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+import dumps
+from finders import FINDERS
+from jobs import kill_group
+import metrics
+import progress as progress_
+from parsers import Follower
+import prefilter
+
+CHUNK_SIZE = 64 * 1024 * 1024
+FIFO_OPEN_TIMEOUT = 30.0
+
+
+def _pump(stream, log, prefix):
+    for line in iter(stream.readline, ""):
+        if line.strip():
+            log(f"{prefix}{line.strip()}")
+    stream.close()
+
+
+def _open_fifo_writer(path: str, proc, timeout: float = FIFO_OPEN_TIMEOUT):
+    """Open the write end of a FIFO once ``proc`` has opened the read end.
+
+    Returns None if the process exits (or never opens the pipe) first, so a
+    finder that fails to start cannot block the whole pipeline.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError as e:
+            if e.errno != errno.ENXIO:
+                raise
+            if proc.poll() is not None or time.monotonic() > deadline:
+                return None
+            time.sleep(0.05)
+            continue
+        os.set_blocking(fd, True)
+        return fd
+
+
+def _write_all(fd: int, buf):
+    view = memoryview(buf)
+    while view:
+        n = os.write(fd, view)
+        view = view[n:]
+
+
+def _feed(reader, fifo: str, proc, errors: list, chunk_size: int = CHUNK_SIZE):
+    """Write a dump stream into a finder's FIFO until it ends or the finder stops reading.
+
+    Read errors (a corrupt compressed dump) are appended to ``errors``.
+    """
+    fd = _open_fifo_writer(fifo, proc)
+    if fd is None:
+        return
+    buf = bytearray(chunk_size)
+    try:
+        while True:
+            n = reader.readinto(buf)
+            if not n:
+                break
+            _write_all(fd, memoryview(buf)[:n])
+    except BrokenPipeError:
+        pass
+    except Exception as e:
+        errors.append(e)
+    finally:
+        os.close(fd)
+
+
+def scan_all(mem_path: str, res_dir: str, names, log=print, chunk_size: int = CHUNK_SIZE,
+             usage=None, progress=None, cancel=None, page_filter: bool = False, copy_dir=None) -> dict:
+    """Run the selected finders over ``mem_path`` reading the dump only once.
+
+    Raw output and ``*_values.txt`` files are written to ``res_dir`` exactly
+    as the individual launchers do; offsets are into the raw dump also for
+    split and compressed ones.  Returns ``{name: exit code}``; a
+    ``usage`` dict is filled with each finder's resource usage.
+    ``progress(done, total)`` is called with the slowest finder's position:
+    the streaming pass for streamed finders, the read offset for the rest
+    (bytes of the files on disk, so compressed input counts compressed).
+    Each finder runs in its own process group, registered with the
+    ``cancel`` token (:class:`jobs.CancelToken`) if one is given; a
+    cancelled scan raises :class:`jobs.Cancelled` once its tools have exited.
+    With ``page_filter`` the finders only get the candidate runs of the
+    dump's page map, padded by the longest overlap among them.  A split or
+    compressed dump with a finder that needs random access raises
+    ValueError unless ``copy_dir`` names a folder for a raw copy.
+    """
+    usage = {} if usage is None else usage
+    mem_path = os.path.abspath(mem_path)
+    res_dir = os.path.abspath(res_dir)
+    os.makedirs(res_dir, exist_ok=True)
+    finders = [FINDERS[n] for n in names]
+    dump = dumps.open_source(mem_path)
+    layout = None
+    if page_filter:
+        page_map = prefilter.load(mem_path, res_dir, log=log, progress=progress, cancel=cancel)
+        layout = page_map.layout(max((f.overlap for f in finders), default=0))
+        log(page_map.summary(layout))
+
+    procs, outputs, pumps, writers, followers = {}, {}, [], {}, {}
+    with contextlib.ExitStack() as stack:
+        tmp = stack.enter_context(tempfile.TemporaryDirectory(prefix="ramx-"))
+        stream_layout = layout
+        if not all(f.streamable for f in finders):
+            # Finders that seek need one file; the others stream from it too.
+            if layout is not None:
+                dump = dumps.open_source(stack.enter_context(prefilter.compact(dump, layout, res_dir, log)))
+                stream_layout = None
+            elif not dump.is_file:
+                seeking = ", ".join(f.title for f in finders if not f.streamable)
+                dump = dumps.open_source(stack.enter_context(dumps.materialize(dump, copy_dir, log, seeking)))
+        mem_path = dump.path
+        codes = {}
+        try:
+            for f in finders:
+                if f.streamable:
+                    source = os.path.join(tmp, f"{f.name}.fifo")
+                    os.mkfifo(source)
+                else:
+                    source = mem_path
+                out_txt = os.path.join(res_dir, f.output_name)
+                cmd = f.command(source)
+                log(f"Executing command: {' '.join(cmd)} > {out_txt}")
+                out = open(out_txt, "wb")
+                try:
+                    proc = subprocess.Popen(
+                        cmd,
+                        cwd=f.cwd,
+                        stdout=out,
+                        stderr=subprocess.PIPE,
+                        universal_newlines=True,
+                        start_new_session=True
+                    )
+                except Exception as e:
+                    out.close()
+                    log(f"Error while starting {f.title}: {e}")
+                    continue
+                procs[f.name], outputs[f.name] = proc, out
+                if cancel is not None:
+                    cancel.register(proc.pid)
+                followers[f.name] = Follower(f.name, out_txt, os.path.join(res_dir, f.values_name))
+                followers[f.name].start()
+                t = threading.Thread(target=_pump, args=(proc.stderr, log, f"[{f.title}] "), daemon=True)
+                t.start()
+                pumps.append(t)
+                if f.streamable:
+                    fd = _open_fifo_writer(source, proc)
+                    if fd is None:
+                        log(f"{f.title} did not open its input pipe, skipping.")
+                        # It may still be running; it would wait for input forever.
+                        kill_group(proc.pid)
+                    else:
+                        writers[f.name] = fd
+
+            streamed = [0 if writers else None]
+
+            def position():
+                positions = [] if streamed[0] is None else [streamed[0]]
+                for name, proc in procs.items():
+                    if not FINDERS[name].streamable:
+                        pos = progress_.fd_position(proc.pid, mem_path)
+                        if pos is not None:
+                            positions.append(pos)
+                return min(positions) if positions else None
+
+            if progress is not None and procs:
+                sampler = progress_.Sampler(position, dump.disk_size, progress)
+                sampler.start()
+                stack.callback(sampler.stop)
+
+            if writers:
+                log(f"Streaming {dump.describe()} to {', '.join(FINDERS[n].title for n in writers)}…")
+                buf = bytearray(chunk_size)
+                with dump.open() as reader:
+                    src = reader if stream_layout is None else prefilter.FilteredReader(reader, stream_layout)
+                    while writers and not (cancel is not None and cancel.cancelled):
+                        n = src.readinto(buf)
+                        if not n:
+                            break
+                        chunk = memoryview(buf)[:n]
+                        streamed[0] = src.consumed
+                        for name, fd in list(writers.items()):
+                            try:
+                                _write_all(fd, chunk)
+                            except BrokenPipeError:
+                                log(f"{FINDERS[name].title} closed its input early.")
+                                os.close(fd)
+                                del writers[name]
+                streamed[0] = None
+        except BaseException:
+            # A failed read (a truncated compressed dump) or start: stop every
+            # finder so none is left waiting for input that never comes.
+            for proc in procs.values():
+                kill_group(proc.pid)
+            for out in outputs.values():
+                out.close()
+            for follower in followers.values():
+                follower.done.set()
+            raise
+        finally:
+            for fd in writers.values():
+                os.close(fd)
+            writers.clear()
+            for name, proc in procs.items():
+                usage[name] = metrics.wait(proc)
+                codes[name] = proc.returncode
+                if cancel is not None:
+                    cancel.unregister(proc.pid)
+                log(f"{FINDERS[name].title} finished with code: {codes[name]}")
+            for t in pumps:
+                t.join()
+
+    for name, out in outputs.items():
+        out.close()
+        f = FINDERS[name]
+        try:
+            count = followers[name].finish()
+            if layout is not None:
+                count = prefilter.remap(os.path.join(res_dir, f.output_name),
+                                        os.path.join(res_dir, f.values_name), layout)
+        except Exception as e:
+            log(f"Error in {name}_parser: {e}")
+            continue
+        usage[name]["parse_seconds"] = followers[name].parse_seconds
+        log(f"{f.title} output saved to {os.path.join(res_dir, f.output_name)}, "
+            f"{count} values saved to {os.path.join(res_dir, f.values_name)}")
+    if cancel is not None:
+        cancel.check()
+    return codes
+
+
+def run_finder(name: str, mem_path: str, res_dir: str, log=print, cache=None, full_hash: bool = False,
+               usage=None, progress=None, cancel=None, page_filter: bool = False, copy_dir=None) -> tuple:
+    """Run one finder directly on ``mem_path``, parsing its output as it runs.
+
+    Writes the same raw output and ``*_values.txt`` files as the launcher.
+    Split and compressed dumps are streamed into streamable finders through
+    a FIFO; other finders get a temporary raw copy in ``copy_dir``, and
+    ValueError is raised without one.
+    With a :class:`cache.ResultCache`, a previous result for the same dump
+    content and tool build is restored instead, and new results are stored.
+    Returns ``(exit code, number of values)``; a ``usage`` dict is filled
+    with the finder's resource usage and ``progress(done, total)`` is
+    called with its read position in the dump.  The finder runs in its own
+    process group, registered with the ``cancel`` token if one is given.
+    With ``page_filter`` the finder only gets the candidate runs of the
+    dump's page map (see :mod:`prefilter`); such results are not stored
+    in the cache, as their raw output has offsets into the runs.
+    """
+    f = FINDERS[name]
+    res_dir = os.path.abspath(res_dir)
+    os.makedirs(res_dir, exist_ok=True)
+    key = None
+    if cache is not None:
+        key = cache.key(mem_path, f, full_hash)
+        count = cache.restore(key, f, res_dir)
+        if count is not None:
+            log(f"{f.title}: restored {count} values from cache")
+            return 0, count
+    layout = None
+    if page_filter:
+        page_map = prefilter.load(mem_path, res_dir, log=log, progress=progress, cancel=cancel)
+        layout = page_map.layout(f.overlap)
+        log(page_map.summary(layout))
+        key = None
+    out_txt = os.path.join(res_dir, f.output_name)
+    values_txt = os.path.join(res_dir, f.values_name)
+    dump = dumps.open_source(mem_path)
+    with contextlib.ExitStack() as stack:
+        reader = None
+        if layout is not None and not f.streamable:
+            target = stack.enter_context(prefilter.compact(dump, layout, res_dir, log))
+        elif layout is None and (dump.is_file or not f.streamable):
+            target = stack.enter_context(dumps.materialize(dump, copy_dir, log, f.title))
+        else:
+            tmp = stack.enter_context(tempfile.TemporaryDirectory(prefix="ramx-"))
+            target = os.path.join(tmp, f"{name}.fifo")
+            os.mkfifo(target)
+            reader = stack.enter_context(dump.open())
+            if layout is not None:
+                reader = prefilter.FilteredReader(reader, layout)
+            log(f"Streaming {dump.describe()} to {f.title}…")
+        cmd = f.command(target)
+        log(f"Executing command: {' '.join(cmd)} > {out_txt}")
+        with open(out_txt, "wb") as out:
+            follower = Follower(name, out_txt, values_txt)
+            follower.start()
+            errors, feeder, sampler = [], None, None
+            try:
+                proc = subprocess.Popen(cmd, cwd=f.cwd, stdout=out, stderr=subprocess.PIPE,
+                                        universal_newlines=True, start_new_session=True)
+                if cancel is not None:
+                    cancel.register(proc.pid)
+                if reader is not None:
+                    feeder = threading.Thread(target=_feed, args=(reader, target, proc, errors), daemon=True)
+                    feeder.start()
+                    if progress:
+                        sampler = progress_.Sampler(lambda: reader.consumed, dump.disk_size, progress)
+                        sampler.start()
+                elif progress:
+                    sampler = progress_.watch(proc.pid, target, progress)
+                _pump(proc.stderr, log, f"[{f.title}] ")
+                stats = metrics.wait(proc)
+                if cancel is not None:
+                    cancel.unregister(proc.pid)
+                if feeder is not None:
+                    feeder.join()
+                code = proc.returncode
+            finally:
+                if sampler is not None:
+                    sampler.stop()
+                count = follower.finish()
+        if errors:
+            raise errors[0]
+    if layout is not None:
+        count = prefilter.remap(out_txt, values_txt, layout)
+    if usage is not None:
+        usage.update(stats, parse_seconds=follower.parse_seconds)
+    log(f"{f.title} finished with code: {code}")
+    if cancel is not None:
+        cancel.check()
+    if key is not None and code == 0:
+        cache.store(key, f, res_dir, mem_path, count)
+    return code, count
@@ -0,0 +1,430 @@
+"""Page pre-filter: scan only the parts of a dump that can hold a key.
+
+The dump is classified in ``PAGE_SIZE`` blocks as all zero, one repeated
+byte value, low entropy (Shannon entropy below ``ENTROPY_THRESHOLD`` bits
+per byte) or data, with NumPy over whole windows of a memory-mapped dump
+(split and compressed dumps are read as a stream).  Data pages are the
+candidates.  They are kept as a bitmap, one bit per page, in
+``page_map.bin`` in the results folder, which is reused for as long as
+the dump is unchanged.
+
+Scans then read only candidate runs: consecutive candidate pages widened
+by the finder's ``overlap`` on both sides, so a key that starts or ends in
+a skipped page is still read whole.  Finders get the runs back to back, ``overlap`` zero bytes
+apart so no match can span two of them, and the offsets they report are
+mapped back to the dump (:class:`Layout`); their raw output keeps the
+offsets into the filtered stream.  A hole no longer than the zero gap that
+would replace it is scanned instead.
+
+A key in an otherwise empty page keeps that page a candidate: half an
+AES-128 schedule (88 random bytes) among zeros is about 0.27 bits per
+byte, and every other key the finders match is longer.
+
+NumPy is required here, as for the built-in AES detector.  Usable on its
+own to classify a dump and time a filtered built-in AES scan against a
+full one::
+
+    python prefilter.py dump.mem -o results --compare
+"""
+import argparse
+import bisect
+import contextlib
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+import dumps
+from parsers import write_values
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+PAGE_SIZE = 4096
+ENTROPY_THRESHOLD = 0.2
+# Pages classified per NumPy pass.
+WINDOW_PAGES = 1024
+
+MAP_NAME = "page_map.bin"
+MAGIC = b"RAMXPGM1"
+# magic, page size, entropy threshold, dump size on disk, newest mtime of its
+# files, logical size, zero / constant / low-entropy / data page counts
+HEADER = struct.Struct("<8sIdQQQQQQQ")
+CLASSES = ("zero", "constant", "low entropy", "data")
+ZERO, CONSTANT, LOW_ENTROPY, DATA = range(4)
+REPEATED = 0x0101010101010101
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("numpy is required for the page pre-filter (pip install numpy)")
+
+
+_tables = {}
+
+
+def _count_log_count():
+    """``c * log2(c)`` for every count a page can have."""
+    if "clogc" not in _tables:
+        counts = np.arange(PAGE_SIZE + 1, dtype=np.float64)
+        table = np.zeros(PAGE_SIZE + 1)
+        table[1:] = counts[1:] * np.log2(counts[1:])
+        _tables["clogc"] = table
+    return _tables["clogc"]
+
+
+def classify(data, threshold: float = ENTROPY_THRESHOLD):
+    """Class (``ZERO`` … ``DATA``) of every whole page of the uint8 array ``data``."""
+    n = len(data) // PAGE_SIZE
+    pages = data[:n * PAGE_SIZE].reshape(n, PAGE_SIZE)
+    words = pages.view("<u8")
+    constant = (words == words[:, :1]).all(axis=1) & (words[:, 0] == pages[:, 0] * np.uint64(REPEATED))
+    classes = np.full(n, DATA, dtype=np.uint8)
+    classes[constant] = CONSTANT
+    classes[constant & (pages[:, 0] == 0)] = ZERO
+    mixed = np.flatnonzero(~constant)
+    if mixed.size:
+        # One histogram per page: bin ``256 * row + byte``.
+        bins = (np.arange(mixed.size, dtype=np.intp)[:, None] << 8) + pages[mixed]
+        counts = np.bincount(bins.ravel(), minlength=256 * mixed.size).reshape(mixed.size, 256)
+        entropy = math.log2(PAGE_SIZE) - _count_log_count()[counts].sum(axis=1) / PAGE_SIZE
+        classes[mixed[entropy < threshold]] = LOW_ENTROPY
+    return classes
+
+
+class PageMap:
+    """Candidate pages of a dump of ``size`` bytes: ``bits`` has one bool per page.
+
+    ``counts`` are the pages of each class; a trailing partial page is
+    always a candidate and counted as data.
+    """
+
+    def __init__(self, size: int, bits, counts, threshold: float = ENTROPY_THRESHOLD,
+                 page_size: int = PAGE_SIZE):
+        self.size = size
+        self.bits = bits
+        self.counts = tuple(counts)
+        self.threshold = threshold
+        self.page_size = page_size
+        self.seconds = 0.0
+        self.reused = False
+
+    def runs(self, pad: int) -> list:
+        """``(offset, length)`` ranges to scan: candidate pages widened by ``pad`` bytes, merged."""
+        edges = np.diff(self.bits.astype(np.int8), prepend=np.int8(0), append=np.int8(0))
+        starts = np.flatnonzero(edges == 1).astype(np.int64) * self.page_size - pad
+        ends = np.flatnonzero(edges == -1).astype(np.int64) * self.page_size + pad
+        if not starts.size:
+            return []
+        starts, ends = np.maximum(starts, 0), np.minimum(ends, self.size)
+        split = starts[1:] - ends[:-1] > pad
+        starts = starts[np.concatenate(([True], split))]
+        ends = ends[np.concatenate((split, [True]))]
+        return list(zip(starts.tolist(), (ends - starts).tolist()))
+
+    def layout(self, pad: int):
+        return Layout(self.runs(pad), pad)
+
+    def summary(self, layout) -> str:
+        pages = max(1, sum(self.counts))
+        classes = ", ".join(f"{100 * c / pages:.1f}% {name}" for name, c in zip(CLASSES, self.counts) if c)
+        mib = 1024 ** 2
+        ratio = self.size / layout.scanned if layout.scanned else float("inf")
+        source = "reused page map" if self.reused else f"classified in {self.seconds:.1f}s"
+        return (f"Pre-filter ({source}): pages {classes}; scanning {layout.scanned / mib:.1f} of "
+                f"{self.size / mib:.1f} MiB in {len(layout.runs)} runs, {ratio:.1f}x less than a full scan")
+
+
+class Layout:
+    """Candidate runs placed back to back in a filtered stream, ``gap`` zero bytes apart."""
+
+    def __init__(self, runs, gap: int):
+        self.runs = list(runs)
+        self.gap = gap
+        self.stream_starts = []
+        pos = 0
+        for _, length in self.runs:
+            self.stream_starts.append(pos)
+            pos += length + gap
+        self.stream_size = max(0, pos - gap)
+        self.scanned = sum(length for _, length in self.runs)
+
+    def to_dump(self, offset: int):
+        """Dump offset of a filtered-stream offset, or None if it lies in a gap."""
+        i = bisect.bisect_right(self.stream_starts, offset) - 1
+        if i < 0:
+            return None
+        start, length = self.runs[i]
+        inner = offset - self.stream_starts[i]
+        return start + inner if inner < length else None
+
+    def map_offsets(self, offsets):
+        """Vectorised :meth:`to_dump`: returns ``(dump offsets, keep mask)`` for an offsets array."""
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if not self.runs:
+            return offsets.astype(np.uint64), np.zeros(len(offsets), dtype=bool)
+        stream_starts = np.array(self.stream_starts, dtype=np.int64)
+        starts, lengths = (np.array(col, dtype=np.int64) for col in zip(*self.runs))
+        i = np.maximum(np.searchsorted(stream_starts, offsets, side="right") - 1, 0)
+        inner = offsets - stream_starts[i]
+        return (starts[i] + inner).astype(np.uint64), (inner >= 0) & (inner < lengths[i])
+
+
+class FilteredReader:
+    """The filtered stream of a :class:`Layout`, read from a :class:`dumps.DumpReader`.
+
+    ``consumed`` is the underlying reader's, so progress still runs
+    against the whole dump.
+    """
+
+    def __init__(self, reader, layout: Layout):
+        self.reader = reader
+        self.layout = layout
+        self.position = 0
+        self._run = 0
+        self._zeros = bytes(layout.gap)
+
+    @property
+    def consumed(self) -> int:
+        return self.reader.consumed
+
+    def readinto(self, buf) -> int:
+        view = memoryview(buf)
+        runs, stream_starts = self.layout.runs, self.layout.stream_starts
+        while self._run < len(runs):
+            start, length = runs[self._run]
+            stream_start = stream_starts[self._run]
+            if self.position < stream_start:
+                n = min(len(view), stream_start - self.position)
+                view[:n] = self._zeros[:n]
+                self.position += n
+                return n
+            inner = self.position - stream_start
+            if inner >= length:
+                self._run += 1
+                continue
+            if self.reader.position < start + inner:
+                self.reader.skip(start + inner - self.reader.position)
+            n = self.reader.readinto(view[:min(len(view), length - inner)])
+            if not n:
+                self._run = len(runs)
+                break
+            self.position += n
+            return n
+        return 0
+
+    def readinto_full(self, buf) -> int:
+        view, filled = memoryview(buf), 0
+        while filled < len(buf):
+            n = self.readinto(view[filled:])
+            if not n:
+                break
+            filled += n
+        return filled
+
+
+# -------------------- building and storing the map -------------------- #
+def map_path(res_dir: str) -> str:
+    return os.path.join(res_dir, MAP_NAME)
+
+
+def _mtime(dump) -> int:
+    return max(mtime for *_, mtime in dump.identity)
+
+
+def build(dump, threshold: float = ENTROPY_THRESHOLD, progress=None, cancel=None) -> PageMap:
+    """Classify every page of a :class:`dumps.DumpSource`.
+
+    ``progress(done, total)`` is called after every window; a ``cancel``
+    token (:class:`jobs.CancelToken`) is checked there too.
+    """
+    _require_numpy()
+    start = time.monotonic()
+    window = WINDOW_PAGES * PAGE_SIZE
+    classes = []
+
+    def step(done):
+        if cancel is not None:
+            cancel.check()
+        if progress is not None:
+            progress(done, dump.disk_size)
+
+    if dump.is_file:
+        size = dump.disk_size
+        if size:
+            with open(dump.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                data = np.frombuffer(mm, dtype=np.uint8)
+                for pos in range(0, size, window):
+                    classes.append(classify(data[pos:pos + window], threshold))
+                    step(min(pos + window, size))
+                del data
+    else:
+        buf = np.empty(window, dtype=np.uint8)
+        with dump.open() as reader:
+            while True:
+                n = reader.readinto_full(buf)
+                classes.append(classify(buf[:n], threshold))
+                step(reader.consumed)
+                if n < window:
+                    break
+            size = reader.position
+    classes = np.concatenate(classes) if classes else np.zeros(0, dtype=np.uint8)
+    counts = np.bincount(classes, minlength=4)
+    bits = classes == DATA
+    if size % PAGE_SIZE:
+        bits = np.append(bits, True)
+        counts[DATA] += 1
+    page_map = PageMap(size, bits, counts.tolist(), threshold)
+    page_map.seconds = time.monotonic() - start
+    return page_map
+
+
+def save(path: str, page_map: PageMap, dump):
+    """Write ``page_map`` to ``path`` atomically, stamped with the dump's size and mtime."""
+    tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, page_map.page_size, page_map.threshold, dump.disk_size, _mtime(dump),
+                            page_map.size, *page_map.counts))
+        f.write(np.packbits(page_map.bits, bitorder="little").tobytes())
+    os.replace(tmp, path)
+
+
+def read(path: str, dump, threshold: float = ENTROPY_THRESHOLD):
+    """The page map saved at ``path``, or None if it is missing or was made for another dump or threshold."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            magic, page_size, saved_threshold, disk_size, mtime, size, *counts = HEADER.unpack(header)
+            raw = f.read()
+    except (OSError, struct.error):
+        return None
+    if (magic != MAGIC or page_size != PAGE_SIZE or saved_threshold != threshold
+            or disk_size != dump.disk_size or mtime != _mtime(dump)):
+        return None
+    pages = -(-size // page_size)
+    if len(raw) * 8 < pages:
+        return None
+    bits = np.unpackbits(np.frombuffer(raw, dtype=np.uint8), count=pages, bitorder="little").astype(bool)
+    page_map = PageMap(size, bits, counts, threshold, page_size)
+    page_map.reused = True
+    return page_map
+
+
+def load(mem_path: str, res_dir: str, threshold: float = ENTROPY_THRESHOLD, log=print,
+         progress=None, cancel=None) -> PageMap:
+    """The page map of ``mem_path``: the one saved in ``res_dir`` if current, else a new one, saved there."""
+    _require_numpy()
+    dump = dumps.open_source(mem_path)
+    path = map_path(res_dir)
+    page_map = read(path, dump, threshold)
+    if page_map is not None:
+        return page_map
+    log(f"Classifying the pages of {dump.describe()}…")
+    page_map = build(dump, threshold, progress, cancel)
+    os.makedirs(res_dir, exist_ok=True)
+    save(path, page_map, dump)
+    log(f"Page map saved to {path}")
+    return page_map
+
+
+# -------------------- filtered scans -------------------- #
+@contextlib.contextmanager
+def compact(dump, layout: Layout, directory=None, log=print):
+    """Path of a temporary file holding the filtered stream, for finders that seek; removed on exit."""
+    fd, path = tempfile.mkstemp(prefix="ramx-runs-", suffix=".mem", dir=directory)
+    try:
+        log(f"Writing the {len(layout.runs)} candidate runs of {dump.describe()} to {path}…")
+        try:
+            if dump.seekable:
+                # Gaps are left as holes.
+                for (start, length), stream_start in zip(layout.runs, layout.stream_starts):
+                    os.lseek(fd, stream_start, os.SEEK_SET)
+                    dump.copy_range(fd, start, length)
+            else:
+                buf = bytearray(dumps.READ_SIZE)
+                with dump.open() as reader:
+                    filtered = FilteredReader(reader, layout)
+                    while True:
+                        n = filtered.readinto(buf)
+                        if not n:
+                            break
+                        os.write(fd, memoryview(buf)[:n])
+            os.ftruncate(fd, layout.stream_size)
+        finally:
+            os.close(fd)
+        yield path
+    finally:
+        os.remove(path)
+
+
+def _hex_like(token: str, value: int) -> str:
+    text = format(value, f"0{len(token)}x")
+    return text.upper() if any(c in "ABCDEF" for c in token) else text
+
+
+def remap(output_path: str, values_path: str, layout: Layout) -> int:
+    """Rewrite a values file written from a filtered stream with dump offsets; returns the count.
+
+    A note is appended to the raw output, whose offsets stay as the tool
+    reported them.
+    """
+    pairs = []
+    with open(values_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            offset, size = line.split(",")
+            mapped = layout.to_dump(int(offset, 16))
+            if mapped is not None:
+                pairs.append((_hex_like(offset, mapped), size))
+    write_values(values_path, pairs)
+    with open(output_path, "a", encoding="utf-8") as f:
+        f.write(f"\n# Pre-filtered scan: offsets above are into the candidate runs; "
+                f"{os.path.basename(values_path)} has them as dump offsets.\n")
+    return len(pairs)
+
+
+def compare(mem_path: str, res_dir: str, log=print) -> bool:
+    """Time the built-in AES detector with and without the pre-filter and compare the keys found."""
+    import aesfind
+
+    dump = dumps.open_source(mem_path)
+    if not dump.is_file:
+        raise ValueError("--compare needs a single raw dump")
+    page_map = load(mem_path, res_dir, log=log)
+    layout = page_map.layout(aesfind.SCHEDULE_256)
+    log(page_map.summary(layout))
+    start = time.monotonic()
+    full = aesfind.scan_file(dump.path)
+    full_time = time.monotonic() - start
+    start = time.monotonic()
+    filtered = aesfind.scan_filtered(dump, layout)
+    filtered_time = time.monotonic() - start
+    mib = dump.disk_size / 1024 ** 2
+    log(f"full scan:     {full_time:8.2f}s {mib / max(full_time, 1e-9):8.1f} MiB/s {len(full[0])} keys")
+    log(f"pre-filtered:  {filtered_time:8.2f}s {mib / max(filtered_time, 1e-9):8.1f} MiB/s "
+        f"{len(filtered[0])} keys, {full_time / max(filtered_time, 1e-9):.1f}x faster")
+    same = (sorted(zip(full[0].tolist(), full[1].tolist()))
+            == sorted(zip(filtered[0].tolist(), filtered[1].tolist())))
+    log("Keys match." if same else "MISMATCH between full and pre-filtered scans.")
+    return same
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classify the pages of a dump for pre-filtered scans.")
+    parser.add_argument("memory", help="memory dump (raw, split or compressed)")
+    parser.add_argument("-o", "--results", default=".", help=f"folder for {MAP_NAME}")
+    parser.add_argument("--compare", action="store_true",
+                        help="time a pre-filtered built-in AES scan against a full one")
+    args = parser.parse_args()
+    if args.compare:
+        sys.exit(0 if compare(args.memory, args.results) else 1)
+    pm = load(args.memory, args.results)
+    print(pm.summary(pm.layout(0)))
@@ -0,0 +1,221 @@
+"""One asyncio event loop, on one background thread, running every tool process.
+
+Commands are argument lists started without a shell, each in its own
+session (process group).  A command's stdout can go straight to a file
+(the finders' raw output), or be copied to the file by the loop and handed
+to a parser chunk by chunk as it arrives; whatever else it prints is read from a
+non-blocking pipe in buffered chunks, split into lines and handed to the
+caller in batches, at most one call every ``FLUSH_INTERVAL`` seconds.  A
+run can have a timeout and honours a :class:`jobs.CancelToken`; either
+way the process group is terminated with :func:`jobs.kill_group`.
+
+The loop does not let asyncio reap the children: their exit is watched on
+a pidfd and they are then waited for with :func:`metrics.wait`, so the
+CPU time, peak RSS and bytes read are still known.  Progress is sampled
+from the loop too, so a running command costs no thread of its own.
+
+:func:`submit` returns a ``concurrent.futures.Future`` of a
+:class:`Result` and can be called from any thread; :func:`run` and
+:func:`run_command` block until the command has finished.
+"""
+import asyncio
+import os
+import subprocess
+import threading
+from concurrent.futures import Future
+
+from jobs import kill_group
+from logbuffer import FLUSH_INTERVAL
+import metrics
+import progress
+
+READ_SIZE = 64 * 1024
+
+_loop = None
+_lock = threading.Lock()
+
+
+class Result:
+    """Outcome of one command; ``returncode`` is negative when it died of a signal."""
+
+    def __init__(self, returncode: int, usage: dict, timed_out: bool = False):
+        self.returncode = returncode
+        self.usage = usage
+        self.timed_out = timed_out
+
+
+def loop() -> asyncio.AbstractEventLoop:
+    """The engine's event loop, started on a daemon thread on first use."""
+    global _loop
+    with _lock:
+        if _loop is None:
+            new_loop = asyncio.new_event_loop()
+            threading.Thread(target=new_loop.run_forever, name="procengine", daemon=True).start()
+            _loop = new_loop
+        return _loop
+
+
+class _Lines:
+    """Splits chunks into stripped, non-empty lines and passes them on in timed batches."""
+
+    def __init__(self, emit):
+        self._emit = emit
+        self._tail = b""
+        self._lines = []
+        self._timer = None
+
+    def feed(self, chunk: bytes):
+        *lines, self._tail = (self._tail + chunk).split(b"\n")
+        self._add(lines)
+
+    def _add(self, lines):
+        for raw in lines:
+            line = raw.decode("utf-8", errors="replace").strip()
+            if line:
+                self._lines.append(line)
+        if self._lines and self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(FLUSH_INTERVAL, self.flush)
+
+    def flush(self):
+        self._timer = None
+        lines, self._lines = self._lines, []
+        if lines:
+            self._emit(lines)
+
+    def close(self):
+        self._add([self._tail])
+        self._tail = b""
+        if self._timer is not None:
+            self._timer.cancel()
+        self.flush()
+
+
+async def _exited(proc) -> dict:
+    """Wait for ``proc`` to exit without blocking the loop; returns its usage."""
+    loop_ = asyncio.get_running_loop()
+    try:
+        pidfd = os.pidfd_open(proc.pid)
+    except (AttributeError, OSError):
+        # No pidfds (old kernel or Python): wait on a pool thread instead.
+        return await loop_.run_in_executor(None, metrics.wait, proc)
+    exited = loop_.create_future()
+    loop_.add_reader(pidfd, lambda: exited.done() or exited.set_result(None))
+    try:
+        await exited
+    finally:
+        loop_.remove_reader(pidfd)
+        os.close(pidfd)
+    return metrics.wait(proc)
+
+
+async def _sample(pid: int, path: str, callback, interval: float):
+    total = os.path.getsize(path)
+    while True:
+        await asyncio.sleep(interval)
+        pos = progress.fd_position(pid, path)
+        if pos is not None:
+            callback(min(pos, total), total)
+
+
+async def _pipe_reader(loop_, pipe):
+    reader = asyncio.StreamReader(limit=READ_SIZE)
+    transport, _ = await loop_.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+    return reader, transport
+
+
+async def _run(command, cwd, stdout_path, output, parse, watch, timeout, cancel) -> Result:
+    out = open(os.path.join(cwd or "", stdout_path), "wb") if stdout_path else None
+    copy_stdout = out is not None and parse is not None
+    try:
+        proc = subprocess.Popen(command, cwd=cwd, stdout=subprocess.PIPE if copy_stdout or not out else out,
+                                stderr=subprocess.PIPE if out else subprocess.STDOUT,
+                                start_new_session=True)
+    except BaseException:
+        if out is not None:
+            out.close()
+        raise
+    if out is not None and not copy_stdout:
+        out.close()
+    if cancel is not None:
+        cancel.register(proc.pid)
+    loop_ = asyncio.get_running_loop()
+    lines = _Lines(output) if output is not None else None
+    reader, transport = await _pipe_reader(loop_, proc.stderr if out else proc.stdout)
+    stdout_reader, stdout_transport = await _pipe_reader(loop_, proc.stdout) if copy_stdout else (None, None)
+    sampler = loop_.create_task(_sample(proc.pid, watch[0], watch[1], progress.SAMPLE_INTERVAL)) if watch else None
+
+    async def copy():
+        while True:
+            chunk = await stdout_reader.read(READ_SIZE)
+            if not chunk:
+                break
+            out.write(chunk)
+            parse(chunk)
+
+    async def finish() -> dict:
+        copier = loop_.create_task(copy()) if copy_stdout else None
+        while True:
+            chunk = await reader.read(READ_SIZE)
+            if not chunk:
+                break
+            if lines is not None:
+                lines.feed(chunk)
+        if copier is not None:
+            await copier
+        return await _exited(proc)
+
+    task = loop_.create_task(finish())
+    timed_out = False
+    try:
+        try:
+            usage = await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            if lines is not None:
+                lines.feed(f"\nTimed out after {timeout:g}s, terminating.\n".encode())
+            kill_group(proc.pid)
+            usage = await task
+    finally:
+        transport.close()
+        if copy_stdout:
+            stdout_transport.close()
+            out.close()
+        if sampler is not None:
+            sampler.cancel()
+        if lines is not None:
+            lines.close()
+        if cancel is not None:
+            cancel.unregister(proc.pid)
+    return Result(proc.returncode, usage, timed_out)
+
+
+def submit(command, cwd=None, stdout_path=None, output=None, parse=None, watch=None, timeout=None,
+           cancel=None) -> Future:
+    """Start ``command`` (an argument list) on the engine; returns a Future of its :class:`Result`.
+
+    ``stdout_path`` (relative to ``cwd``) receives stdout, and only stderr
+    is then read.  With ``parse`` as well, stdout is read by the engine,
+    written to that file and passed to ``parse(chunk)`` as bytes; it must
+    not raise.  ``output(lines)`` gets the lines read, a list per batch, on the
+    engine's thread.  ``watch`` is an optional (dump path, callback) pair;
+    the callback gets the command's read position in the dump as
+    ``(done, total)``.  After ``timeout`` seconds the command's process
+    group is terminated and the result has ``timed_out`` set.  The process
+    group is registered with ``cancel``.  The Future raises if the command
+    could not be started.
+    """
+    return asyncio.run_coroutine_threadsafe(
+        _run(list(command), cwd, stdout_path, output, parse, watch, timeout, cancel), loop())
+
+
+def run(command, **kwargs) -> Result:
+    """Like :func:`submit`, but waits for the command and returns its :class:`Result`."""
+    return submit(command, **kwargs).result()
+
+
+def run_command(command, log, cwd=None, timeout=None, cancel=None) -> int:
+    """Run ``command`` with each output line sent to ``log``; returns the exit code."""
+    def output(lines):
+        for line in lines:
+            log(line)
+    return run(command, cwd=cwd, output=output, timeout=timeout, cancel=cancel).returncode
@@ -0,0 +1,148 @@
+"""Progress of long scans: how far into the dump a scan has got.
+
+External finders are sampled from outside: the position of the file
+descriptor they hold on the dump, read from ``/proc/<pid>/fdinfo`` (the
+finder's descendants are searched too, for finders that are wrapper
+scripts).  A tool that maps the dump instead of reading it has no such
+position and reports no progress.  Scans that feed the dump themselves
+(FIFO streaming, parallel ranges, the built-in AES detector) report their
+own position.  Either way progress arrives as ``callback(done, total)``.
+"""
+import os
+import threading
+import time
+
+SAMPLE_INTERVAL = 1.0
+# Weight of the newest sample in the smoothed throughput.
+RATE_SMOOTHING = 0.3
+MIN_RATE_INTERVAL = 0.5
+
+
+def _children(pid: int) -> list:
+    out = []
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return out
+    for tid in tasks:
+        try:
+            with open(f"/proc/{pid}/task/{tid}/children", encoding="ascii") as f:
+                out.extend(int(c) for c in f.read().split())
+        except OSError:
+            pass
+    return out
+
+
+def descendants(pid: int) -> list:
+    """``pid`` and every process below it."""
+    found, queue = [], [pid]
+    while queue:
+        p = queue.pop()
+        found.append(p)
+        queue.extend(_children(p))
+    return found
+
+
+def fd_position(pid: int, path: str):
+    """Furthest read position on ``path`` of ``pid`` or its descendants, or None."""
+    try:
+        target = os.stat(path)
+    except OSError:
+        return None
+    best = None
+    for p in descendants(pid):
+        try:
+            fds = os.listdir(f"/proc/{p}/fd")
+        except OSError:
+            continue
+        for fd in fds:
+            try:
+                st = os.stat(f"/proc/{p}/fd/{fd}")
+                if (st.st_dev, st.st_ino) != (target.st_dev, target.st_ino):
+                    continue
+                with open(f"/proc/{p}/fdinfo/{fd}", encoding="ascii") as f:
+                    for line in f:
+                        if line.startswith("pos:"):
+                            pos = int(line.split()[1])
+                            best = pos if best is None else max(best, pos)
+                            break
+            except (OSError, ValueError):
+                continue
+    return best
+
+
+class Rate:
+    """Smoothed throughput and ETA from successive ``(done, total)`` samples."""
+
+    def __init__(self):
+        self.rate = None
+        self.eta = None
+        self._last = None
+
+    def update(self, done: int, total: int) -> tuple:
+        now = time.monotonic()
+        if self._last is None:
+            self._last = (now, done)
+        else:
+            t0, d0 = self._last
+            # Bursts of updates (ranges finishing together) would give
+            # meaningless rates; fold them into the next interval instead.
+            if now - t0 >= MIN_RATE_INTERVAL and done >= d0:
+                current = (done - d0) / (now - t0)
+                self.rate = current if self.rate is None else (
+                    RATE_SMOOTHING * current + (1 - RATE_SMOOTHING) * self.rate)
+                self._last = (now, done)
+        self.eta = (total - done) / self.rate if self.rate else None
+        return self.rate, self.eta
+
+
+class Sampler(threading.Thread):
+    """Calls ``callback(position(), total)`` every ``interval`` seconds until stopped.
+
+    Samples where ``position`` returns None are skipped.
+    """
+
+    def __init__(self, position, total: int, callback, interval: float = SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.position = position
+        self.total = total
+        self.callback = callback
+        self.interval = interval
+        self._halt = threading.Event()
+
+    def run(self):
+        while not self._halt.wait(self.interval):
+            pos = self.position()
+            if pos is not None:
+                self.callback(min(pos, self.total), self.total)
+
+    def stop(self):
+        self._halt.set()
+        self.join()
+
+
+def watch(pid: int, path: str, callback, interval: float = SAMPLE_INTERVAL):
+    """Start a :class:`Sampler` on the read position of ``pid`` in ``path``; returns it."""
+    sampler = Sampler(lambda: fd_position(pid, path), os.path.getsize(path), callback, interval)
+    sampler.start()
+    return sampler
+
+
+def format_duration(seconds) -> str:
+    if seconds is None:
+        return "?"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+def format_progress(done: int, total: int, rate=None, eta=None) -> str:
+    """E.g. ``42.0% · 512 MB/s · ETA 3m10s``."""
+    pct = 100.0 * done / total if total else 0.0
+    text = f"{pct:.1f}%"
+    if rate:
+        text += f" · {rate / 1e6:.0f} MB/s · ETA {format_duration(eta)}"
+    return text
@@ -0,0 +1,245 @@
+"""Startup tasks: install the finders and build interrogate and Zeroizer.
+
+The steps form a small dependency graph that runs on a thread pool, so the
+apt install and the two clone/pull + make chains proceed side by side.
+Every step first checks whether there is anything to do and is skipped if
+not: apt packages whose installed version is already the candidate, git
+checkouts whose HEAD did not move on pull, and builds whose outputs are
+newer than every tracked source.  A failed pull (no network) falls back to
+the local checkout.  Each step reports how long it took.  The commands
+themselves run on the shared :mod:`procengine` loop.
+
+Usable without the GUI::
+
+    python provision.py
+"""
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from procengine import run_command
+
+APT_PACKAGES = ("aeskeyfind", "rsakeyfind")
+# package -> command whose presence means it is installed
+APT_COMMANDS = {"git": "git", "build-essential": "make"}
+
+# directory -> (clone URL, build output)
+REPOS = {
+    "interrogate": ("https://github.com/carmaa/interrogate.git", "interrogate"),
+    "Zeroizer": ("https://github.com/kacper0N/Zeroizer.git", "zeroize_dump"),
+}
+
+
+class Task:
+    """One step of the startup graph; ``func(log)`` returns a status string or raises."""
+
+    def __init__(self, name: str, func, deps=()):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.status = "pending"
+        self.seconds = 0.0
+
+
+def check_graph(tasks):
+    """Raise ValueError if ``tasks`` repeat a name, depend on an unknown task or form a cycle."""
+    by_name = {}
+    for task in tasks:
+        if task.name in by_name:
+            raise ValueError(f"Duplicate startup task {task.name!r}")
+        by_name[task.name] = task
+    for task in tasks:
+        unknown = [d for d in task.deps if d not in by_name]
+        if unknown:
+            raise ValueError(f"Startup task {task.name!r} depends on unknown tasks: {', '.join(unknown)}")
+    # Repeatedly drop tasks whose dependencies are all dropped; whatever is left is in a cycle.
+    left = dict(by_name)
+    while left:
+        ready = [name for name, task in left.items() if not any(d in left for d in task.deps)]
+        if not ready:
+            raise ValueError(f"Startup tasks depend on each other in a cycle: {', '.join(sorted(left))}")
+        for name in ready:
+            del left[name]
+
+
+def run_graph(tasks, log=print, max_workers: int = 4) -> list:
+    """Run ``tasks`` as soon as their dependencies succeed; returns them with status and timing.
+
+    A task whose dependency failed is not run and gets the status
+    ``"blocked"``.  The graph is checked with :func:`check_graph` first, so
+    an unknown dependency or a cycle raises ValueError before anything runs.
+    """
+    check_graph(tasks)
+    by_name = {t.name: t for t in tasks}
+    pending = list(tasks)
+    running = {}
+
+    def call(task):
+        start = time.monotonic()
+        try:
+            task.status = task.func(lambda msg: log(f"[{task.name}] {msg}")) or "done"
+        except Exception as e:
+            task.status = "failed"
+            log(f"[{task.name}] Error: {e}")
+        task.seconds = time.monotonic() - start
+        return task
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            for task in list(pending):
+                deps = [by_name[d] for d in task.deps]
+                if any(d.status in ("failed", "blocked") for d in deps):
+                    task.status = "blocked"
+                    pending.remove(task)
+                elif all(d.status not in ("pending", "running") for d in deps):
+                    task.status = "running"
+                    pending.remove(task)
+                    running[pool.submit(call, task)] = task
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                log(f"[{task.name}] {task.status} in {task.seconds:.1f}s")
+    return list(tasks)
+
+
+# -------------------- helpers -------------------- #
+def _output(command, cwd=None) -> str:
+    try:
+        return subprocess.run(command, cwd=cwd, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def apt_versions(package: str) -> tuple:
+    """``(installed, candidate)`` versions from the local apt lists ("" when unknown)."""
+    installed = candidate = ""
+    for line in _output(["apt-cache", "policy", package]).splitlines():
+        key, _, value = line.strip().partition(":")
+        if key == "Installed":
+            installed = "" if value.strip() == "(none)" else value.strip()
+        elif key == "Candidate":
+            candidate = "" if value.strip() == "(none)" else value.strip()
+    if not installed:
+        status = _output(["dpkg-query", "-W", "-f=${Status}|${Version}", package])
+        if status.startswith("install ok installed|"):
+            installed = status.split("|", 1)[1]
+    return installed, candidate
+
+
+def packages_to_install() -> list:
+    """Packages that are missing or older than the apt candidate."""
+    wanted = [pkg for pkg, cmd in APT_COMMANDS.items() if not shutil.which(cmd)]
+    for pkg in APT_PACKAGES:
+        installed, candidate = apt_versions(pkg)
+        if not installed or (candidate and installed != candidate):
+            wanted.append(pkg)
+    return wanted
+
+
+def git_head(repo_dir: str) -> str:
+    return _output(["git", "rev-parse", "HEAD"], cwd=repo_dir)
+
+
+def sources_mtime(repo_dir: str) -> float:
+    """Newest mtime of the checkout's tracked files (all files when git is unavailable)."""
+    files = _output(["git", "ls-files", "-z"], cwd=repo_dir).split("\0")
+    files = [f for f in files if f] or [
+        os.path.relpath(os.path.join(root, name), repo_dir)
+        for root, dirs, names in os.walk(repo_dir)
+        if ".git" not in root.split(os.sep) for name in names]
+    newest = 0.0
+    for name in files:
+        try:
+            newest = max(newest, os.path.getmtime(os.path.join(repo_dir, name)))
+        except OSError:
+            pass
+    return newest
+
+
+def is_built(repo_dir: str, output: str) -> bool:
+    path = os.path.join(repo_dir, output)
+    return os.path.isfile(path) and os.path.getmtime(path) >= sources_mtime(repo_dir)
+
+
+# -------------------- steps -------------------- #
+def install_packages(log) -> str:
+    wanted = packages_to_install()
+    if not wanted:
+        log("All packages are installed and current, skipping.")
+        return "skipped"
+    log("Installing/updating " + ", ".join(wanted) + "…")
+    code = run_command(["sudo", "apt", "install", "-y", *wanted], log)
+    if code != 0:
+        raise RuntimeError(f"apt install exited with code {code}")
+    return "done"
+
+
+def sync_repo(repo_dir: str, url: str):
+    def step(log) -> str:
+        if not os.path.exists(repo_dir):
+            log(f"Cloning {repo_dir}…")
+            code = run_command(["git", "clone", url, repo_dir], log)
+            if code != 0:
+                raise RuntimeError(f"git clone exited with code {code}")
+            return "done"
+        before = git_head(repo_dir)
+        log(f"Updating {repo_dir}…")
+        if run_command(["git", "pull"], log, cwd=repo_dir) != 0:
+            log("Pull failed (offline?), using the local checkout.")
+            return "skipped"
+        if git_head(repo_dir) == before:
+            log(f"{repo_dir} is up to date.")
+            return "skipped"
+        return "done"
+    return step
+
+
+def build_repo(repo_dir: str, output: str):
+    def step(log) -> str:
+        if is_built(repo_dir, output):
+            log(f"{output} is newer than its sources, skipping build.")
+            return "skipped"
+        log(f"Building {repo_dir}…")
+        code = run_command(["make"], log, cwd=repo_dir)
+        if code != 0:
+            raise RuntimeError(f"make exited with code {code}")
+        return "done"
+    return step
+
+
+def startup_tasks() -> list:
+    """The startup graph; steps wait for apt only when they need a tool it installs."""
+    need_git = [] if shutil.which("git") else ["apt"]
+    need_make = [] if shutil.which("make") else ["apt"]
+    tasks = [Task("apt", install_packages)]
+    for repo_dir, (url, output) in REPOS.items():
+        tasks.append(Task(f"{repo_dir}: sync", sync_repo(repo_dir, url), need_git))
+        tasks.append(Task(f"{repo_dir}: build", build_repo(repo_dir, output),
+                          [f"{repo_dir}: sync", *need_make]))
+    return tasks
+
+
+def provision(log=print, max_workers: int = 4) -> list:
+    """Run every startup step and log a timing summary; returns the tasks."""
+    start = time.monotonic()
+    lock = threading.Lock()
+
+    def safe_log(msg):
+        with lock:
+            log(msg)
+
+    tasks = run_graph(startup_tasks(), safe_log, max_workers)
+    summary = ", ".join(f"{t.name} {t.status} {t.seconds:.1f}s" for t in tasks)
+    log(f"Startup tasks finished in {time.monotonic() - start:.1f}s ({summary})")
+    return tasks
+
+
+if __name__ == "__main__":
+    results = provision()
+    sys.exit(1 if any(t.status in ("failed", "blocked") for t in results) else 0)
@@ -0,0 +1,96 @@
+"""Queue for tool runs: priority order, a limit on concurrent I/O-heavy jobs, cancellation.
+
+Jobs are submitted with a ``start(job)`` callable that launches their work
+without blocking.  The scheduler starts queued jobs, highest priority first
+and in submission order within a priority, while fewer than ``max_io``
+I/O-heavy jobs are running.  A job holds its slot until it leaves the
+RUNNING state (parsing results does not hold up the next scan).
+
+The scheduler is not thread-safe: use it from one thread (the GUI thread)
+and forward every job state change to :meth:`Scheduler.job_changed` there.
+"""
+import heapq
+import itertools
+import os
+
+from jobs import JobState
+
+DEFAULT_MAX_IO = 2
+
+
+class Scheduler:
+    def __init__(self, max_io: int = DEFAULT_MAX_IO, log=print):
+        self.max_io = max(1, max_io)
+        self.log = log
+        self._queue = []
+        self._seq = itertools.count()
+        self._starts = {}
+        self._running = {}
+        self._started = set()
+
+    def submit(self, job, start, priority: int = 0, io_heavy: bool = True):
+        """Queue ``job``; ``start(job)`` is called when it may run."""
+        job.priority = priority
+        if not io_heavy:
+            self._start(job, start)
+            return
+        self._starts[job.id] = start
+        heapq.heappush(self._queue, (-priority, next(self._seq), job))
+        if len(self._running) >= self.max_io:
+            self.log(f"{job.title} queued ({self.queued_count()} waiting, priority {priority})")
+        self._dispatch()
+
+    def set_limit(self, max_io: int):
+        self.max_io = max(1, max_io)
+        self._dispatch()
+
+    def queued_count(self) -> int:
+        return sum(1 for *_, job in self._queue if job.state is JobState.QUEUED)
+
+    def _start(self, job, start):
+        self._started.add(job.id)
+        try:
+            start(job)
+        except Exception as e:
+            self.log(f"Could not start {job.title}: {e}")
+            job.set_state(JobState.FAILED, e)
+
+    def _dispatch(self):
+        while self._queue and len(self._running) < self.max_io:
+            *_, job = heapq.heappop(self._queue)
+            start = self._starts.pop(job.id)
+            if job.state is not JobState.QUEUED:
+                continue
+            self._running[job.id] = job
+            self._start(job, start)
+
+    def job_changed(self, job):
+        """Release the job's slot once it stops running; clean up if it was cancelled."""
+        if job.id in self._running and job.state not in (JobState.QUEUED, JobState.RUNNING):
+            del self._running[job.id]
+            self._dispatch()
+        if job.state is JobState.CANCELLED and job.id in self._started:
+            self._started.discard(job.id)
+            self.cleanup(job)
+
+    def cancel(self, job) -> bool:
+        """Cancel a queued or running job; returns False if it had already finished."""
+        if job.finished:
+            return False
+        if job.state is JobState.QUEUED and job.id not in self._started:
+            job.set_state(JobState.CANCELLED)
+            return True
+        self.log(f"Cancelling {job.title}…")
+        job.cancel_token.cancel()
+        return True
+
+    def cleanup(self, job):
+        """Remove the partial output files of a cancelled job."""
+        for path in job.outputs:
+            try:
+                os.remove(path)
+                self.log(f"Removed partial output {path}")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.log(f"Could not remove {path}: {e}")
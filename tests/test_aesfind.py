@@ -0,0 +1,61 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import aesfind  # noqa: E402
+
+
+def _dump_with(keys, size=1 << 16, seed=0):
+    data = np.random.default_rng(seed).integers(0, 256, size, dtype=np.uint8)
+    for offset, key in keys:
+        schedule = np.frombuffer(aesfind.expand_key(key), dtype=np.uint8)
+        data[offset:offset + len(schedule)] = schedule
+    return data
+
+
+def test_expand_key_matches_fips_197():
+    # Appendix A.1 and A.3: last round key of the example schedules.
+    key128 = bytes.fromhex("2b7e151628aed2a6abf7158809cf4f3c")
+    assert aesfind.expand_key(key128)[-16:].hex() == "d014f9a8c9ee2589e13f0cc8b6630ca6"
+    key256 = bytes.fromhex("603deb1015ca71be2b73aef0857d77811f352c073b6108d72d9810a30914dff4")
+    assert aesfind.expand_key(key256)[-16:].hex() == "fe4890d1e6188d0b046df344706c631e"
+
+
+def test_finds_planted_128_and_256_bit_keys():
+    rng = np.random.default_rng(1)
+    data = _dump_with([(1001, rng.bytes(16)), (40003, rng.bytes(32))])
+    offsets, bits = aesfind.scan_array(data, len(data))
+    assert offsets.tolist() == [1001, 40003]
+    assert bits.tolist() == [128, 256]
+
+
+def test_bit_errors_up_to_the_threshold_are_tolerated():
+    data = _dump_with([(5000, np.random.default_rng(2).bytes(16))])
+    data[5000 + 100] ^= 0x01
+    assert aesfind.scan_array(data, len(data))[0].tolist() == [5000]
+    assert aesfind.scan_array(data, len(data), threshold=0)[0].tolist() == []
+
+
+def test_low_entropy_schedule_is_skipped():
+    # The all-zero key starts with 16 zero bytes.
+    data = _dump_with([(3000, bytes(16))])
+    assert aesfind.scan_array(data, len(data))[0].tolist() == []
+
+
+@pytest.mark.parametrize("data", [
+    np.zeros(1 << 16, np.uint8),
+    np.full(1 << 16, 0xFF, np.uint8),
+    np.tile(np.array([0, 0, 0, 1], np.uint8), 1 << 14),
+])
+def test_repetitive_data_yields_nothing(data):
+    assert aesfind.scan_array(data, len(data) - aesfind.SCHEDULE_256)[0].tolist() == []
+
+
+def test_scan_file_finds_a_key_across_a_window_boundary(tmp_path):
+    key = np.random.default_rng(3).bytes(32)
+    data = _dump_with([(4096 - 100, key), (9000, key[:16])], size=16384)
+    path = tmp_path / "dump.mem"
+    path.write_bytes(data.tobytes())
+    offsets, bits = aesfind.scan_file(str(path), window=4096)
+    assert offsets.tolist() == [3996, 9000]
+    assert bits.tolist() == [256, 128]
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+import cache
+from cache import ResultCache
+from finders import FINDERS
+
+
+@pytest.fixture
+def version(monkeypatch):
+    current = {"aes": "1.0", "rsa": "1.0"}
+    monkeypatch.setattr(cache, "tool_version", lambda finder: current[finder.name])
+    return current
+
+
+def _dump(path, content):
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_key_follows_dump_content_and_tool_build(tmp_path, version):
+    rc = ResultCache(str(tmp_path / "cache"))
+    aes = FINDERS["aes"]
+    a = _dump(tmp_path / "a.mem", b"x" * 5000)
+    b = _dump(tmp_path / "b.mem", b"x" * 5000)
+    c = _dump(tmp_path / "c.mem", b"x" * 4999 + b"y")
+    assert rc.key(a, aes) == rc.key(b, aes)
+    assert rc.key(a, aes) != rc.key(c, aes)
+    assert rc.key(a, aes) != rc.key(a, FINDERS["rsa"])
+    before = rc.key(a, aes)
+    version["aes"] = "1.1"
+    assert rc.key(a, aes) != before
+
+
+def _result(res_dir, finder, text):
+    res_dir.mkdir(exist_ok=True)
+    (res_dir / finder.output_name).write_text(text * 200)
+    (res_dir / finder.values_name).write_text("10,128")
+
+
+def test_restore_returns_what_was_stored(tmp_path, version):
+    rc = ResultCache(str(tmp_path / "cache"))
+    aes = FINDERS["aes"]
+    _result(tmp_path / "res", aes, "a")
+    rc.store("k" * 64, aes, str(tmp_path / "res"), str(tmp_path / "a.mem"), 1)
+    assert rc.restore("k" * 64, aes, str(tmp_path / "out")) == 1
+    assert (tmp_path / "out" / aes.values_name).read_text() == "10,128"
+    assert rc.restore("m" * 64, aes, str(tmp_path / "out")) is None
+
+
+def test_eviction_drops_the_least_recently_used_entry(tmp_path, version):
+    rc = ResultCache(str(tmp_path / "cache"))
+    aes = FINDERS["aes"]
+    res = tmp_path / "res"
+    _result(res, aes, "a")
+    keys = ["1" * 64, "2" * 64, "3" * 64]
+    rc.store(keys[0], aes, str(res), "a.mem", 1)
+    rc.store(keys[1], aes, str(res), "b.mem", 1)
+    entry_size = sum(os.path.getsize(os.path.join(rc._entry(keys[0]), n)) for n in os.listdir(rc._entry(keys[0])))
+    for age, key in ((200, keys[0]), (100, keys[1])):
+        meta = os.path.join(rc._entry(key), "meta.json")
+        os.utime(meta, (age, age))
+    # Using the older entry makes the other one the least recently used.
+    assert rc.restore(keys[1], aes, str(tmp_path / "out")) == 1
+    rc.max_bytes = 2 * entry_size + entry_size // 2
+    rc.store(keys[2], aes, str(res), "c.mem", 1)
+    assert os.path.isdir(rc._entry(keys[1]))
+    assert os.path.isdir(rc._entry(keys[2]))
+    assert not os.path.isdir(rc._entry(keys[0]))
@@ -0,0 +1,64 @@
+import os
+
+import offset_index
+
+
+def _setup(tmp_path, values, size=1 << 16):
+    dump = bytearray(size)
+    # DER SEQUENCE of 0x200 content bytes at 0x3000: 4 + 0x200 bytes in all.
+    dump[0x3000:0x3004] = b"\x30\x82\x02\x00"
+    mem = tmp_path / "dump.mem"
+    mem.write_bytes(bytes(dump))
+    res = tmp_path / "res"
+    res.mkdir()
+    for name, text in values.items():
+        (res / f"{name}_values.txt").write_text(text)
+    return str(mem), str(res)
+
+
+def test_records_have_key_extents_and_shared_masks(tmp_path):
+    mem, res = _setup(tmp_path, {
+        "aes": "1000,128\n2000,256\n1000,128",
+        "rsa": "3000,0\n8000,0\nfff0,0",
+        "serpent": "1000,0",
+    })
+    with offset_index.load(mem, res) as index:
+        records = [(o, n, offset_index.names_of(m)) for o, n, m in index]
+    assert records == [
+        (0x1000, 176, ["aes"]),
+        (0x1000, 528, ["serpent"]),
+        (0x2000, 240, ["aes"]),
+        (0x3000, 0x204, ["rsa"]),
+        # No DER header: the fallback length, clipped to the dump.
+        (0x8000, offset_index.RSA_FALLBACK_LENGTH, ["rsa"]),
+        (0xfff0, 0x10, ["rsa"]),
+    ]
+
+
+def test_merged_and_near(tmp_path):
+    mem, res = _setup(tmp_path, {"aes": "1000,128\n1080,128\n4000,256"})
+    with offset_index.load(mem, res) as index:
+        assert index.merged() == [(0x1000, 0x80 + 176, 1), (0x4000, 240, 1)]
+        assert [r[0] for r in index.near(0x1100, distance=0x100)] == [0x1080, 0x1000]
+        assert index.near(0x3000, distance=0x100) == []
+
+
+def test_index_is_rebuilt_when_a_values_file_or_the_dump_changes(tmp_path):
+    mem, res = _setup(tmp_path, {"aes": "1000,128"})
+    offset_index.load(mem, res).close()
+    assert offset_index.is_current(mem, res, ["aes"])
+    assert not offset_index.is_current(mem, res, ["aes", "rsa"])
+
+    # A values file rewritten after the index was built.
+    index = offset_index.index_path(res)
+    stamp = os.stat(os.path.join(res, "aes_values.txt")).st_mtime_ns - 1_000_000_000
+    os.utime(index, ns=(stamp, stamp))
+    assert not offset_index.is_current(mem, res, ["aes"])
+    offset_index.load(mem, res).close()
+    assert offset_index.is_current(mem, res, ["aes"])
+
+    # Another image of the same size in its place.
+    replacement = tmp_path / "other.mem"
+    replacement.write_bytes(os.urandom(os.path.getsize(mem)))
+    os.replace(replacement, mem)
+    assert not offset_index.is_current(mem, res, ["aes"])
@@ -0,0 +1,46 @@
+from parallel import merge_pairs, offset_style, plan_chunks, rebase
+
+
+def test_plan_chunks_overlap_every_range_but_the_last():
+    assert plan_chunks(100, 40, 10) == [(0, 50), (40, 50), (80, 20)]
+    assert plan_chunks(0, 40, 10) == [(0, 0)]
+
+
+def test_key_straddling_a_boundary_lies_whole_in_one_range():
+    chunk, overlap = 4096, 240
+    total = 3 * chunk + 100
+    chunks = plan_chunks(total, chunk, overlap)
+    for key in range(0, total - overlap + 1, 7):
+        assert any(start <= key and key + overlap <= start + length for start, length in chunks), key
+    # Starts 100 bytes before the first boundary: only the first range holds it.
+    key = chunk - 100
+    holders = [start for start, length in chunks if start <= key and key + overlap <= start + length]
+    assert holders == [0]
+
+
+def test_merge_pairs_rebases_and_drops_overlap_duplicates():
+    # 0x1004 lies in the overlap, so both ranges report it.
+    merged = merge_pairs([
+        (0, [("fa0", "128"), ("1004", "256")]),
+        (0x1000, [("4", "256"), ("10", "128")]),
+    ])
+    assert merged == [("fa0", "128"), ("1004", "256"), ("1010", "128")]
+
+
+def test_merge_pairs_keeps_different_sizes_at_one_offset():
+    assert merge_pairs([(0, [("10", "128")]), (0, [("10", "256")])]) == [("10", "128"), ("10", "256")]
+
+
+def test_offset_style_is_inferred_from_all_offsets():
+    assert offset_style(["00ff", "0010"]) == (4, False)
+    assert offset_style(["FF", "10"]) == (0, True)
+    assert offset_style(["10", "20"]) == (0, False)
+
+
+def test_rebase_keeps_the_tools_format():
+    assert rebase("10", 0x1000) == "1010"
+    assert rebase("0a", 0xf0, (2, True)) == "FA"
+    assert rebase("0010", 0x100, (4, False)) == "0110"
+    # A digits-only token takes the case the tool prints letters in.
+    assert merge_pairs([(0, [("AB", "0")]), (0xA00, [("10", "0")])]) == [("AB", "0"), ("A10", "0")]
+    assert merge_pairs([(0, [("00FF", "0")]), (0x100, [("0010", "0")])]) == [("00FF", "0"), ("0110", "0")]
@@ -0,0 +1,42 @@
+from parsers import ChunkParser, StreamParser, extract
+
+AES_OUTPUT = (
+    "FOUND POSSIBLE 256-BIT KEY AT BYTE 1f40 \n"
+    "KEY: 000102030405060708090a0b0c0d0e0f\n"
+    "EXTENDED KEY:\n00 01 02 03\n\n"
+    "FOUND POSSIBLE 128-BIT KEY AT BYTE 2A0 \n"
+    "KEY: 00112233445566778899aabbccddeeff\n"
+)
+RSA_OUTPUT = "FOUND PRIVATE KEY AT 7e6370\nversion = \n00\nFOUND PRIVATE KEY AT 1e73040\nversion = \n00\n"
+
+
+def test_extract_reads_every_record():
+    assert extract("aes", AES_OUTPUT) == [("1f40", "256"), ("2A0", "128")]
+    assert extract("rsa", RSA_OUTPUT) == [("7e6370", "0"), ("1e73040", "0")]
+
+
+def test_records_split_across_feeds():
+    for step in (1, 3, 7, 64):
+        parser = StreamParser("aes")
+        pairs = []
+        for i in range(0, len(AES_OUTPUT), step):
+            pairs += parser.feed(AES_OUTPUT[i:i + step])
+        assert pairs == [("1f40", "256"), ("2A0", "128")], step
+
+
+def test_record_is_returned_once_it_is_complete():
+    parser = StreamParser("rsa")
+    assert parser.feed("FOUND PRIVATE KEY AT 7e63") == []
+    assert parser.feed("70\nver") == []
+    assert parser.feed("sion = \n") == [("7e6370", "0")]
+
+
+def test_chunk_parser_writes_values_from_byte_chunks(tmp_path):
+    out = tmp_path / "rsa_values.txt"
+    parser = ChunkParser("rsa", str(out))
+    # Split inside a multi-byte character as well as inside records.
+    data = ("é " + RSA_OUTPUT).encode()
+    for i in range(0, len(data), 5):
+        parser.feed(data[i:i + 5])
+    assert parser.finish() == 2
+    assert out.read_text() == "7e6370,0\n1e73040,0"
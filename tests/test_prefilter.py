@@ -0,0 +1,28 @@
+import pytest
+
+from prefilter import Layout
+
+np = pytest.importorskip("numpy")
+
+
+def test_map_offsets_agrees_with_to_dump():
+    layout = Layout([(0x1000, 0x100), (0x5000, 0x20), (0x9000, 0x300)], gap=0x40)
+    assert layout.stream_size == 0x100 + 0x40 + 0x20 + 0x40 + 0x300
+    offsets = np.arange(layout.stream_size + 0x80)
+    dump, keep = layout.map_offsets(offsets)
+    expected = [layout.to_dump(int(o)) for o in offsets]
+    assert keep.tolist() == [e is not None for e in expected]
+    assert dump[keep].tolist() == [e for e in expected if e is not None]
+
+
+def test_map_offsets_edges():
+    layout = Layout([(0x1000, 0x100), (0x5000, 0x20)], gap=0x40)
+    dump, keep = layout.map_offsets([0, 0xff, 0x100, 0x13f, 0x140, 0x15f, 0x160, 0x1000])
+    assert keep.tolist() == [True, True, False, False, True, True, False, False]
+    assert dump[keep].tolist() == [0x1000, 0x10ff, 0x5000, 0x501f]
+
+
+def test_map_offsets_without_runs_keeps_nothing():
+    dump, keep = Layout([], gap=0x40).map_offsets([0, 5])
+    assert keep.tolist() == [False, False]
+    assert Layout([], gap=0x40).to_dump(0) is None
@@ -0,0 +1,55 @@
+import pytest
+
+from provision import Task, check_graph, run_graph
+
+
+def ok(log):
+    return None
+
+
+def test_check_graph_accepts_a_dag():
+    check_graph([Task("a", ok), Task("b", ok, ["a"]), Task("c", ok, ["a", "b"])])
+
+
+@pytest.mark.parametrize("tasks, message", [
+    ([Task("a", ok, ["c"]), Task("b", ok, ["a"]), Task("c", ok, ["b"]), Task("d", ok)], "cycle: a, b, c"),
+    ([Task("a", ok, ["a"])], "cycle: a"),
+    ([Task("a", ok), Task("b", ok, ["a", "missing"])], "unknown tasks: missing"),
+    ([Task("a", ok), Task("a", ok)], "Duplicate"),
+])
+def test_check_graph_rejects_bad_graphs(tasks, message):
+    with pytest.raises(ValueError, match=message):
+        check_graph(tasks)
+
+
+def test_run_graph_rejects_a_cycle_before_running_anything():
+    ran = []
+    tasks = [Task("a", lambda log: ran.append("a")), Task("b", ok, ["c"]), Task("c", ok, ["b"])]
+    with pytest.raises(ValueError):
+        run_graph(tasks, log=lambda msg: None)
+    assert ran == []
+
+
+def test_run_graph_orders_tasks_and_blocks_dependents_of_failures():
+    order = []
+
+    def step(name, fail=False):
+        def func(log):
+            order.append(name)
+            if fail:
+                raise RuntimeError("boom")
+            return "skipped" if name == "c" else None
+        return func
+
+    tasks = [
+        Task("a", step("a")),
+        Task("b", step("b", fail=True), ["a"]),
+        Task("c", step("c"), ["a"]),
+        Task("d", step("d"), ["b", "c"]),
+        Task("e", step("e"), ["d"]),
+    ]
+    run_graph(tasks, log=lambda msg: None)
+    assert {t.name: t.status for t in tasks} == {
+        "a": "done", "b": "failed", "c": "skipped", "d": "blocked", "e": "blocked",
+    }
+    assert order[0] == "a" and sorted(order) == ["a", "b", "c"]
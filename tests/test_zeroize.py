@@ -0,0 +1,77 @@
+import os
+import sys
+
+import pytest
+
+import zeroize
+
+FAKE_ZEROIZE_DUMP = """#!{python}
+# Fills each AES key schedule with 0xAA, as zeroize_dump's -a does with zeros.
+import shutil, sys
+args, files, out = sys.argv[1:], [], None
+while args:
+    arg = args.pop(0)
+    if arg == "-o":
+        out = args.pop(0)
+    elif arg == "-a":
+        files.append(args.pop(0))
+    else:
+        src = arg
+shutil.copyfile(src, out)
+with open(out, "r+b") as f:
+    for path in files:
+        for line in open(path).read().split():
+            offset, size = line.split(",")
+            f.seek(int(offset, 16))
+            f.write(b"\\xaa" * (176 if size == "128" else 240))
+"""
+
+
+@pytest.fixture
+def case(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    dump = bytearray(os.urandom(1 << 18))
+    mem = tmp_path / "dump.mem"
+    mem.write_bytes(bytes(dump))
+    res = tmp_path / "res"
+    res.mkdir()
+    # Overlapping AES and Serpent keys, a repeated hit and a key near the end of the dump.
+    (res / "aes_values.txt").write_text("1000,128\n10a0,256\n3ff40,128\n1000,128")
+    (res / "serpent_values.txt").write_text("1080,0")
+    return str(mem), str(res), dump
+
+
+def test_without_the_binary_the_index_regions_are_zeroed(case):
+    mem, res, dump = case
+    names = ["aes", "serpent"]
+    regions = zeroize.regions(mem, res, names)
+    assert regions == [(0x1000, 0x1080 + 528 - 0x1000), (0x3ff40, 176)]
+    stats = zeroize.fast_zeroize(mem, res, names, "out", log=lambda msg: None)
+    assert stats["patches"] == "index"
+    assert stats["output"] == os.path.join(res, "out.mem")
+    assert stats["regions"] == len(regions)
+    for start, length in regions:
+        dump[start:start + length] = bytes(length)
+    with open(stats["output"], "rb") as f:
+        assert f.read() == bytes(dump)
+
+
+def test_probe_matches_the_binary(case, tmp_path):
+    mem, res, dump = case
+    os.mkdir(zeroize.ZEROIZER_DIR)
+    binary = os.path.join(zeroize.ZEROIZER_DIR, "zeroize_dump")
+    with open(binary, "w") as f:
+        f.write(FAKE_ZEROIZE_DUMP.format(python=sys.executable))
+    assert zeroize.verify_fast(mem, res, ["aes"], log=lambda msg: None)
+    stats = zeroize.fast_zeroize(mem, res, ["aes"], log=lambda msg: None)
+    assert stats["patches"] == "zeroize_dump"
+    with open(stats["output"], "rb") as f:
+        out = f.read()
+    assert out[0x1000:0x10a0 + 240] == b"\xaa" * (0x10a0 + 240 - 0x1000)
+    assert out[:0x1000] == dump[:0x1000] and out[0x10a0 + 240:0x3ff40] == dump[0x10a0 + 240:0x3ff40]
+
+
+def test_missing_values_file_is_reported(case):
+    mem, res, _ = case
+    with pytest.raises(FileNotFoundError, match="rsa_values.txt"):
+        zeroize.fast_zeroize(mem, res, ["rsa"], log=lambda msg: None)
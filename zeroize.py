@@ -0,0 +1,351 @@
+"""Zeroizing found keys in a dump.
+
+Two paths produce the zeroed dump from the ``*_values.txt`` files:
+Zeroizer's ``zeroize_dump`` (a full read and rewrite of the dump), given
+the values files with repeated lines removed (see
+:func:`deduplicated_value_args`), and
+:func:`fast_zeroize`, which clones the dump (reflink where the filesystem
+supports it, else an in-kernel copy of the data extents, else a sparse
+copy) and then patches only the bytes zeroize_dump would change through
+mmap.  Those bytes are measured, not guessed: zeroize_dump is run on a
+small probe file made of the parts of the dump around every hit (see
+:func:`probe_patches`), and whatever it changed there is copied into the
+clone.  :func:`verify_fast` compares the two paths on a whole dump.
+Without a zeroize_dump build, fast zeroize falls back to the key extents
+of the offset index (see :mod:`offset_index`) and says so.  Fast zeroize
+also takes split and compressed dumps: the clone is written out raw and
+patched at the raw offsets the finders reported.
+"""
+import errno
+import fcntl
+import filecmp
+import mmap
+import os
+import tempfile
+import time
+
+import dumps
+import offset_index
+import procengine
+from parsers import write_values
+
+ZEROIZER_DIR = "Zeroizer"
+DEFAULT_FILENAME = "zero_mem.mem"
+# Folder in the results folder for the values files given to zeroize_dump.
+DEDUP_VALUES_DIR = "zeroize_values"
+
+# Linux FICLONE ioctl: share the source's extents (btrfs, XFS, bcachefs...)
+FICLONE = 0x40049409
+COPY_CHUNK = 64 * 1024 * 1024
+# Bytes of the dump either side of every hit copied into the zeroize_dump
+# probe, in blocks; far more than the longest key any finder reports.
+PROBE_REACH = 32 * 1024
+PROBE_BLOCK = 4096
+
+# finder name -> zeroize_dump flag taking that finder's values file
+FLAGS = {
+    "aes": "-a",
+    "rsa": "-r",
+    "serpent": "-s",
+    "twofish": "-t",
+}
+
+
+def find_binary():
+    """Return the path of the zeroize_dump binary, or None if it is not built."""
+    dump_bin = os.path.join(ZEROIZER_DIR, "zeroize_dump")
+    if not os.path.isfile(dump_bin):
+        dump_bin = "./zeroize_dump"
+    return dump_bin if os.path.isfile(dump_bin) else None
+
+
+def output_path(res_dir: str, filename: str = "") -> str:
+    """Path of the zeroed dump; the name defaults to zero_mem.mem and always ends in .mem."""
+    filename = filename.strip() or DEFAULT_FILENAME
+    if not filename.lower().endswith(".mem"):
+        filename += ".mem"
+    return os.path.join(res_dir, filename)
+
+
+def value_args(res_dir: str, names) -> list:
+    """zeroize_dump arguments for the selected finders' values files.
+
+    Raises FileNotFoundError naming the first values file that is missing.
+    """
+    args = []
+    for name in names:
+        val_path = os.path.join(res_dir, f"{name}_values.txt")
+        if not os.path.isfile(val_path):
+            raise FileNotFoundError(f"{val_path} not found. Run {name} finder first.")
+        args.extend([FLAGS[name], val_path])
+    return args
+
+
+def deduplicated_value_args(res_dir: str, names) -> list:
+    """Like :func:`value_args`, for copies of the values files without repeated lines.
+
+    Only lines that are exact duplicates of an earlier line are left out;
+    every reported hit is passed on as the finder wrote it.  The copies are
+    written to ``zeroize_values/`` in ``res_dir``.
+    """
+    value_args(res_dir, names)
+    out_dir = os.path.join(res_dir, DEDUP_VALUES_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    args = []
+    for name in names:
+        path = offset_index.values_path(out_dir, name)
+        with open(offset_index.values_path(res_dir, name), encoding="utf-8") as src:
+            lines = dict.fromkeys(line.rstrip("\r\n") for line in src)
+        lines.pop("", None)
+        # Same layout as ValuesWriter: no newline after the last line.
+        with open(path, "w", encoding="utf-8") as dst:
+            dst.write("\n".join(lines))
+        args.extend([FLAGS[name], path])
+    return args
+
+
+def binary_supports(mem_path: str) -> bool:
+    """zeroize_dump reads one raw file; split and compressed dumps need :func:`fast_zeroize`."""
+    return dumps.open_source(mem_path).is_file
+
+
+def build_command(mem_path: str, res_dir: str, names, filename: str = ""):
+    """Return ``(command, output file)`` for zeroizing ``names`` in ``mem_path``."""
+    if not binary_supports(mem_path):
+        raise ValueError(f"zeroize_dump needs a single raw dump; use fast zeroize for "
+                         f"{dumps.open_source(mem_path).describe()}")
+    value_args(res_dir, names)
+    dump_bin = find_binary()
+    if dump_bin is None:
+        raise FileNotFoundError("zeroize_dump binary not found. Build Zeroizer first (run startup tasks).")
+    os.chmod(dump_bin, 0o755)
+    args = deduplicated_value_args(res_dir, names)
+    out_file = output_path(res_dir, filename)
+    return [dump_bin, *args, "-o", out_file, mem_path], out_file
+
+
+def run_zeroize(mem_path: str, res_dir: str, names, filename: str = "", log=print) -> int:
+    """Run zeroize_dump to completion, logging its output; returns the exit code."""
+    cmd, out_file = build_command(mem_path, res_dir, names, filename)
+    log("Running: " + " ".join(cmd))
+    code = procengine.run_command(cmd, log)
+    log(f"zeroize_dump finished with exit code {code}" if code == 0 else "zeroize_dump failed")
+    if code == 0:
+        log(f"Zeroed dump saved to: {out_file}")
+    return code
+
+
+def regions(mem_path: str, res_dir: str, names, log=None) -> list:
+    """Minimal ``(start, length)`` ranges covering the selected finders' keys.
+
+    Read from the binary offset index, which is rebuilt first if a values
+    file changed; overlapping keys of different algorithms are merged.
+    """
+    with offset_index.load(mem_path, res_dir, names, log) as index:
+        return [(offset, length) for offset, length, _ in index.merged(names)]
+
+
+def _probe_blocks(offsets) -> list:
+    """Sorted starts of the blocks within ``PROBE_REACH`` of any of ``offsets``."""
+    blocks = set()
+    for offset in offsets:
+        first = max(0, offset - PROBE_REACH) // PROBE_BLOCK
+        blocks.update(range(first, (offset + PROBE_REACH) // PROBE_BLOCK + 1))
+    return [block * PROBE_BLOCK for block in sorted(blocks)]
+
+
+def _changed(before: bytes, after: bytes):
+    """``(start, end)`` of the bytes that differ between two equal-length blocks."""
+    first = next(i for i in range(len(before)) if before[i] != after[i])
+    last = next(i for i in range(len(before) - 1, first - 1, -1) if before[i] != after[i])
+    return first, last + 1
+
+
+def probe_patches(mem_path: str, res_dir: str, names, dump_bin: str, log=print) -> list:
+    """``(offset, data)`` patches zeroize_dump makes to the dump for ``names``' hits.
+
+    The blocks of the dump around every hit are written back to back to a
+    probe file in ``res_dir``, the values files are rebased onto it and
+    zeroize_dump is run on the probe; every byte it changed is mapped back
+    to its dump offset.  This matches zeroize_dump on the whole dump as
+    long as what it does to a key depends on and reaches no further than
+    ``PROBE_REACH`` bytes around it, which :func:`verify_fast` checks.
+    """
+    hits = {name: offset_index.read_values(offset_index.values_path(res_dir, name)) for name in names}
+    blocks = _probe_blocks(offset for pairs in hits.values() for offset, _ in pairs)
+    if not blocks:
+        return []
+    data = dumps.open_source(mem_path).view(blocks, PROBE_BLOCK)
+    size = len(data)
+    blocks = [block for block in blocks if block < size]
+    position = {block: i * PROBE_BLOCK for i, block in enumerate(blocks)}
+    with tempfile.TemporaryDirectory(prefix="ramx-probe-", dir=os.path.abspath(res_dir)) as tmp:
+        probe, out = os.path.join(tmp, "probe.mem"), os.path.join(tmp, "probe.zero.mem")
+        with open(probe, "wb") as f:
+            for block in blocks:
+                f.write(data[block:block + PROBE_BLOCK])
+        args = []
+        for name, pairs in hits.items():
+            rebased = []
+            for offset, key_size in pairs:
+                if offset >= size:
+                    log(f"{name} hit at {offset:#x} lies outside the dump, skipped")
+                    continue
+                rebased.append((f"{position[offset - offset % PROBE_BLOCK] + offset % PROBE_BLOCK:x}", key_size))
+            path = offset_index.values_path(tmp, name)
+            write_values(path, dict.fromkeys(rebased))
+            args.extend([FLAGS[name], path])
+        code = procengine.run_command([dump_bin, *args, "-o", out, probe], log)
+        if code != 0:
+            raise RuntimeError(f"zeroize_dump exited with code {code} on the probe")
+        if os.path.getsize(out) != os.path.getsize(probe):
+            raise RuntimeError("zeroize_dump changed the size of the probe")
+        patches = []
+        with open(probe, "rb") as before, open(out, "rb") as after:
+            for block in blocks:
+                old, new = before.read(PROBE_BLOCK), after.read(PROBE_BLOCK)
+                if old != new:
+                    start, end = _changed(old, new)
+                    patches.append((block + start, new[start:end]))
+    return patches
+
+
+def _reflink(src_fd: int, dst_fd: int) -> bool:
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+        return True
+    except OSError:
+        return False
+
+
+def _copy_extents(src_fd: int, dst_fd: int, size: int) -> int:
+    """copy_file_range every data extent of the source, leaving its holes as holes."""
+    written, pos = 0, 0
+    while pos < size:
+        try:
+            start = os.lseek(src_fd, pos, os.SEEK_DATA)
+        except OSError as e:
+            if e.errno == errno.ENXIO:
+                break
+            raise
+        end = os.lseek(src_fd, start, os.SEEK_HOLE)
+        while start < end:
+            n = os.copy_file_range(src_fd, dst_fd, min(end - start, 1 << 30), start, start)
+            if n == 0:
+                break
+            start += n
+            written += n
+        pos = end
+    return written
+
+
+def _sparse_copy(src_fd: int, dst_fd: int, size: int) -> int:
+    """Userspace copy that skips all-zero chunks instead of writing them."""
+    written, pos = 0, 0
+    zero = bytes(COPY_CHUNK)
+    while pos < size:
+        chunk = os.pread(src_fd, min(COPY_CHUNK, size - pos), pos)
+        if not chunk:
+            break
+        if chunk != zero[:len(chunk)]:
+            os.pwrite(dst_fd, chunk, pos)
+            written += len(chunk)
+        pos += len(chunk)
+    return written
+
+
+def clone_file(src: str, dst: str) -> tuple:
+    """Copy ``src`` to ``dst`` as cheaply as the filesystem allows.
+
+    Returns ``(method, bytes written)``; a reflink writes no data at all.
+    Split and compressed dumps are written out raw (see
+    :meth:`dumps.DumpSource.extract`), so the clone is always a raw dump.
+    """
+    dump = dumps.open_source(src)
+    if not dump.is_file:
+        dst_fd = os.open(dst, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            return dump.extract(dst_fd)
+        finally:
+            os.close(dst_fd)
+    size = dump.disk_size
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        dst_fd = os.open(dst, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            if _reflink(src_fd, dst_fd):
+                return "reflink", 0
+            try:
+                written = _copy_extents(src_fd, dst_fd, size)
+                method = "copy_file_range"
+            except OSError:
+                os.ftruncate(dst_fd, 0)
+                written = _sparse_copy(src_fd, dst_fd, size)
+                method = "sparse copy"
+            os.ftruncate(dst_fd, size)
+            return method, written
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
+
+def fast_zeroize(mem_path: str, res_dir: str, names, filename: str = "", log=print) -> dict:
+    """Clone the dump and patch in place the bytes zeroize_dump would change.
+
+    Returns statistics: where the patches came from (``"zeroize_dump"``
+    probe or ``"index"`` extents), clone method, bytes copied, regions and
+    bytes patched, and elapsed seconds.
+    """
+    value_args(res_dir, names)
+    out_file = output_path(res_dir, filename)
+    start = time.monotonic()
+    dump_bin = find_binary()
+    if dump_bin is not None:
+        os.chmod(dump_bin, 0o755)
+        patches = probe_patches(mem_path, res_dir, names, dump_bin, log)
+        source = "zeroize_dump"
+    else:
+        log("zeroize_dump is not built: zeroing the key extents of the offset index, "
+            "which may differ from zeroize_dump's output.")
+        patches = [(offset, bytes(length)) for offset, length in regions(mem_path, res_dir, names, log)]
+        source = "index"
+    method, copied = clone_file(mem_path, out_file)
+    patched = count = 0
+    if os.path.getsize(out_file):
+        with open(out_file, "r+b") as f, mmap.mmap(f.fileno(), 0) as mm:
+            for offset, data in patches:
+                if mm[offset:offset + len(data)] != data:
+                    mm[offset:offset + len(data)] = data
+                    patched += len(data)
+                count += 1
+            mm.flush()
+    stats = {
+        "output": out_file,
+        "patches": source,
+        "method": method,
+        "bytes_copied": copied,
+        "regions": count,
+        "bytes_patched": patched,
+        "bytes_written": copied + patched,
+        "seconds": round(time.monotonic() - start, 3),
+    }
+    log(f"Cloned dump via {method} ({copied / 1024 ** 2:.1f} MiB written), "
+        f"patched {count} regions ({patched} bytes, from the {source}) in {stats['seconds']}s")
+    log(f"Zeroed dump saved to: {out_file}")
+    return stats
+
+
+def verify_fast(mem_path: str, res_dir: str, names, log=print) -> bool:
+    """Check that :func:`fast_zeroize` output is byte-identical to zeroize_dump's."""
+    with tempfile.TemporaryDirectory(prefix="ramx-zero-", dir=os.path.abspath(res_dir)) as tmp:
+        reference = os.path.join(tmp, "reference.mem")
+        cmd, _ = build_command(mem_path, res_dir, names)
+        cmd[cmd.index("-o") + 1] = reference
+        code = procengine.run(cmd).returncode
+        if code != 0:
+            raise RuntimeError(f"zeroize_dump exited with code {code}")
+        fast = fast_zeroize(mem_path, res_dir, names, os.path.join(tmp, "fast.mem"), log=log)["output"]
+        same = filecmp.cmp(reference, fast, shallow=False)
+    log("Fast zeroize matches zeroize_dump." if same else "MISMATCH: fast zeroize differs from zeroize_dump.")
+    return same